@@ -0,0 +1,130 @@
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from .records import from_ms
+
+if TYPE_CHECKING:
+    from .records import LinkRecord as Link
+
+# (categories, is short, duration seconds) as last counted for a link
+Contribution = Tuple[Tuple[str, ...], bool, int]
+
+
+def is_short(link: "Link") -> bool:
+    return link.video_type == "short" or "/shorts/" in (link.original_url or "")
+
+
+def categories_of(link: "Link") -> Tuple[str, ...]:
+    """The categories a link is shown under (its primary one if the list is empty)."""
+    return tuple(dict.fromkeys(link.categories)) or (link.primary_category or "Unsorted",)
+
+
+class CategoryAgg:
+    __slots__ = ("count", "shorts", "duration_seconds", "timed")
+
+    def __init__(self):
+        self.count = 0
+        self.shorts = 0
+        self.duration_seconds = 0
+        self.timed = 0  # links with a known duration
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "count": self.count,
+            "normal": self.count - self.shorts,
+            "shorts": self.shorts,
+            "duration_seconds": self.duration_seconds,
+            "timed": self.timed,
+        }
+
+
+class CategoryStats:
+    """
+    Per-category aggregates (counts, shorts/normal split, total duration)
+    kept current by LinkIndex on add, delete, category change and metadata
+    refresh, so the sidebar and category headers never scan the library.
+    Each link's last contribution is remembered so an update can subtract
+    exactly what it added.
+    """
+
+    def __init__(self):
+        self.by_category: Dict[str, CategoryAgg] = {}
+        self.contrib: Dict[int, Contribution] = {}
+
+    def add(self, link: "Link"):
+        contrib = (categories_of(link), is_short(link), link.duration_seconds or 0)
+        self.contrib[link.id] = contrib
+        self._apply(contrib, 1)
+
+    def remove(self, link_id: int):
+        contrib = self.contrib.pop(link_id, None)
+        if contrib is not None:
+            self._apply(contrib, -1)
+
+    def update(self, link: "Link"):
+        old = self.contrib.get(link.id)
+        if old is not None and old == (categories_of(link), is_short(link), link.duration_seconds or 0):
+            return
+        self.remove(link.id)
+        self.add(link)
+
+    def _apply(self, contrib: Contribution, sign: int):
+        categories, short, seconds = contrib
+        for cat in categories:
+            agg = self.by_category.get(cat)
+            if agg is None:
+                agg = self.by_category[cat] = CategoryAgg()
+            agg.count += sign
+            agg.shorts += sign * short
+            agg.duration_seconds += sign * seconds
+            agg.timed += sign * (seconds > 0)
+            if agg.count <= 0:
+                del self.by_category[cat]
+
+    def get(self, category: str) -> Optional[CategoryAgg]:
+        return self.by_category.get(category)
+
+    def ordered(
+        self,
+        categories: List[str],
+        strategy: str,
+        pinned: List[str],
+        last_added: Callable[[str], Optional[int]],
+    ) -> List[str]:
+        """`categories` sorted the way Config.category_order_strategy asks."""
+        position = {cat: i for i, cat in enumerate(categories)}
+        if strategy == "alphabetical":
+            return sorted(categories, key=lambda c: (c.casefold(), c))
+        if strategy == "most_items":
+            return sorted(categories, key=lambda c: (-self._count(c), position[c]))
+
+        def recent(c: str) -> Tuple[int, str]:
+            return -(last_added(c) or 0), c.casefold()
+
+        if strategy == "pinned_first":
+            pinned_set = set(pinned)
+            return sorted(categories, key=lambda c: (c not in pinned_set, *recent(c)))
+        return sorted(categories, key=recent)
+
+    def _count(self, category: str) -> int:
+        agg = self.by_category.get(category)
+        return agg.count if agg else 0
+
+    def summary(
+        self,
+        categories: List[str],
+        strategy: str,
+        pinned: List[str],
+        last_added: Callable[[str], Optional[int]],
+    ) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {}
+        for cat in categories:
+            agg = self.by_category.get(cat)
+            entry = agg.as_dict() if agg else CategoryAgg().as_dict()
+            added = from_ms(last_added(cat))
+            entry["last_added"] = added.isoformat() if added else None
+            stats[cat] = entry
+        return {
+            "strategy": strategy,
+            "order": self.ordered(categories, strategy, pinned, last_added),
+            "categories": stats,
+        }
@@ -0,0 +1,72 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+# Remember at most this many changed keys; older history forces a full resync.
+MAX_TRACKED = 200_000
+
+
+class ChangeLog:
+    """
+    Monotonic revision counter plus the latest revision of every changed key
+    ("link", id), ("queue", id), ("categories", None), ("config", None).
+
+    Keys are kept in revision order, so changes_since(rev) walks back only
+    over what changed after `rev`. The counter starts at the wall clock in
+    milliseconds, which keeps revisions increasing across restarts: a client
+    holding a revision from a previous run falls below `floor` and is told
+    to do a full reload.
+    """
+
+    def __init__(self):
+        self.rev = int(time.time() * 1000)
+        self.start = self.floor = self.rev
+        self.entries: "OrderedDict[Tuple[str, Hashable], Tuple[int, bool]]" = OrderedDict()
+        self.kind_revs: Dict[str, int] = {}  # kind -> revision of its latest change
+        self._event: Optional[asyncio.Event] = None
+
+    def touch(self, kind: str, key: Hashable = None, deleted: bool = False) -> int:
+        self.rev += 1
+        k = (kind, key)
+        self.entries.pop(k, None)
+        self.entries[k] = (self.rev, deleted)
+        self.kind_revs[kind] = self.rev
+        if len(self.entries) > MAX_TRACKED:
+            _, (oldest_rev, _) = self.entries.popitem(last=False)
+            self.floor = oldest_rev
+        if self._event is not None:
+            self._event.set()
+            self._event = None
+        return self.rev
+
+    def kind_rev(self, kind: str) -> int:
+        """Revision of the latest change of `kind` (the start revision if none yet)."""
+        return self.kind_revs.get(kind, self.start)
+
+    def changes_since(self, since: int) -> Optional[List[Tuple[str, Hashable, bool]]]:
+        """Changed keys after `since`, oldest first; None if history was trimmed."""
+        if since < self.floor or since > self.rev:
+            return None
+        out = []
+        for (kind, key), (rev, deleted) in reversed(self.entries.items()):
+            if rev <= since:
+                break
+            out.append((kind, key, deleted))
+        out.reverse()
+        return out
+
+    async def wait(self, since: int, timeout: float) -> bool:
+        """Wait until the revision moves past `since`; False on timeout."""
+        if self.rev > since:
+            return True
+        if self._event is None:
+            self._event = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def summary(self) -> Dict[str, Any]:
+        return {"revision": self.rev, "floor": self.floor, "tracked": len(self.entries)}
@@ -0,0 +1,331 @@
+import re
+import zlib
+from array import array
+from functools import lru_cache
+from random import Random
+from typing import TYPE_CHECKING, Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple, Union
+
+from .search import _fold, tokenize
+
+if TYPE_CHECKING:
+    from .records import LinkRecord as Link
+
+Lookup = Callable[[int], Optional["Link"]]
+
+# MinHash signature of BANDS * ROWS values. Two links share an LSH bucket
+# when one band matches exactly; with 8 x 3 a pair at Jaccard 0.6 becomes
+# a candidate 86% of the time, at 0.8 99.8%, at 0.2 6%.
+BANDS = 8
+ROWS = 3
+_PRIME = (1 << 61) - 1
+_rng = Random(291125)
+_PERMS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(BANDS * ROWS)]
+
+# Candidates are then checked exactly: title/author token Jaccard, and
+# durations (when both are known) within max(slack, ratio * longer).
+SIMILARITY = 0.6
+DURATION_SLACK = 15
+DURATION_RATIO = 0.1
+MIN_TOKENS = 2
+# A bucket this full was filled by common words ("live", "the"), not by
+# one song; it is skipped so lookups stay small. Real duplicates still
+# meet in the bands hashed from their rarer words.
+MAX_BUCKET = 64
+
+# Words that only say which upload of a song this is.
+NOISE = frozenset(
+    "official music video videoclip clip lyric lyrics audio visualizer visualiser "
+    "mv m v hd hq 4k 1080p remastered remaster explicit".split()
+)
+_FEATURING = re.compile(
+    r"[(\[]\s*(?:ft|feat|featuring)\b[^)\]]*[)\]]|\b(?:ft|feat|featuring)\b\.?[^()\[\]|\-–—]*",
+    re.IGNORECASE,
+)
+_CHANNEL_SUFFIX = re.compile(r"(?:vevo|\s*-\s*topic|\s+official)$")
+# "Artist - Song", "Song | Artist", ...
+_SEPARATOR = re.compile(r"\s+[-–—|]\s+")
+_BRACKETS = re.compile(r"\(([^()]*)\)|\[([^\[\]]*)\]")
+# ARTIST 'Song' M/V: a quote opening a word, not an apostrophe
+_QUOTE = re.compile(r"(?:^|(?<=\s))[\"“‘'「]")
+
+
+def _tokens(text: str) -> List[str]:
+    return [t for t in tokenize(text, query=True) if t not in NOISE]
+
+
+@lru_cache(maxsize=4096)
+def _channel(author: str) -> Tuple[str, FrozenSet[str]]:
+    """(name as one token, its words) for a channel, without VEVO/Topic suffixes."""
+    tokens = _tokens(_CHANNEL_SUFFIX.sub("", _fold(author).strip()))
+    return "".join(tokens), frozenset(tokens)
+
+
+def _artist_key(text: str, tokens: Optional[List[str]] = None) -> str:
+    """One token for an artist name, aliases in brackets left out."""
+    if "(" in text or "[" in text:
+        key = "".join(_tokens(_BRACKETS.sub(" ", text)))
+        if key:
+            return key
+    return "".join(_tokens(text) if tokens is None else tokens)
+
+
+def _strip_credits(text: str, channel_key: str) -> str:
+    """Drop bracketed credits: "(... by Channel)" and aliases like "Channel (별명)"."""
+
+    def credit(m: "re.Match[str]") -> str:
+        inner = m.group(1) if m.group(1) is not None else m.group(2)
+        if channel_key in "".join(_tokens(inner)) or "".join(_tokens(text[: m.start()])).endswith(channel_key):
+            return " "
+        return m.group(0)
+
+    return _BRACKETS.sub(credit, text)
+
+
+def shingles(title: Optional[str], author: Optional[str]) -> FrozenSet[str]:
+    """
+    Comparable tokens of a video: the words of its title without upload
+    noise or featured artists, with the artist folded into one "~artist"
+    token so that two songs by the same artist do not look alike just for
+    sharing a long name. The artist is the side of "Artist - Song" that
+    names the channel (else the left one), whatever precedes a quoted
+    'Song', or else the channel.
+    """
+    if not title:
+        return frozenset()
+    text = _FEATURING.sub(" ", title)
+    channel_key, channel_words = _channel(author or "")
+    if channel_key and ("(" in text or "[" in text):
+        folded = _fold(text)
+        if all(word in folded for word in channel_words):
+            text = _strip_credits(text, channel_key)
+    artist = channel_key
+    parts = _SEPARATOR.split(text, maxsplit=1)
+    quote = _QUOTE.search(text) if len(parts) == 1 else None
+    if len(parts) == 2:
+        left, right = parts
+        left_tokens, right_tokens = _tokens(left), _tokens(right)
+        if channel_key and channel_key in "".join(right_tokens) and channel_key not in "".join(left_tokens):
+            left, right, left_tokens, right_tokens = right, left, right_tokens, left_tokens
+        artist = _artist_key(left, left_tokens) or channel_key
+        tokens = set(right_tokens)
+    elif quote and _tokens(text[: quote.start()]):
+        artist = _artist_key(text[: quote.start()])
+        tokens = set(_tokens(text[quote.start() :]))
+    else:
+        title_tokens = _tokens(text)
+        tokens = set(title_tokens)
+        if channel_key and channel_key in "".join(title_tokens):
+            tokens -= channel_words
+    if artist:
+        tokens.add("~" + artist)
+    return frozenset(tokens)
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def durations_match(a: Optional[int], b: Optional[int]) -> bool:
+    if not a or not b:
+        return True
+    return abs(a - b) <= max(DURATION_SLACK, DURATION_RATIO * max(a, b))
+
+
+@lru_cache(maxsize=65536)
+def _token_hashes(token: str) -> Tuple[int, ...]:
+    x = zlib.crc32(token.encode("utf-8"))
+    return tuple((a * x + b) % _PRIME for a, b in _PERMS)
+
+
+def band_keys(tokens: FrozenSet[str]) -> List[int]:
+    """One bucket key per band of the MinHash signature of `tokens`."""
+    signature = list(map(min, zip(*map(_token_hashes, tokens))))
+    return [hash((band, *signature[band * ROWS : (band + 1) * ROWS])) for band in range(BANDS)]
+
+
+class _UnionFind:
+    def __init__(self):
+        self.parent: Dict[int, int] = {}  # every id ever joined; roots point at themselves
+
+    def find(self, x: int) -> int:
+        root = x
+        while self.parent.get(root, root) != root:
+            root = self.parent[root]
+        while x != root:
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def union(self, a: int, b: int):
+        ra, rb = self.find(a), self.find(b)
+        self.parent.setdefault(ra, ra)
+        self.parent.setdefault(rb, rb)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+class SimilarityIndex:
+    """
+    MinHash/LSH index of links by title and channel, kept current by
+    LinkIndex next to the search index. Finding the near-duplicates of one
+    link only looks at the links sharing one of its BANDS buckets, not the
+    whole library. Links without a title (metadata pending) are indexed
+    when refresh() brings one.
+
+    Bulk loads (startup, a replica bootstrap) only defer() their ids; the
+    server drain()s them in slices once it is serving, so indexing the
+    whole library does not hold up startup.
+    """
+
+    def __init__(self):
+        # bucket key -> link id, or a set of ids once several share it
+        self.buckets: Dict[int, Union[int, Set[int]]] = {}
+        # link id -> its bucket keys (packed), to undo an insert
+        self.keys: Dict[int, bytes] = {}
+        self.backlog: Dict[int, None] = {}  # deferred link ids
+        self.version = 0
+        self._clustered: Optional[Tuple[Tuple[int, float], List[Tuple[List[int], float]]]] = None
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def defer(self, link_ids: Iterable[int]):
+        self.backlog.update(dict.fromkeys(link_ids))
+
+    def drain(self, lookup: Lookup, limit: int) -> int:
+        """Index up to `limit` deferred links; returns how many are left."""
+        backlog = self.backlog
+        for _ in range(min(limit, len(backlog))):
+            link = lookup(backlog.popitem()[0])
+            if link is not None:
+                self.add(link)
+        return len(backlog)
+
+    def add(self, link: "Link"):
+        self.backlog.pop(link.id, None)
+        tokens = shingles(link.title, link.author)
+        if len(tokens) < MIN_TOKENS:
+            return
+        keys = band_keys(tokens)
+        self.version += 1
+        self.keys[link.id] = array("q", keys).tobytes()
+        buckets = self.buckets
+        for key in keys:
+            ids = buckets.get(key)
+            if ids is None:
+                buckets[key] = link.id
+            elif isinstance(ids, set):
+                ids.add(link.id)
+            elif ids != link.id:
+                buckets[key] = {ids, link.id}
+
+    def remove(self, link_id: int):
+        self.backlog.pop(link_id, None)
+        packed = self.keys.pop(link_id, None)
+        if packed is None:
+            return
+        self.version += 1
+        buckets = self.buckets
+        for key in array("q", packed):
+            ids = buckets.get(key)
+            if ids == link_id:
+                del buckets[key]
+            elif isinstance(ids, set):
+                ids.discard(link_id)
+                if len(ids) == 1:
+                    buckets[key] = ids.pop()
+
+    def update(self, link: "Link"):
+        self.remove(link.id)
+        self.add(link)
+
+    def candidates(self, link: "Link") -> Set[int]:
+        """Ids sharing an LSH bucket with `link` as it is now (not necessarily indexed)."""
+        tokens = shingles(link.title, link.author)
+        if len(tokens) < MIN_TOKENS:
+            return set()
+        out: Set[int] = set()
+        for key in band_keys(tokens):
+            ids = self.buckets.get(key)
+            if isinstance(ids, set):
+                if len(ids) <= MAX_BUCKET:
+                    out |= ids
+            elif ids is not None:
+                out.add(ids)
+        out.discard(link.id)
+        return out
+
+    def similar(
+        self, link: "Link", lookup: Lookup, threshold: float = SIMILARITY, limit: int = 10
+    ) -> List[Tuple["Link", float]]:
+        """Verified near-duplicates of `link`, best first; `lookup` maps ids to links."""
+        tokens = shingles(link.title, link.author)
+        out = []
+        for other_id in self.candidates(link):
+            other = lookup(other_id)
+            if other is None or not durations_match(link.duration_seconds, other.duration_seconds):
+                continue
+            score = jaccard(tokens, shingles(other.title, other.author))
+            if score >= threshold:
+                out.append((other, score))
+        out.sort(key=lambda pair: (-pair[1], pair[0].id))
+        return out[:limit]
+
+    def clusters(
+        self, lookup: Lookup, threshold: float = SIMILARITY, only: Optional[Iterable[int]] = None
+    ) -> List[Tuple[List[int], float]]:
+        """
+        Groups of likely duplicates across the library as (ids oldest
+        first, lowest similarity among the pairs that joined them), largest
+        first; `only` keeps the groups containing one of those ids. Only
+        links sharing a bucket are compared. Safe to call from a thread:
+        it works on a copy of the buckets, and the result is kept until
+        the next add or remove.
+        """
+        version = self.version
+        cached = self._clustered
+        if cached is None or cached[0] != (version, threshold):
+            cached = self._clustered = ((version, threshold), self._group(lookup, threshold))
+        if only is None:
+            return cached[1]
+        wanted = set(only)
+        return [c for c in cached[1] if not wanted.isdisjoint(c[0])]
+
+    def _group(self, lookup: Lookup, threshold: float) -> List[Tuple[List[int], float]]:
+        shared = [tuple(ids) for ids in list(self.buckets.values()) if isinstance(ids, set) and len(ids) <= MAX_BUCKET]
+        tokens: Dict[int, FrozenSet[str]] = {}
+        groups = _UnionFind()
+        floor: Dict[int, float] = {}
+        rejected: Set[Tuple[int, int]] = set()
+        for ids in shared:
+            members = sorted(ids)
+            for i, a in enumerate(members):
+                for b in members[i + 1 :]:
+                    # pairs meet again in other bands; already joined is enough
+                    if (a, b) in rejected or groups.find(a) == groups.find(b):
+                        continue
+                    link_a, link_b = lookup(a), lookup(b)
+                    score = 0.0
+                    if (
+                        link_a is not None
+                        and link_b is not None
+                        and durations_match(link_a.duration_seconds, link_b.duration_seconds)
+                    ):
+                        for link in (link_a, link_b):
+                            if link.id not in tokens:
+                                tokens[link.id] = shingles(link.title, link.author)
+                        score = jaccard(tokens[a], tokens[b])
+                    if score < threshold:
+                        rejected.add((a, b))
+                        continue
+                    low = min(floor.pop(groups.find(a), 1.0), floor.pop(groups.find(b), 1.0), score)
+                    groups.union(a, b)
+                    floor[groups.find(a)] = low
+
+        members_of: Dict[int, List[int]] = {}
+        for link_id in groups.parent:
+            members_of.setdefault(groups.find(link_id), []).append(link_id)
+        out = [(sorted(ids), floor[root]) for root, ids in members_of.items()]
+        out.sort(key=lambda c: (-len(c[0]), c[0][0]))
+        return out
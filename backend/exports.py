@@ -0,0 +1,81 @@
+import asyncio
+import json
+import zlib
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    from .records import LinkRecord as Link
+    from .storage import AppState
+
+# Links serialized per chunk; the event loop gets a turn between chunks.
+CHUNK_LINKS = 256
+
+
+def select_links(state: "AppState", category: Optional[str] = None, tag: Optional[str] = None) -> Iterator["Link"]:
+    """Newest-first links matching the filters, read lazily so later chunks see current data."""
+    allowed = None
+    if category:
+        allowed = set(state.index.ids_in_category(category))
+    if tag:
+        tagged = state.index.ids_with_tag(tag)
+        allowed = set(tagged) if allowed is None else allowed & tagged
+    ids: List[int] = [lid for lid in reversed(state.index.by_id) if allowed is None or lid in allowed]
+    for lid in ids:
+        link = state.index.get(lid)
+        if link is not None:  # deleted while the export was running
+            yield link
+
+
+def link_json(link: "Link") -> str:
+    return json.dumps(link.to_dict(), ensure_ascii=False)
+
+
+def ytdlp_json(link: "Link") -> str:
+    return json.dumps(
+        {
+            "url": link.normalized_url,
+            "title": link.title,
+            "channel": link.author,
+            "duration": link.duration_seconds,
+            "categories": link.categories,
+            "tags": link.tags,
+        },
+        ensure_ascii=False,
+    )
+
+
+async def _chunks(links: Iterator["Link"], render: Callable[["Link"], str], sep: str) -> AsyncIterator[str]:
+    buf: List[str] = []
+    for link in links:
+        buf.append(render(link))
+        if len(buf) >= CHUNK_LINKS:
+            yield sep.join(buf)
+            buf = []
+            await asyncio.sleep(0)
+    if buf:
+        yield sep.join(buf)
+
+
+async def json_array(links: Iterator["Link"], render: Callable[["Link"], str], head: str, tail: str) -> AsyncIterator[str]:
+    """`head` + comma-separated rendered links + `tail`, e.g. '{"links":[' ... ']}'."""
+    yield head
+    first = True
+    async for chunk in _chunks(links, render, ","):
+        yield chunk if first else "," + chunk
+        first = False
+    yield tail
+
+
+async def lines(links: Iterator["Link"], render: Callable[["Link"], str]) -> AsyncIterator[str]:
+    """One rendered link per line (NDJSON or plain text)."""
+    async for chunk in _chunks(links, render, "\n"):
+        yield chunk + "\n"
+
+
+async def gzipped(chunks: AsyncIterator[str]) -> AsyncIterator[bytes]:
+    z = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    async for chunk in chunks:
+        out = z.compress(chunk.encode("utf-8"))
+        if out:
+            yield out
+    yield z.flush()
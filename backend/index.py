@@ -0,0 +1,198 @@
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set
+
+from .aggregates import CategoryStats
+from .dedupe import SimilarityIndex
+from .ordering import SortedLinks
+from .search import SearchIndex
+
+if TYPE_CHECKING:
+    from .records import LinkRecord as Link
+
+
+class LinkIndex:
+    """
+    The in-memory link store: id -> LinkRecord, normalized_url -> LinkRecord,
+    category -> ids, tag -> ids, metadata status / video type -> ids, plus the full-text index used by
+    /api/search, the pre-sorted lists behind GET /api/links and the
+    per-category aggregates behind GET /api/categories/stats and the
+    near-duplicate index behind GET /api/duplicates.
+
+    `by_id` is insertion ordered (oldest first) and is the source of truth
+    while the server runs; AppState serializes its `links` from it.
+    """
+
+    def __init__(self):
+        self.by_id: Dict[int, "Link"] = {}
+        self.by_url: Dict[str, "Link"] = {}
+        self.by_category: Dict[str, Set[int]] = {}
+        self.by_tag: Dict[str, Set[int]] = {}
+        self.by_status: Dict[str, Set[int]] = {}
+        self.by_video_type: Dict[str, Set[int]] = {}
+        self.text = SearchIndex()
+        self.order = SortedLinks()
+        self.stats = CategoryStats()
+        self.similar = SimilarityIndex()
+        self._newer: Optional[Set[int]] = None  # ids present when a backfill started
+
+    def rebuild(self, links: Iterable["Link"]):
+        """Index `links`, given newest-first as stored in snapshots."""
+        self.__init__()
+        self._insert_many(list(links)[::-1])
+
+    def backfill(self, links: List["Link"]):
+        """
+        Index `links` (newest first), all older than every link already
+        present: the rest of a snapshot hydrated after startup. by_id is
+        put back in oldest-first order by end_backfill().
+        """
+        if self._newer is None:
+            self._newer = set(self.by_id)
+        self._insert_many(links)
+        for link in links:
+            # the oldest link with a URL owns it, as after rebuild()
+            self.by_url[link.normalized_url] = link
+
+    def end_backfill(self):
+        if self._newer is None:
+            return
+        newer = [l for l in self.by_id.values() if l.id in self._newer]
+        older = [l for l in self.by_id.values() if l.id not in self._newer]
+        self.by_id = {l.id: l for l in reversed(older)}
+        self.by_id.update((l.id, l) for l in newer)
+        self._newer = None
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def links(self) -> Iterable["Link"]:
+        return self.by_id.values()
+
+    def ordered(self) -> List["Link"]:
+        """All links newest-first, the order snapshots store them in."""
+        return list(reversed(self.by_id.values()))
+
+    def get(self, link_id: int) -> Optional["Link"]:
+        return self.by_id.get(link_id)
+
+    def find_url(self, normalized_url: str) -> Optional["Link"]:
+        return self.by_url.get(normalized_url)
+
+    def ids_in_category(self, category: str) -> Set[int]:
+        return self.by_category.get(category, set())
+
+    def ids_with_tag(self, tag: str) -> Set[int]:
+        return self.by_tag.get(tag, set())
+
+    def ids_with_status(self, status: str) -> Set[int]:
+        return self.by_status.get(status, set())
+
+    def ids_with_video_type(self, video_type: str) -> Set[int]:
+        return self.by_video_type.get(video_type, set())
+
+    def last_added(self, category: str) -> Optional[int]:
+        """created_ms of the newest link in `category`."""
+        entry = self.order.last("created_at", category)
+        return entry[1] if entry else None
+
+    def add(self, link: "Link"):
+        self._insert(link)
+
+    def remove(self, link_id: int) -> Optional["Link"]:
+        link = self.by_id.pop(link_id, None)
+        if link is None:
+            return None
+        if self.by_url.get(link.normalized_url) is link:
+            del self.by_url[link.normalized_url]
+        self._unlink(self.by_category, link.id, link.categories)
+        self._unlink(self.by_tag, link.id, link.tags)
+        self._unlink(self.by_status, link.id, [link.metadata_status])
+        self._unlink(self.by_video_type, link.id, [link.video_type])
+        self.text.remove(link.id)
+        self.order.remove(link)
+        self.stats.remove(link.id)
+        self.similar.remove(link.id)
+        return link
+
+    def refresh(self, link: "Link"):
+        """Re-index searchable/sortable fields after metadata changed in place."""
+        if self.by_id.get(link.id) is not link:
+            return  # removed meanwhile; re-indexing would bring it back in the sub-indexes
+        self._relink(self.by_status, link.id, link.metadata_status)
+        self._relink(self.by_video_type, link.id, link.video_type)
+        self.text.update(link)
+        self.order.update(link)
+        self.stats.update(link)
+        self.similar.update(link)
+
+    def set_categories(self, link: "Link", categories: List[str], primary: Optional[str] = None):
+        old = list(link.categories)
+        self._unlink(self.by_category, link.id, link.categories)
+        link.categories = categories
+        if primary is not None:
+            link.primary_category = primary
+        self._link(self.by_category, link.id, link.categories)
+        self.text.update(link)
+        self.order.update(link, old_categories=old)
+        self.stats.update(link)
+
+    def set_status(self, link: "Link", status: str):
+        """Change `metadata_status` alone, e.g. to "fetching" while a fetch runs."""
+        link.metadata_status = status
+        if self.by_id.get(link.id) is link:
+            self._relink(self.by_status, link.id, status)
+
+    def set_tags(self, link: "Link", tags: List[str]):
+        self._unlink(self.by_tag, link.id, link.tags)
+        link.tags = tags
+        self._link(self.by_tag, link.id, link.tags)
+        self.text.update(link)
+
+    def _insert(self, link: "Link"):
+        self.by_id[link.id] = link
+        self.by_url.setdefault(link.normalized_url, link)
+        self._link(self.by_category, link.id, link.categories)
+        self._link(self.by_tag, link.id, link.tags)
+        self._link(self.by_status, link.id, [link.metadata_status])
+        self._link(self.by_video_type, link.id, [link.video_type])
+        self.text.update(link)
+        self.order.add(link)
+        self.stats.add(link)
+        self.similar.add(link)
+
+    def _insert_many(self, links: List["Link"]):
+        for link in links:
+            self.by_id[link.id] = link
+            self.by_url.setdefault(link.normalized_url, link)
+            self._link(self.by_category, link.id, link.categories)
+            self._link(self.by_tag, link.id, link.tags)
+            self._link(self.by_status, link.id, [link.metadata_status])
+            self._link(self.by_video_type, link.id, [link.video_type])
+            self.stats.add(link)
+        self.text.update_many(links)
+        self.order.add_many(links)
+        # the slowest index to build; filled in later, see SimilarityIndex
+        self.similar.defer(link.id for link in links)
+
+    @staticmethod
+    def _link(table: Dict[str, Set[int]], link_id: int, keys: Iterable[str]):
+        for key in keys or ():
+            if key is not None:  # e.g. a video type not known yet
+                table.setdefault(key, set()).add(link_id)
+
+    @staticmethod
+    def _unlink(table: Dict[str, Set[int]], link_id: int, keys: Iterable[str]):
+        for key in keys or ():
+            ids = table.get(key)
+            if ids is None:
+                continue
+            ids.discard(link_id)
+            if not ids:
+                del table[key]
+
+    @classmethod
+    def _relink(cls, table: Dict[str, Set[int]], link_id: int, key: Optional[str]):
+        """Move `link_id` to `key` in a one-value-per-link table (only a handful of keys)."""
+        if link_id in table.get(key, ()):
+            return
+        cls._unlink(table, link_id, [k for k, ids in table.items() if link_id in ids])
+        cls._link(table, link_id, [key])
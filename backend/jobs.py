@@ -0,0 +1,230 @@
+import asyncio
+import heapq
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+ACTIVE = ("waiting", "fetching")
+FINISHED = ("done", "failed")
+
+# How many finished jobs stay visible in /api/queue before the oldest are dropped.
+KEEP_DONE = 200
+KEEP_FAILED = 1000
+MAX_ATTEMPTS = 4
+RETRY_BASE = 5.0  # seconds; doubles per attempt
+RETRY_MAX = 600.0
+
+# Lower runs first: freshly pasted links, then retries, then the startup
+# backlog, then background refreshes of stale metadata.
+PRIORITY_NEW = 0
+PRIORITY_RETRY = 1
+PRIORITY_BACKLOG = 2
+PRIORITY_REFRESH = 3
+
+
+class Job:
+    __slots__ = (
+        "link_id",
+        "url",
+        "status",
+        "priority",
+        "attempts",
+        "next_eligible",
+        "updated_at",
+        "queued_at",
+        "error",
+        "_seq",
+    )
+
+    def __init__(self, link_id: int, url: Optional[str], priority: int):
+        self.link_id = link_id
+        self.url = url
+        self.status = "waiting"
+        self.priority = priority
+        self.attempts = 0
+        self.next_eligible = 0.0
+        self.updated_at = time.time()
+        self.queued_at = self.updated_at  # last (re)queue, for queue-wait metrics
+        self.error: Optional[str] = None
+        self._seq = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "link_id": self.link_id,
+            "url": self.url,
+            "status": self.status,
+            "priority": self.priority,
+            "attempts": self.attempts,
+            "next_eligible": self.next_eligible or None,
+            "error": self.error,
+        }
+
+
+class JobTable:
+    """
+    Metadata jobs keyed by link id. At most one job exists per link, so
+    enqueueing a link that is already waiting or fetching is a no-op.
+
+    Waiting jobs sit in a ready heap ordered by priority (lower runs first,
+    FIFO within a priority) or, while backing off, in a delayed heap ordered
+    by next_eligible. Stale heap entries (job re-armed or dropped) are
+    skipped lazily. Finished jobs are kept in recency order and trimmed to
+    KEEP_DONE / KEEP_FAILED.
+    """
+
+    def __init__(self, keep_done: int = KEEP_DONE, keep_failed: int = KEEP_FAILED):
+        self.jobs: Dict[int, Job] = {}
+        self.keep = {"done": keep_done, "failed": keep_failed}
+        self._finished: Dict[str, "OrderedDict[int, None]"] = {s: OrderedDict() for s in FINISHED}
+        self._ready: List[Tuple[int, int, int]] = []  # (priority, seq, link id)
+        self._delayed: List[Tuple[float, int, int]] = []  # (next_eligible, seq, link id)
+        self._seq = 0
+        self._counts = {s: 0 for s in ACTIVE + FINISHED}
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def get(self, link_id: int) -> Optional[Job]:
+        return self.jobs.get(link_id)
+
+    def enqueue(self, link_id: int, url: Optional[str] = None, priority: int = 0, delay: float = 0.0) -> bool:
+        """Queue `link_id`; False if it is already waiting or being fetched."""
+        job = self.jobs.get(link_id)
+        if job is not None and job.status in ACTIVE:
+            if job.status == "waiting" and priority < job.priority:
+                job.priority = priority
+                self._push(job)
+            return False
+        if job is None:
+            job = self.jobs[link_id] = Job(link_id, url, priority)
+            self._counts["waiting"] += 1
+        else:
+            self._set_status(job, "waiting")
+            job.url = url or job.url
+            job.priority = priority
+            job.attempts = 0
+            job.error = None
+        job.next_eligible = time.time() + delay if delay else 0.0
+        self._push(job)
+        return True
+
+    async def next(self) -> Job:
+        """Wait for the next eligible job and mark it fetching."""
+        while True:
+            now = time.time()
+            while self._delayed and self._delayed[0][0] <= now:
+                _, seq, link_id = heapq.heappop(self._delayed)
+                job = self.jobs.get(link_id)
+                if job is not None and job._seq == seq:
+                    heapq.heappush(self._ready, (job.priority, seq, link_id))
+            while self._ready:
+                _, seq, link_id = heapq.heappop(self._ready)
+                job = self.jobs.get(link_id)
+                if job is None or job.status != "waiting" or job._seq != seq:
+                    continue  # re-armed or dropped since it was pushed
+                self._set_status(job, "fetching")
+                return job
+            timeout = max(0.0, self._delayed[0][0] - now) if self._delayed else None
+            if self._wakeup is None:
+                self._wakeup = asyncio.Event()
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def finish(self, link_id: int, status: str, error: Optional[str] = None) -> List[int]:
+        """Mark a job done or failed; returns link ids dropped by retention."""
+        job = self.jobs.get(link_id)
+        if job is None:
+            return []
+        self._set_status(job, status)
+        job.error = error
+        job.next_eligible = 0.0
+        finished = self._finished[status]
+        finished[link_id] = None
+        dropped = []
+        while len(finished) > self.keep[status]:
+            old, _ = finished.popitem(last=False)
+            self._counts[status] -= 1
+            del self.jobs[old]
+            dropped.append(old)
+        return dropped
+
+    def retry(self, link_id: int, error: Optional[str] = None) -> bool:
+        """
+        Count a failed attempt. Reschedules with exponential backoff and
+        returns True, or returns False once MAX_ATTEMPTS is reached.
+        """
+        job = self.jobs.get(link_id)
+        if job is None:
+            return False
+        job.attempts += 1
+        job.error = error
+        if job.attempts >= MAX_ATTEMPTS:
+            return False
+        self._set_status(job, "waiting")
+        job.priority = max(job.priority, PRIORITY_RETRY)  # new links go ahead of retries
+        job.next_eligible = time.time() + min(RETRY_MAX, RETRY_BASE * 2 ** (job.attempts - 1))
+        self._push(job)
+        return True
+
+    def defer(self, link_id: int, delay: float) -> bool:
+        """Put a job back without counting an attempt (the endpoint, not the link, failed)."""
+        job = self.jobs.get(link_id)
+        if job is None:
+            return False
+        self._set_status(job, "waiting")
+        job.next_eligible = time.time() + delay
+        self._push(job)
+        return True
+
+    def discard(self, link_id: int) -> bool:
+        job = self.jobs.pop(link_id, None)
+        if job is None:
+            return False
+        self._counts[job.status] -= 1
+        if job.status in FINISHED:
+            self._finished[job.status].pop(link_id, None)
+        return True
+
+    def counts(self) -> Dict[str, int]:
+        return dict(self._counts)
+
+    def listing(self, limit: Optional[int] = None, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Active jobs first (fetching, then waiting in run order), then the most recent finished."""
+        statuses = (status,) if status else ("fetching", "waiting", "failed", "done")
+        out: List[Dict[str, Any]] = []
+        now = time.time()
+        for s in statuses:
+            if limit is not None and len(out) >= limit:
+                break
+            room = None if limit is None else limit - len(out)
+            if s in FINISHED:
+                ids = list(reversed(self._finished[s]))[:room]
+                jobs = [self.jobs[i] for i in ids]
+            else:
+                jobs = [j for j in self.jobs.values() if j.status == s]
+                if s == "waiting":
+                    key = lambda j: (j.next_eligible > now, j.priority, j.next_eligible, j._seq)
+                    jobs = sorted(jobs, key=key) if room is None else heapq.nsmallest(room, jobs, key=key)
+                jobs = jobs[:room]
+            out.extend(j.as_dict() for j in jobs)
+        return out
+
+    def _push(self, job: Job):
+        job.queued_at = time.time()
+        self._seq += 1
+        job._seq = self._seq
+        if job.next_eligible > time.time():
+            heapq.heappush(self._delayed, (job.next_eligible, job._seq, job.link_id))
+        else:
+            heapq.heappush(self._ready, (job.priority, job._seq, job.link_id))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _set_status(self, job: Job, status: str):
+        if job.status in FINISHED:
+            self._finished[job.status].pop(job.link_id, None)
+        self._counts[job.status] -= 1
+        self._counts[status] += 1
+        job.status = status
+        job.updated_at = time.time()
@@ -0,0 +1,107 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+# one encoder for every line: json.dumps() with options builds a new one per call
+_dumps = json.JSONEncoder(separators=(",", ":"), default=str).encode
+
+
+class Journal:
+    """
+    Append-only operation log kept next to the state snapshot.
+
+    Every entry is one JSON line carrying a monotonically increasing `seq`.
+    `append`/`append_many` write and fsync before returning. The server
+    instead splits the two: `encode` assigns seqs on the caller's thread
+    and `write` is done later, in batches, by a background writer.
+    Snapshots remember the last `seq` they include; replay skips
+    everything up to that point.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.seq = 0
+        self.pending = 0  # entries written since the last compaction
+        self._lock = threading.Lock()
+        self._fh = None
+
+    def read(self) -> List[Dict[str, Any]]:
+        """Return all complete entries, dropping a torn trailing line."""
+        if not self.path.exists():
+            return []
+        entries = []
+        valid_bytes = 0
+        with open(self.path, "rb") as f:
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break
+                try:
+                    entries.append(json.loads(raw))
+                except ValueError:
+                    break
+                valid_bytes += len(raw)
+        if valid_bytes != self.path.stat().st_size:
+            # crash mid-append: cut the partial record so new appends stay parseable
+            with open(self.path, "r+b") as f:
+                f.truncate(valid_bytes)
+        return entries
+
+    def open(self, seq: int, pending: int = 0):
+        with self._lock:
+            self.seq = seq
+            self.pending = pending
+            if self._fh is None:
+                self._fh = open(self.path, "a", encoding="utf-8")
+
+    def append(self, op: str, data: Dict[str, Any]) -> int:
+        return self.append_many([(op, data)])
+
+    def append_many(self, entries: List[Tuple[str, Dict[str, Any]]]) -> int:
+        """Append a batch of (op, data) entries with a single fsync."""
+        self.write(self.encode(entries))
+        return self.seq
+
+    def encode(self, entries: List[Tuple[str, Dict[str, Any]]]) -> List[str]:
+        """Assign seqs to a batch and return its lines, without touching the file."""
+        with self._lock:
+            lines = []
+            for op, data in entries:
+                self.seq += 1
+                entry = {"seq": self.seq, "op": op, **data}
+                lines.append(_dumps(entry) + "\n")
+            self.pending += len(lines)
+            return lines
+
+    def write(self, lines: List[str]):
+        """Append encoded lines (in seq order) with a single fsync."""
+        with self._lock:
+            if self._fh is None:
+                self._fh = open(self.path, "a", encoding="utf-8")
+            self._fh.write("".join(lines))
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+
+    def truncate_through(self, seq: int):
+        """Drop entries already covered by a snapshot taken at `seq`."""
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+            keep = [e for e in self.read() if e.get("seq", 0) > seq]
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                for e in keep:
+                    f.write(_dumps(e) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+            self.pending = len(keep)
+            self._fh = open(self.path, "a", encoding="utf-8")
+
+    def close(self):
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
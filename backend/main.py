@@ -1,34 +1,146 @@
 import asyncio
+import json
 import os
 import time
-from collections import deque
-from typing import List, Optional
+import traceback
+from typing import Any, Dict, List, Optional, Set
+from urllib.parse import parse_qsl
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 
 from datetime import datetime
 
-from .metadata import get_metadata_for_video
-from .storage import AppState, Link, load_state, save_state
-from .youtube_utils import normalize_youtube_url, extract_video_id_from_normalized_url
+from . import dedupe, metadata
+from .exports import gzipped, json_array, lines, link_json, select_links, ytdlp_json
+from .jobs import PRIORITY_BACKLOG, PRIORITY_NEW, PRIORITY_REFRESH
+from .metadata import EndpointUnavailable, get_metadata_for_video_async, oembed_health, video_info_health
+from .metadata_cache import MetadataCache
+from . import metrics
+from .metrics import RequestMetrics, queue_wait, ratelimit_wait, registry, search_latency
+from .ordering import SORT_KEYS, decode_cursor, encode_cursor
+from .ratelimit import RateLimiter
+from .refresh import TICK as REFRESH_TICK, RefreshScheduler
+from .respcache import ResponseCache, etag_matches, make_etag
+from .thumbs import AVATAR_WIDTH, GRID_WIDTH, ThumbCache
+from .records import LinkRecord
+from . import storage
+from .storage import AppState, load_state, record, record_many
+from .youtube_utils import normalize_youtube_url, normalize_many, extract_video_id_from_normalized_url
 
 app = FastAPI(title="LinkCascade")
 
 # Serve static assets (JS, CSS)
 app.mount("/static", StaticFiles(directory="frontend"), name="static")
 
-state: AppState = load_state()
+# a large binary snapshot finishes loading in the background, see hydrate()
+state: AppState = load_state(lazy=True)
+metadata_cache = MetadataCache()
+responses = ResponseCache()
+thumbs = ThumbCache()
 
-# Rate limit tracking
-per_second: deque = deque()
-per_minute: deque = deque()
-metadata_queue: asyncio.Queue[int] = asyncio.Queue()
-worker_task: Optional[asyncio.Task] = None
+rate_limiter = RateLimiter(state.config.rate_limit_per_second, state.config.rate_limit_per_minute)
+worker_tasks: Dict[int, asyncio.Task] = {}
+refresher = RefreshScheduler()
+refresh_task: Optional[asyncio.Task] = None
+hydrate_task: Optional[asyncio.Task] = None
+similar_task: Optional[asyncio.Task] = None
+loaded: Optional[asyncio.Event] = None
+load_error: Optional[str] = None
 
+registry.gauge("linkcascade_links", "Links in the library.", lambda: len(state.index))
+registry.gauge(
+    "linkcascade_jobs", "Metadata jobs by status.", lambda: {(k,): v for k, v in state.jobs.counts().items()}, ("status",)
+)
+registry.gauge("linkcascade_persist_pending", "Mutations staged but not yet written.", lambda: storage.writer().stats()["pending"])
+registry.gauge("linkcascade_ratelimit_scale", "Adaptive rate-limit scale (1 = configured rate).", lambda: rate_limiter.scale)
+registry.gauge("linkcascade_ratelimit_waiting", "Fetchers waiting for a token.", lambda: rate_limiter.waiting)
+registry.gauge(
+    "linkcascade_endpoint_open",
+    "1 while a metadata endpoint is backing off or its circuit is open.",
+    lambda: {(h.name,): int(h.retry_in() > 0) for h in (oembed_health, video_info_health)},
+    ("source",),
+)
+registry.gauge("linkcascade_refresh_backlog", "Startup backlog links not yet queued.", lambda: len(refresher.backlog))
+
+METADATA_FIELDS = {
+    "title",
+    "author",
+    "thumbnail_url",
+    "duration",
+    "duration_seconds",
+    "publish_date",
+    "video_type",
+    "channel_avatar",
+    "last_refreshed",
+    "metadata_status",
+}
+CATEGORY_FIELDS = {"categories", "primary_category"}
+DUPLICATE_FIELDS = {"id", "normalized_url", "title", "author", "thumbnail_url", "duration_seconds", "categories"}
+
+# links added to the duplicate index per loop turn after a bulk load
+SIMILAR_SLICE = 500
+
+# a filtered /api/links page sorts the matching ids when they are fewer than
+# 1/FILTER_WALK_RATIO of the listed scope, instead of walking the sorted list
+FILTER_WALK_RATIO = 8
+
+SSE_HEARTBEAT = 25.0
+SSE_COALESCE = 0.1
+
+# Served while the library is still loading; everything else waits for it.
+LOADING_PATHS = {"/", "/api/config", "/api/storage", "/api/ratelimit", "/api/metadata/health", "/metrics", "/api/metrics"}
+
+
+def _first_page(scope) -> bool:
+    """GET /api/links for a page of the newest links, which the first snapshot chunk covers."""
+    if scope["method"] != "GET":
+        return False
+    params = dict(parse_qsl(scope["query_string"].decode("latin-1")))
+    return (
+        set(params) <= {"limit", "sort", "order"}
+        and params.get("sort", "created_at") == "created_at"
+        and params.get("order", "desc") == "desc"
+    )
+
+
+def _needs_library(scope) -> bool:
+    path = scope["path"]
+    return not (
+        path in LOADING_PATHS
+        or path.startswith("/static/")
+        or path.startswith("/thumbs/")
+        or (path == "/api/links" and _first_page(scope))
+    )
+
+
+class LoadingGate:
+    """Holds requests that need the whole library until hydrate() is done."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] == "http"
+            and loaded is not None
+            and (not loaded.is_set() or load_error is not None)
+            and _needs_library(scope)
+        ):
+            await loaded.wait()
+            if load_error is not None:
+                # never serve (or snapshot) a partial library
+                response = PlainTextResponse(f"Library failed to load: {load_error}", status_code=503)
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+app.add_middleware(LoadingGate)
+app.add_middleware(RequestMetrics)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -53,89 +165,239 @@ class CategoryIn(BaseModel):
 class ConfigUpdate(BaseModel):
     rate_limit_per_second: Optional[int] = None
     rate_limit_per_minute: Optional[int] = None
+    metadata_workers: Optional[int] = None
+    metadata_max_age_days: Optional[float] = None
     duplicate_policy: Optional[str] = None
     category_order_strategy: Optional[str] = None
     default_category: Optional[str] = None
 
 
-async def respect_rate_limits():
-    now = time.time()
-    # Clean old timestamps
-    while per_second and now - per_second[0] > 1:
-        per_second.popleft()
-    while per_minute and now - per_minute[0] > 60:
-        per_minute.popleft()
+async def metadata_worker(slot: int):
+    while True:
+        if slot >= state.config.metadata_workers:
+            # pool was shrunk via /api/config; retire between jobs
+            return
+        backoff = oembed_health.retry_in()
+        if backoff > 0:
+            # primary endpoint is backing off or its circuit is open
+            await asyncio.sleep(backoff)
+            continue
+        job = await state.jobs.next()
+        queue_wait.observe(time.time() - job.queued_at, priority=str(job.priority))
+        link_id = job.link_id
+        link = state.index.get(link_id)
+        if not link:
+            state.jobs.discard(link_id)
+            continue
 
-    if len(per_second) >= state.config.rate_limit_per_second:
-        await asyncio.sleep(0.05)
-        return await respect_rate_limits()
+        # a background refresh keeps showing the metadata it already has
+        refreshing = link.metadata_status == "done"
+        if not refreshing:
+            # transient; only the outcome below is journaled
+            state.index.set_status(link, "fetching")
+            state.changes.touch("link", link_id)
+        state.changes.touch("queue", link_id)
 
-    if len(per_minute) >= state.config.rate_limit_per_minute:
-        await asyncio.sleep(0.1)
-        return await respect_rate_limits()
+        try:
+            vid = extract_video_id_from_normalized_url(link.normalized_url)
+            # off the loop: a bulk request's lookup_many may hold the cache lock
+            cache_status, meta = await asyncio.to_thread(metadata_cache.lookup, vid)
+            if cache_status == "negative":
+                meta = {}
+            elif cache_status != "hit":
+                with ratelimit_wait.time():
+                    await rate_limiter.acquire()
+                meta = await get_metadata_for_video_async(link.original_url, link.normalized_url)
+                rate_limiter.reward()
+                metadata_cache.put(vid, meta)
+            if _dropped(link):
+                continue
+            _apply_metadata(link, meta)
+            if not refreshing and state.index.similar.similar(link, state.index.get, limit=1):
+                # the title is rarely known when a link is added: the warning goes out now
+                state.changes.touch("similar", link_id)
+            _finish_job(link_id, "done")
+        except EndpointUnavailable as e:
+            if _dropped(link):
+                continue
+            # not the link's fault: requeue without spending an attempt
+            state.jobs.defer(link_id, max(1.0, e.retry_in))
+            if not refreshing:
+                state.index.set_status(link, "pending")
+                state.changes.touch("link", link_id)
+            state.changes.touch("queue", link_id)
+            continue
+        except Exception as e:
+            if _dropped(link):
+                continue
+            if state.jobs.retry(link_id, error=str(e) or type(e).__name__):
+                # back off and try again; the link stays pending meanwhile
+                if not refreshing:
+                    state.index.set_status(link, "pending")
+                    state.changes.touch("link", link_id)
+                state.changes.touch("queue", link_id)
+                continue
+            if not refreshing:
+                state.index.set_status(link, "failed")
+            # counts as an attempt, so the refresh scheduler waits a full max age
+            link.last_refreshed = datetime.utcnow()
+            refresher.note(link)
+            _finish_job(link_id, "failed", error=str(e) or type(e).__name__)
+        state.changes.touch("link", link_id)
+        record(state, "metadata_merged", id=link.id, fields=link.to_dict(METADATA_FIELDS))
 
-    per_second.append(now)
-    per_minute.append(now)
 
+def _dropped(link: LinkRecord) -> bool:
+    """
+    True if `link` was deleted while its fetch was awaited: the result is
+    discarded instead of re-indexing (and resurrecting) a link that is gone.
+    """
+    if state.index.get(link.id) is link:
+        return False
+    if state.jobs.discard(link.id):
+        state.changes.touch("queue", link.id, deleted=True)
+    return True
+
+
+def _apply_metadata(link: LinkRecord, meta: Dict[str, Any], status: str = "done"):
+    _merge_metadata(link, meta, status)
+    state.index.refresh(link)
+    refresher.note(link)
+    _prefetch_images(link)
+
+
+def _merge_metadata(link: LinkRecord, meta: Dict[str, Any], status: str):
+    link.title = meta.get("title") or link.title
+    link.author = meta.get("author") or link.author
+    link.thumbnail_url = meta.get("thumbnail_url") or link.thumbnail_url
+    link.duration = meta.get("duration") or link.duration
+    link.duration_seconds = meta.get("duration_seconds") or link.duration_seconds
+    link.publish_date = meta.get("publish_date") or link.publish_date
+    link.video_type = meta.get("video_type") or link.video_type
+    link.channel_avatar = meta.get("channel_avatar") or link.channel_avatar
+    link.last_refreshed = datetime.utcnow()
+    link.metadata_status = status
+
+
+def _prefetch_images(link: LinkRecord):
+    """Warm the thumbnail cache in the background so the grid never waits on the CDN."""
+    vid = extract_video_id_from_normalized_url(link.normalized_url)
+    if not vid:
+        return
+    thumbs.remember(vid, link.thumbnail_url, link.channel_avatar)
+    for url, width in ((thumbs.source_url(vid, "thumb"), GRID_WIDTH), (link.channel_avatar, AVATAR_WIDTH)):
+        thumbs.prefetch(url, width)
 
-async def metadata_worker():
-    while True:
-        link_id = await metadata_queue.get()
-        link = next((l for l in state.links if l.id == link_id), None)
-        if not link:
-            continue
 
-        link.metadata_status = "fetching"
-        _update_queue_status(link_id, "fetching")
-        save_state(state)
+def _finish_job(link_id: int, status: str, error: Optional[str] = None):
+    state.changes.touch("queue", link_id)
+    for dropped in state.jobs.finish(link_id, status, error=error):
+        state.changes.touch("queue", dropped, deleted=True)
 
-        await respect_rate_limits()
 
+def _enqueue(link: LinkRecord, priority: int = PRIORITY_NEW):
+    if state.jobs.enqueue(link.id, link.normalized_url, priority=priority):
+        state.changes.touch("queue", link.id)
+
+
+def _ensure_workers():
+    """Grow the fetch pool to config.metadata_workers; surplus workers retire themselves."""
+    for slot, task in list(worker_tasks.items()):
+        if task.done():
+            del worker_tasks[slot]
+    for slot in range(max(1, state.config.metadata_workers)):
+        if slot not in worker_tasks:
+            worker_tasks[slot] = asyncio.create_task(metadata_worker(slot))
+
+
+async def refresh_loop():
+    """Queue backlog and stale-metadata refreshes from spare rate-limit capacity only."""
+    last = time.monotonic()
+    while True:
+        await asyncio.sleep(REFRESH_TICK)
+        now = time.monotonic()
+        elapsed, last = now - last, now
+        # keep the low-priority share of the queue shallow; pasted links always go first anyway
+        workers = max(1, state.config.metadata_workers)
+        budget = min(rate_limiter.spare(), workers) - state.jobs.counts()["waiting"]
+        if budget <= 0 or oembed_health.retry_in() > 0:
+            budget = 0
+        backlog, stale = refresher.take(state.index, budget, state.config.metadata_max_age_days * 86400, elapsed)
+        for link in backlog:
+            _enqueue(link, PRIORITY_BACKLOG)
+        for link in stale:
+            _enqueue(link, PRIORITY_REFRESH)
+
+
+async def hydrate():
+    """
+    Index the rest of a lazily loaded snapshot, a chunk at a time so the
+    loop keeps serving, then start the background work that needs every link.
+    """
+    global load_error
+    pending = storage.hydration
+    if pending is not None:
         try:
-            meta = await asyncio.get_event_loop().run_in_executor(
-                None, get_metadata_for_video, link.original_url, link.normalized_url
-            )
-            link.title = meta.get("title") or link.title
-            link.author = meta.get("author") or link.author
-            link.thumbnail_url = meta.get("thumbnail_url") or link.thumbnail_url
-            link.duration = meta.get("duration") or link.duration
-            link.duration_seconds = meta.get("duration_seconds") or link.duration_seconds
-            link.publish_date = meta.get("publish_date") or link.publish_date
-            link.video_type = meta.get("video_type") or link.video_type
-            link.channel_avatar = meta.get("channel_avatar") or link.channel_avatar
-            link.last_refreshed = datetime.utcnow()
-            link.metadata_status = "done"
-            _update_queue_status(link_id, "done")
-        except Exception:
-            link.metadata_status = "failed"
-            _update_queue_status(link_id, "failed")
-        finally:
-            save_state(state)
-            metadata_queue.task_done()
+            while True:
+                links = await asyncio.to_thread(pending.next_chunk)
+                if links is None:
+                    break
+                state.index.backfill(links)
+        except Exception as e:
+            traceback.print_exc()
+            load_error = repr(e)
+            loaded.set()
+            return
+        state.index.end_backfill()
+        pending.finish()
+        print(f"[storage] loaded {len(state.index)} links in {pending.seconds:.2f}s")
+    for l in state.index.links():
+        thumbs.remember(extract_video_id_from_normalized_url(l.normalized_url), l.thumbnail_url, l.channel_avatar)
+    # the job table is not persisted: links left pending/failed are fed back
+    # in by the refresh scheduler at the rate the limiter allows
+    refresher.load(state.index.links())
+    loaded.set()
+    _ensure_workers()
+    global refresh_task
+    refresh_task = asyncio.create_task(refresh_loop())
+    _similar_indexed()
 
 
-def _update_queue_status(link_id: int, status: str):
-    for item in state.queue:
-        if item.get("link_id") == link_id:
-            item["status"] = status
-            break
+async def index_similar():
+    """Add bulk-loaded links to the duplicate index, a slice at a time so the loop keeps serving."""
+    while state.index.similar.drain(state.index.get, SIMILAR_SLICE):
+        await asyncio.sleep(0)
+
+
+def _similar_indexed() -> asyncio.Task:
+    global similar_task
+    if similar_task is None or similar_task.done():
+        similar_task = asyncio.create_task(index_similar())
+    return similar_task
 
 
 @app.on_event("startup")
 async def startup_event():
-    global worker_task
-    # hydrate queue from pending links
-    for l in state.links:
-        if l.metadata_status in {"pending", "failed"}:
-            await metadata_queue.put(l.id)
-            state.queue.append({"link_id": l.id, "status": "waiting", "url": l.normalized_url})
-    worker_task = asyncio.create_task(metadata_worker())
+    global hydrate_task, loaded
+    loaded = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    metadata.throttle_hooks.append(lambda: loop.call_soon_threadsafe(rate_limiter.penalize))
+    hydrate_task = asyncio.create_task(hydrate())
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    if worker_task:
-        worker_task.cancel()
+    metadata.throttle_hooks.clear()
+    for task in (hydrate_task, similar_task):
+        if task is not None:
+            task.cancel()
+    for task in worker_tasks.values():
+        task.cancel()
+    if refresh_task is not None:
+        refresh_task.cancel()
+    thumbs.stop_prefetch()
+    # anything recorded but not yet written goes to disk before exit
+    await asyncio.to_thread(storage.close_storage)
 
 
 @app.get("/")
@@ -144,12 +406,12 @@ def serve_index():
 
 
 @app.get("/api/draft")
-def get_draft():
-    return state
+async def get_draft(request: Request):
+    return responses.respond(request, ("draft",), state.changes.rev, lambda: state)
 
 
 @app.post("/api/categories")
-def add_category(payload: CategoryIn):
+async def add_category(payload: CategoryIn):
     name = payload.name.strip()
     if not name:
         raise HTTPException(400, "Name required")
@@ -157,156 +419,660 @@ def add_category(payload: CategoryIn):
         state.categories.append(name)
     if payload.pinned and name not in state.config.pinned_categories:
         state.config.pinned_categories.append(name)
-    save_state(state)
+        state.changes.touch("config")
+        record(state, "config_updated", config=state.config.model_dump(mode="json"))
+    state.changes.touch("categories")
+    record(state, "categories_updated", categories=list(state.categories))
     return {"ok": True, "categories": state.categories}
 
 
+@app.get("/api/categories/stats")
+async def category_stats(request: Request):
+    """
+    Per-category counts, shorts/normal split, total duration and last-added
+    time, plus the categories already sorted by the configured strategy.
+    Maintained incrementally by the index; nothing here scans the links.
+    """
+    changes = state.changes
+    revision = max(changes.kind_rev("link"), changes.kind_rev("categories"), changes.kind_rev("config"))
+
+    def build():
+        # categories that only exist on links are listed after the known ones
+        known = set(state.categories)
+        extra = [cat for cat in state.index.stats.by_category if cat not in known]
+        summary = state.index.stats.summary(
+            state.categories + extra,
+            state.config.category_order_strategy,
+            state.config.pinned_categories,
+            state.index.last_added,
+        )
+        return {"total": len(state.index), **summary}
+
+    return responses.respond(request, ("category_stats",), revision, build)
+
+
 @app.post("/api/config")
-def update_config(payload: ConfigUpdate):
+async def update_config(payload: ConfigUpdate):
     if payload.rate_limit_per_second:
         state.config.rate_limit_per_second = payload.rate_limit_per_second
     if payload.rate_limit_per_minute:
         state.config.rate_limit_per_minute = payload.rate_limit_per_minute
+    rate_limiter.configure(state.config.rate_limit_per_second, state.config.rate_limit_per_minute)
+    if payload.metadata_workers:
+        state.config.metadata_workers = payload.metadata_workers
+        _ensure_workers()
+    if payload.metadata_max_age_days is not None:
+        state.config.metadata_max_age_days = max(0.0, payload.metadata_max_age_days)
     if payload.duplicate_policy:
         state.config.duplicate_policy = payload.duplicate_policy
     if payload.category_order_strategy:
         state.config.category_order_strategy = payload.category_order_strategy
     if payload.default_category:
         state.config.default_category = payload.default_category
-    save_state(state)
+    state.changes.touch("config")
+    record(state, "config_updated", config=state.config.model_dump(mode="json"))
     return state.config
 
 
 @app.get("/api/config")
-def get_config():
-    return state.config
+async def get_config(request: Request):
+    return responses.respond(request, ("config",), state.changes.kind_rev("config"), lambda: state.config)
 
 
-@app.post("/api/links")
-async def add_link(body: LinkIn):
-    norm = normalize_youtube_url(body.url)
-    if not norm:
-        raise HTTPException(400, "Invalid YouTube URL")
-
-    existing = next((l for l in state.links if l.normalized_url == norm), None)
+def _ingest(
+    norm: str,
+    original_url: str,
+    category: str,
+    tags: Optional[List[str]],
+    allow_duplicate: bool,
+    ops: List[tuple],
+    cached: Optional[Dict[str, tuple]] = None,
+):
+    """
+    Add one normalized URL to the library, appending its journal ops to
+    `ops`. Returns (outcome, link) with outcome "added", "duplicate"
+    (existing link, category attached if missing) or "blocked". `cached`
+    holds metadata cache lookups done up front for a batch.
+    """
+    index = state.index
+    existing = index.find_url(norm)
     if existing:
-        if body.category in existing.categories and state.config.duplicate_policy == "block_category" and not body.allow_duplicate:
-            raise HTTPException(409, "Duplicate in this category")
-        if body.category not in existing.categories:
-            existing.categories.append(body.category)
+        if category in existing.categories and state.config.duplicate_policy == "block_category" and not allow_duplicate:
+            return "blocked", existing
+        changed = False
+        if category not in existing.categories:
+            index.set_categories(existing, [*existing.categories, category])
+            changed = True
         if not existing.primary_category:
-            existing.primary_category = body.category
-        save_state(state)
-        return {"link": existing, "duplicate": True}
+            existing.primary_category = category
+            changed = True
+        if changed:
+            state.changes.touch("link", existing.id)
+            ops.append(("category_changed", {"id": existing.id, "fields": existing.to_dict(CATEGORY_FIELDS)}))
+        return "duplicate", existing
 
-    link = Link(
+    link = LinkRecord(
         id=state.next_id,
-        original_url=body.url,
+        original_url=original_url,
         normalized_url=norm,
-        categories=[body.category],
-        primary_category=body.category,
-        tags=body.tags or [],
+        categories=[category],
+        primary_category=category,
+        tags=tags or [],
     )
 
-    state.links.insert(0, link)
+    vid = extract_video_id_from_normalized_url(norm)
+    found = cached.get(vid) if cached is not None and vid else None
+    cache_status, meta = found or metadata_cache.lookup(vid)
+    if cache_status in ("hit", "stale"):
+        # known video: filled in before it is indexed; a stale one is shown now and refetched
+        _merge_metadata(link, meta, "done" if cache_status == "hit" else "pending")
+    index.add(link)
     state.next_id += 1
-    state.queue.append({"link_id": link.id, "status": "waiting", "url": norm})
-    await metadata_queue.put(link.id)
-    save_state(state)
-    return {"link": link, "duplicate": False}
+    if cache_status in ("hit", "stale"):
+        refresher.note(link)
+        _prefetch_images(link)
+    if cache_status != "hit":
+        _enqueue(link)
+    state.changes.touch("link", link.id)
+    ops.append(("link_added", {"link": link.to_dict()}))
+    return "added", link
+
+
+@app.post("/api/links")
+async def add_link(body: LinkIn):
+    norm = normalize_youtube_url(body.url)
+    if not norm:
+        raise HTTPException(400, "Invalid YouTube URL")
+
+    cached = None
+    vid = extract_video_id_from_normalized_url(norm)
+    if vid and not state.index.find_url(norm):
+        cached = {vid: await asyncio.to_thread(metadata_cache.lookup, vid)}
+    ops: List[tuple] = []
+    outcome, link = _ingest(norm, body.url, body.category, body.tags, body.allow_duplicate, ops, cached)
+    if outcome == "blocked":
+        raise HTTPException(409, "Duplicate in this category")
+    record_many(state, ops)
+    similar = _similar(link) if outcome == "added" else []
+    if similar:
+        state.changes.touch("similar", link.id)
+    return {"link": link.to_model(), "duplicate": outcome == "duplicate", "similar": similar}
+
+
+def _similar(link: LinkRecord, limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    Likely re-uploads of `link` already in the library. Needs its title, so
+    on add only a metadata cache hit has any; right after startup, links
+    still waiting in the duplicate index's backlog are not matched yet.
+    """
+    return [
+        {**other.to_dict(DUPLICATE_FIELDS), "score": round(score, 3)}
+        for other, score in state.index.similar.similar(link, state.index.get, limit=limit)
+    ]
+
+
+BULK_CHUNK = 500
+_ndjson = json.JSONEncoder(ensure_ascii=False).encode  # reused: one row per URL
+
+
+def _check_bulk_payload(payload: Any):
+    """400 unless `payload` is a JSON bulk body: the fields are used as they are."""
+    if not isinstance(payload, dict):
+        raise HTTPException(400, "Expected a JSON object")
+    for name in ("urls", "tags"):
+        values = payload.get(name)
+        if values is not None and (not isinstance(values, list) or not all(isinstance(v, str) for v in values)):
+            raise HTTPException(400, f"{name} must be a list of strings")
+    for name in ("category", "text"):
+        if not isinstance(payload.get(name) or "", str):
+            raise HTTPException(400, f"{name} must be a string")
+    if not isinstance(payload.get("allow_duplicate", False), bool):
+        raise HTTPException(400, "allow_duplicate must be true or false")
+
+
+@app.post("/api/links/bulk")
+async def add_links_bulk(request: Request, category: str = "", allow_duplicate: bool = False):
+    """
+    Ingest many URLs in one pass. Accepts JSON {"urls": [...], "category": ...}
+    or pasted text with ?category= (links are picked out of the text, so prose
+    around them is fine). Streams one NDJSON outcome per
+    URL (added / duplicate / invalid) and a final summary once the batch has
+    been journaled. Each chunk is recorded before it is sent.
+    """
+    # The body is read up front: once the response starts streaming, Starlette
+    # listens on the same receive channel for client disconnects.
+    tags = None
+    if request.headers.get("content-type", "").startswith("application/json"):
+        try:
+            payload = await request.json()
+        except ValueError:
+            raise HTTPException(400, "Invalid JSON")
+        _check_bulk_payload(payload)
+        category = payload.get("category") or category
+        tags = payload.get("tags")
+        allow_duplicate = payload.get("allow_duplicate", allow_duplicate)
+        urls = [(raw, normalize_youtube_url(raw)) for raw in payload.get("urls") or []]
+        urls += normalize_many(payload.get("text") or "")
+    else:
+        urls = normalize_many((await request.body()).decode("utf-8", errors="replace"))
+    category = (category or state.config.default_category).strip()
+    if category not in state.categories:
+        state.categories.append(category)
+        state.changes.touch("categories")
+        record(state, "categories_updated", categories=list(state.categories))
+
+    async def run():
+        ops: List[tuple] = []
+        counts = {"added": 0, "duplicate": 0, "invalid": 0}
+        lines: List[str] = []
+        # one cache query per LOOKUP_BATCH new videos instead of one per URL
+        new = [extract_video_id_from_normalized_url(n) for _, n in urls if n and not state.index.find_url(n)]
+        cached = await asyncio.to_thread(metadata_cache.lookup_many, new)
+        for raw, norm in urls:
+            if not norm:
+                outcome, link = "invalid", None
+            else:
+                outcome, link = _ingest(norm, raw, category, tags, allow_duplicate, ops, cached)
+                if outcome == "blocked":
+                    outcome = "duplicate"
+            counts[outcome] += 1
+            row = {"url": raw, "status": outcome}
+            if link is not None:
+                row["id"] = link.id
+            if outcome == "added":
+                similar = state.index.similar.similar(link, state.index.get, limit=5)
+                if similar:
+                    row["similar"] = [other.id for other, _ in similar]
+                    state.changes.touch("similar", link.id)
+            lines.append(_ndjson(row))
+            if len(lines) >= BULK_CHUNK:
+                # before yielding: a snapshot taken meanwhile must not hold unjournaled links
+                record_many(state, ops)
+                ops = []
+                yield "\n".join(lines) + "\n"
+                lines = []
+                await asyncio.sleep(0)  # let other requests and the workers in
+        record_many(state, ops)
+        await asyncio.to_thread(metadata_cache.flush_touches)
+        lines.append(json.dumps({"summary": counts, "committed": True}))
+        yield "\n".join(lines) + "\n"
+
+    return StreamingResponse(run(), media_type="application/x-ndjson")
 
 
 @app.patch("/api/links/{id}/category")
 async def change_category(id: int, category: str):
-    link = next((l for l in state.links if l.id == id), None)
+    link = state.index.get(id)
     if not link:
         raise HTTPException(404)
-    if category not in link.categories:
-        link.categories.append(category)
-    link.primary_category = category
-    save_state(state)
-    return link
+    categories = link.categories if category in link.categories else [*link.categories, category]
+    state.index.set_categories(link, categories, primary=category)
+    state.changes.touch("link", id)
+    record(state, "category_changed", id=link.id, fields=link.to_dict(CATEGORY_FIELDS))
+    return link.to_model()
 
 
 @app.patch("/api/links/{id}/tags")
 async def update_tags(id: int, payload: dict):
-    link = next((l for l in state.links if l.id == id), None)
+    link = state.index.get(id)
     if not link:
         raise HTTPException(404)
-    link.tags = payload.get("tags", [])
-    save_state(state)
-    return link
+    state.index.set_tags(link, payload.get("tags", []))
+    state.changes.touch("link", id)
+    record(state, "tags_updated", id=link.id, fields={"tags": list(link.tags)})
+    return link.to_model()
+
+
+def _delta(since: int) -> Dict[str, Any]:
+    """JSON-ready changes after revision `since`, or {"full": True} if too old."""
+    rev = state.changes.rev
+    changed = state.changes.changes_since(since)
+    if changed is None:
+        return {"revision": rev, "full": True}
+    links: List[Dict[str, Any]] = []
+    deleted: List[int] = []
+    queue_ids: List[int] = []
+    out: Dict[str, Any] = {"revision": rev, "full": False, "links": links, "deleted_links": deleted}
+    for kind, key, is_deleted in changed:
+        if kind == "link":
+            link = None if is_deleted else state.index.get(key)
+            if link is None:
+                deleted.append(key)
+            else:
+                links.append(link.to_dict())
+        elif kind == "queue":
+            queue_ids.append(key)
+        elif kind == "similar":
+            link = state.index.get(key)
+            if link is not None:
+                out.setdefault("similar", {})[key] = _similar(link, 5)
+        elif kind == "categories":
+            out["categories"] = state.categories
+        elif kind == "config":
+            out["config"] = state.config.model_dump(mode="json")
+    if queue_ids:
+        jobs = [state.jobs.get(i) for i in queue_ids]
+        out["queue"] = [job.as_dict() for job in jobs if job is not None]
+        out["deleted_queue"] = [i for i, job in zip(queue_ids, jobs) if job is None]
+        out["queue_counts"] = state.jobs.counts()
+    return out
+
+
+@app.get("/api/changes")
+async def get_changes(since: int):
+    return _delta(since)
+
+
+@app.get("/api/events")
+async def change_events(request: Request, since: Optional[int] = None):
+    """
+    Server-Sent Events push of the same deltas as /api/changes. Idle
+    connections only see a heartbeat comment every SSE_HEARTBEAT seconds.
+    """
+    last_id = request.headers.get("last-event-id", "")
+    cursor = int(last_id) if last_id.isdigit() else (since if since is not None else state.changes.rev)
+
+    async def stream():
+        nonlocal cursor
+        yield "retry: 3000\n\n"
+        while True:
+            if not await state.changes.wait(cursor, SSE_HEARTBEAT):
+                yield ": ping\n\n"
+                continue
+            # let a burst (bulk paste, worker batch) land in a single event
+            await asyncio.sleep(SSE_COALESCE)
+            delta = _delta(cursor)
+            cursor = delta["revision"]
+            yield f"id: {cursor}\ndata: {json.dumps(delta, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.get("/api/queue")
-def queue_status():
-    return state.queue
+async def queue_status(request: Request, summary: bool = False, status: Optional[str] = None, limit: int = 500):
+    """Jobs in run order, most recent finished last; ?summary=1 returns only counts."""
+    limit = max(1, min(limit, 5000))
 
+    def build():
+        if summary:
+            return {"counts": state.jobs.counts()}
+        return {"counts": state.jobs.counts(), "jobs": state.jobs.listing(limit, status=status)}
 
-@app.get("/api/search")
-def advanced_search(q: str = "", category: str = "", tag: str = ""):
-    res = []
-    query = q.lower()
-    for l in state.links:
-        if category and category not in l.categories:
-            continue
-        if tag and tag not in (l.tags or []):
+    return responses.respond(request, ("queue", summary, status, limit), state.changes.kind_rev("queue"), build)
+
+
+@app.get("/api/links")
+async def list_links(
+    sort: str = "created_at",
+    order: str = "desc",
+    category: str = "",
+    tag: str = "",
+    video_type: str = "",
+    metadata_status: str = "",
+    limit: int = 50,
+    cursor: Optional[str] = None,
+):
+    """
+    One page of links from the pre-sorted indexes. Pass the returned
+    `next_cursor` back to continue; missing values sort last either way.
+    """
+    if sort not in SORT_KEYS:
+        raise HTTPException(400, f"sort must be one of {', '.join(SORT_KEYS)}")
+    limit = max(1, min(limit, 500))
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, sort)
+        except Exception:
+            raise HTTPException(400, "Invalid cursor")
+
+    index = state.index
+    matching: Optional[Set[int]] = None
+    filters = [
+        (tag, index.ids_with_tag),
+        (video_type, index.ids_with_video_type),
+        (metadata_status, index.ids_with_status),
+    ]
+    for value, ids_for in filters:
+        if value:
+            ids = ids_for(value)
+            matching = set(ids) if matching is None else matching & ids
+    total = index.order.size(category)
+    descending = order == "desc"
+    if matching is None:
+        entries = index.order.walk(sort, scope=category, descending=descending, after=after)
+        if storage.hydration is not None and not category:
+            total = storage.hydration.total  # first page while the rest is still loading
+    else:
+        if category:
+            matching &= index.ids_in_category(category)
+        total = len(matching)
+        if total * FILTER_WALK_RATIO < index.order.size(category):
+            # few matches: sort just them rather than walk past everything else
+            entries = index.order.walk_ids(sort, matching, descending=descending, after=after)
+        else:
+            entries = (
+                e
+                for e in index.order.walk(sort, scope=category, descending=descending, after=after)
+                if e[2] in matching
+            )
+
+    items: List[LinkRecord] = []
+    last = None
+    more = False
+    for entry in entries:
+        link = index.get(entry[2])
+        if link is None:
             continue
-        text = " ".join(
-            [
-                l.title or "",
-                l.author or "",
-                l.normalized_url,
-                " ".join(l.tags or []),
-                " ".join(l.categories or []),
-            ]
-        ).lower()
-        if query in text:
-            res.append(l)
-    return {"results": res, "count": len(res)}
+        if len(items) == limit:
+            more = True
+            break
+        items.append(link)
+        last = entry
+    return {
+        "items": [link.to_model() for link in items],
+        "next_cursor": encode_cursor(last) if more and last is not None else None,
+        "total": total,
+    }
+
+
+@app.get("/api/ratelimit")
+async def rate_limit_status():
+    return rate_limiter.snapshot()
+
+
+@app.get("/thumbs/{video_id}")
+@app.get("/thumbs/{video_id}/{kind}")
+async def thumbnail(request: Request, video_id: str, kind: str = "thumb", w: Optional[int] = None):
+    """
+    Cached thumbnail (or channel avatar with /avatar) for a video, fetched
+    from YouTube at most once and optionally downscaled to width `w`.
+    """
+    if kind not in ("thumb", "avatar") or not video_id.replace("-", "").replace("_", "").isalnum():
+        raise HTTPException(404)
+    url = thumbs.source_url(video_id, kind)
+    found = await thumbs.get(url, w) if url else None
+    if found is None:
+        raise HTTPException(404)
+    path, media_type, sha = found
+    headers = {"Cache-Control": "public, max-age=604800", "ETag": f'"{sha}"'}
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=media_type, headers=headers)
+
+
+@app.get("/api/thumbs")
+async def thumb_cache_stats():
+    return thumbs.stats()
+
+
+@app.get("/api/metadata/health")
+async def metadata_health():
+    return {
+        "oembed": oembed_health.snapshot(),
+        "get_video_info": video_info_health.snapshot(),
+        "rate_limit_scale": round(rate_limiter.scale, 3),
+    }
+
+
+@app.get("/api/respcache")
+async def response_cache_stats():
+    return responses.stats()
+
+
+@app.get("/api/refresh")
+async def refresh_stats():
+    return refresher.stats(state.config.metadata_max_age_days * 86400)
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/metrics")
+async def metrics_summary():
+    """The /metrics series as JSON: counters, gauges, and per-series count/avg/p50/p95/p99."""
+    return registry.summary()
+
+
+@app.post("/api/profile")
+async def sample_profile(seconds: float = 10.0, interval_ms: float = 5.0):
+    """
+    Sample all thread stacks for `seconds` and return collapsed stacks
+    (flamegraph.pl / speedscope). Only with LINKCASCADE_PROFILING=1.
+    """
+    if not metrics.PROFILING:
+        raise HTTPException(404, "Profiling is disabled; start with LINKCASCADE_PROFILING=1")
+    try:
+        text, samples = await asyncio.to_thread(
+            metrics.sample_profile, max(0.1, seconds), max(0.001, interval_ms / 1000)
+        )
+    except RuntimeError as e:
+        raise HTTPException(409, str(e))
+    name = f"profile-{int(time.time())}.txt"
+    headers = {"Content-Disposition": f'attachment; filename="{name}"', "X-Profile-Samples": str(samples)}
+    return PlainTextResponse(text, headers=headers)
+
+
+@app.get("/api/storage")
+async def storage_stats():
+    pending = storage.hydration
+    return {
+        "backend": storage.STORAGE_BACKEND,
+        "snapshot_format": storage.SNAPSHOT_FORMAT,
+        "loading": pending.stats() if pending is not None else None,
+        "writer": storage.writer().stats(),
+    }
+
+
+@app.get("/api/metadata/cache")
+def metadata_cache_stats():
+    return metadata_cache.stats()
+
+
+@app.get("/api/search")
+async def advanced_search(q: str = "", category: str = "", tag: str = "", limit: int = 50, offset: int = 0):
+    limit = max(1, min(limit, 500))
+    offset = max(0, offset)
+    allowed = None
+    if category:
+        allowed = state.index.ids_in_category(category)
+    if tag:
+        tagged = state.index.ids_with_tag(tag)
+        allowed = tagged if allowed is None else allowed & tagged
+
+    if q.strip():
+        with search_latency.time():
+            ids, count = state.index.text.search(q, allowed=allowed, limit=limit, offset=offset)
+    elif allowed is not None:
+        # no query: filtered listing, newest first (ids grow with insertion)
+        ordered = sorted(allowed, reverse=True)
+        ids, count = ordered[offset : offset + limit], len(ordered)
+    else:
+        ordered = state.index.ordered()
+        return {"results": [l.to_model() for l in ordered[offset : offset + limit]], "count": len(ordered)}
+    links = [state.index.get(i) for i in ids]
+    return {"results": [l.to_model() for l in links if l is not None], "count": count}
+
+
+@app.get("/api/duplicates")
+async def list_duplicates(
+    request: Request, category: str = "", threshold: float = dedupe.SIMILARITY, limit: int = 200, offset: int = 0
+):
+    """
+    Groups of likely duplicates (re-uploads, lyric/visualizer/official
+    variants) across the library, largest first; ?category= keeps the groups
+    with a link in that category. Only links sharing an LSH bucket are
+    compared, so this is far from all pairs.
+    """
+    threshold = max(0.3, min(threshold, 1.0))
+    limit = max(1, min(limit, 1000))
+    offset = max(0, offset)
+    key = ("duplicates", category, threshold, limit, offset)
+    if state.index.similar.backlog:
+        await _similar_indexed()
+    revision = state.changes.kind_rev("link")
+    if etag_matches(request.headers.get("if-none-match"), make_etag(key, revision)):
+        return Response(status_code=304, headers={"ETag": make_etag(key, revision)})
+    index = state.index
+    only = set(index.ids_in_category(category)) if category else None
+    # seconds for a six-figure library; kept by the index until the next edit
+    clusters = await asyncio.to_thread(index.similar.clusters, index.get, threshold, only)
+
+    def build():
+        page = [(ids, similarity, [index.get(i) for i in ids]) for ids, similarity in clusters[offset : offset + limit]]
+        return {
+            "threshold": threshold,
+            "count": len(clusters),
+            "links": sum(len(ids) for ids, _ in clusters),
+            "clusters": [
+                {"similarity": round(similarity, 3), "links": [l.to_dict(DUPLICATE_FIELDS) for l in links if l]}
+                for ids, similarity, links in page
+            ],
+        }
+
+    return responses.respond(request, key, revision, build)
+
+
+@app.get("/api/links/{id}/similar")
+async def similar_links(id: int, limit: int = 10):
+    """Likely duplicates of one link, e.g. once its metadata has arrived."""
+    if state.index.similar.backlog:
+        await _similar_indexed()
+    link = state.index.get(id)
+    if not link:
+        raise HTTPException(404)
+    return {"id": id, "similar": _similar(link, max(1, min(limit, 50)))}
+
+
+def _export(chunks, media_type: str, compress: bool, etag: Optional[str] = None) -> StreamingResponse:
+    headers = {}
+    if compress:
+        chunks = gzipped(chunks)
+        headers.update({"Content-Encoding": "gzip", "Vary": "Accept-Encoding"})
+    if etag:
+        headers.update({"ETag": etag, "Cache-Control": "no-cache"})
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
 
 
 @app.get("/api/export/json")
-def export_json():
-    return state
+async def export_json(
+    request: Request, format: str = "json", category: str = "", tag: str = "", gzip: bool = False
+):
+    """The library as one JSON document, or one link per line with ?format=ndjson."""
+    # weak: links are read as the stream goes, so bytes may trail later edits
+    etag = "W/" + make_etag(("export", format, category, tag, gzip), state.changes.rev)
+    if etag_matches(request.headers.get("if-none-match"), etag[2:]):
+        return Response(status_code=304, headers={"ETag": etag})
+    links = select_links(state, category, tag)
+    if format == "ndjson":
+        return _export(lines(links, link_json), "application/x-ndjson", gzip, etag)
+    head = json.dumps(
+        {"next_id": state.next_id, "categories": state.categories, "config": state.config.model_dump(mode="json")},
+        ensure_ascii=False,
+    )[:-1] + ',"links":['
+    return _export(json_array(links, link_json, head, "]}"), "application/json", gzip, etag)
 
 
 @app.get("/api/export/txt")
-def export_txt():
-    lines = [link.normalized_url for link in state.links]
-    return "\n".join(lines)
+async def export_txt(category: str = "", tag: str = "", gzip: bool = False):
+    links = select_links(state, category, tag)
+    return _export(lines(links, lambda l: l.normalized_url), "text/plain; charset=utf-8", gzip)
 
 
 @app.get("/api/export/yt-dlp")
-def export_for_ytdlp():
-    payload = {
-        "entries": [
-            {
-                "url": l.normalized_url,
-                "title": l.title,
-                "channel": l.author,
-                "duration": l.duration_seconds,
-                "categories": l.categories,
-                "tags": l.tags,
-            }
-            for l in state.links
-        ]
-    }
-    return payload
+async def export_for_ytdlp(format: str = "json", category: str = "", tag: str = "", gzip: bool = False):
+    links = select_links(state, category, tag)
+    if format == "ndjson":
+        return _export(lines(links, ytdlp_json), "application/x-ndjson", gzip)
+    return _export(json_array(links, ytdlp_json, '{"entries":[', "]}"), "application/json", gzip)
 
 
 @app.post("/api/save")
-def persist_state():
-    save_state(state)
+async def persist_state():
+    """
+    Durability barrier: returns once every mutation made before the call is
+    on disk, and folds the journal into a fresh snapshot.
+    """
+    snap = storage.snapshot(state)
+    await asyncio.to_thread(storage.save_snapshot, snap)
     return {"ok": True}
 
 
 @app.delete("/api/links/{id}")
 async def delete_link(id: int):
-    global state
-    before = len(state.links)
-    state.links = [l for l in state.links if l.id != id]
-    if len(state.links) == before:
+    link = state.index.remove(id)
+    if link is None:
         raise HTTPException(404)
-    save_state(state)
+    if state.index.find_url(link.normalized_url) is None:
+        thumbs.forget(extract_video_id_from_normalized_url(link.normalized_url))
+    state.changes.touch("link", id, deleted=True)
+    if state.jobs.discard(id):
+        state.changes.touch("queue", id, deleted=True)
+    record(state, "link_deleted", id=id)
     return {"ok": True}
@@ -1,19 +1,198 @@
 
+import asyncio
 import json
-from typing import Optional, Dict, Any
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional, Dict, Any, List
 import requests
+from requests.adapters import HTTPAdapter
+from .metrics import fetch_latency
 from .youtube_utils import extract_video_id_from_normalized_url
 
-OEMBED_ENDPOINT = "https://www.youtube.com/oembed"
-GET_VIDEO_INFO_ENDPOINT = "https://www.youtube.com/get_video_info"
+# Overridable so benchmarks can point the pipeline at a local stub server.
+OEMBED_ENDPOINT = os.environ.get("LINKCASCADE_OEMBED_ENDPOINT", "https://www.youtube.com/oembed")
+GET_VIDEO_INFO_ENDPOINT = os.environ.get(
+    "LINKCASCADE_VIDEO_INFO_ENDPOINT", "https://www.youtube.com/get_video_info"
+)
+
+HTTP_POOL_SIZE = 64
+
+# One keep-alive session shared by all fetch threads, so consecutive
+# requests reuse TCP+TLS connections instead of handshaking every time.
+session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE)
+session.mount("https://", _adapter)
+session.mount("http://", _adapter)
+
+# Blocking HTTP calls run here; two per link (oEmbed + video info).
+_executor = ThreadPoolExecutor(max_workers=HTTP_POOL_SIZE, thread_name_prefix="metadata")
+
+# Consecutive failures (429, 5xx, network errors) back off exponentially
+# from BACKOFF_BASE; BREAKER_THRESHOLD of them open the circuit.
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 300.0
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 120.0
+BREAKER_COOLDOWN_MAX = 1800.0
+
+# Called (from fetch threads) whenever an endpoint answers 429.
+throttle_hooks: List[Callable[[], None]] = []
+
+
+class EndpointUnavailable(Exception):
+    """The endpoint is backing off or its circuit is open; retry after `retry_in`."""
+
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(f"{endpoint} unavailable for {retry_in:.1f}s")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+class EndpointHealth:
+    """
+    Failure tracking for one upstream endpoint.
+
+    closed     requests flow; failures push `blocked_until` out with
+               jittered exponential backoff (or Retry-After when given)
+    open       BREAKER_THRESHOLD consecutive failures; nothing is sent
+               until the cool-down ends
+    half_open  after the cool-down a single probe goes out; success
+               closes the circuit, failure reopens it with a longer cool-down
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = "closed"
+        self.failures = 0
+        self.blocked_until = 0.0
+        self.cooldown = BREAKER_COOLDOWN
+        self.probing = False
+        self.last_error: Optional[str] = None
+        self.counters = {"ok": 0, "throttled": 0, "errors": 0, "skipped": 0, "opened": 0}
+        self._lock = threading.Lock()
+
+    def retry_in(self) -> float:
+        return max(0.0, self.blocked_until - time.time())
+
+    def allow(self) -> bool:
+        with self._lock:
+            now = time.time()
+            if now < self.blocked_until or (self.state == "half_open" and self.probing):
+                self.counters["skipped"] += 1
+                return False
+            if self.state == "open":
+                self.state = "half_open"
+            if self.state == "half_open":
+                self.probing = True
+            return True
+
+    def success(self):
+        with self._lock:
+            self.counters["ok"] += 1
+            self.failures = 0
+            self.probing = False
+            if self.state != "closed":
+                self.state = "closed"
+                self.cooldown = BREAKER_COOLDOWN
+
+    def failure(self, error: str, retry_after: Optional[float] = None, throttled: bool = False):
+        with self._lock:
+            self.counters["throttled" if throttled else "errors"] += 1
+            self.failures += 1
+            self.last_error = error
+            self.probing = False
+            now = time.time()
+            if self.state == "half_open" or (self.state == "closed" and self.failures >= BREAKER_THRESHOLD):
+                if self.state == "half_open":
+                    self.cooldown = min(BREAKER_COOLDOWN_MAX, self.cooldown * 2)
+                self.state = "open"
+                self.counters["opened"] += 1
+                delay = self.cooldown
+            else:
+                delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (self.failures - 1)) * random.uniform(0.5, 1.5)
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+            self.blocked_until = max(self.blocked_until, now + delay)
+        if throttled:
+            for hook in throttle_hooks:
+                hook()
+
+    def end_probe(self):
+        with self._lock:
+            self.probing = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "retry_in": round(self.retry_in(), 2),
+            "last_error": self.last_error,
+            **self.counters,
+        }
+
+
+oembed_health = EndpointHealth("oembed")
+video_info_health = EndpointHealth("get_video_info")
+
+
+def _retry_after(resp: requests.Response) -> Optional[float]:
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _get(health: EndpointHealth, endpoint: str, params: Dict[str, str]) -> Optional[requests.Response]:
+    """
+    GET through `health`. Raises EndpointUnavailable while the endpoint is
+    backing off; returns None for answers that say nothing about the
+    endpoint's health (e.g. 404 for a removed video).
+    """
+    if not health.allow():
+        fetch_latency.observe(0.0, source=health.name, outcome="skipped")
+        raise EndpointUnavailable(health.name, health.retry_in())
+    started = time.perf_counter()
+    try:
+        try:
+            resp = session.get(endpoint, params=params, timeout=5)
+        except requests.RequestException as e:
+            fetch_latency.observe(time.perf_counter() - started, source=health.name, outcome="error")
+            health.failure(type(e).__name__)
+            raise EndpointUnavailable(health.name, health.retry_in()) from e
+        elapsed = time.perf_counter() - started
+        if resp.status_code == 429 or resp.status_code >= 500:
+            outcome = "throttled" if resp.status_code == 429 else "error"
+            fetch_latency.observe(elapsed, source=health.name, outcome=outcome)
+            health.failure(f"HTTP {resp.status_code}", _retry_after(resp), throttled=resp.status_code == 429)
+            raise EndpointUnavailable(health.name, health.retry_in())
+        fetch_latency.observe(elapsed, source=health.name, outcome="ok" if resp.status_code == 200 else "not_found")
+        health.success()
+        return resp if resp.status_code == 200 else None
+    finally:
+        # anything else escaping (a bug, an unexpected exception) must not
+        # leave a half-open endpoint waiting forever on its probe
+        health.end_probe()
+
 
 def fetch_oembed(url: str) -> Optional[Dict[str, Any]]:
+    """oEmbed data, None if the video has none; raises EndpointUnavailable."""
+    resp = _get(oembed_health, OEMBED_ENDPOINT, {"url": url, "format": "json"})
+    if resp is None:
+        return None
     try:
-        resp = requests.get(OEMBED_ENDPOINT, params={"url": url, "format": "json"}, timeout=5)
-        if resp.status_code != 200:
-            return None
         return resp.json()
-    except Exception:
+    except ValueError:
         return None
 
 def fetch_video_info(video_id: str) -> Optional[Dict[str, Any]]:
@@ -22,8 +201,8 @@ def fetch_video_info(video_id: str) -> Optional[Dict[str, Any]]:
     Tries to parse basic metadata (title, author, thumbnail).
     """
     try:
-        resp = requests.get(GET_VIDEO_INFO_ENDPOINT, params={"video_id": video_id, "el": "detailpage"}, timeout=5)
-        if resp.status_code != 200:
+        resp = _get(video_info_health, GET_VIDEO_INFO_ENDPOINT, {"video_id": video_id, "el": "detailpage"})
+        if resp is None:
             return None
         from urllib.parse import parse_qs
         data = parse_qs(resp.text)
@@ -65,8 +244,8 @@ def fetch_video_info(video_id: str) -> Optional[Dict[str, Any]]:
     except Exception:
         return None
 
-def get_metadata_for_video(original_url: str, normalized_url: str) -> Dict[str, Optional[str]]:
-    """Best-effort metadata pull using oEmbed then get_video_info."""
+def merge_metadata(oembed: Optional[Dict[str, Any]], info: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine oEmbed and video-info results; video info wins where both exist."""
     meta: Dict[str, Any] = {
         "title": None,
         "author": None,
@@ -78,17 +257,14 @@ def get_metadata_for_video(original_url: str, normalized_url: str) -> Dict[str,
         "channel_avatar": None,
     }
 
-    oembed = fetch_oembed(normalized_url)
     if oembed:
         meta["title"] = oembed.get("title")
         meta["author"] = oembed.get("author_name")
         meta["thumbnail_url"] = oembed.get("thumbnail_url")
 
-    vid = extract_video_id_from_normalized_url(normalized_url)
-    if not vid:
+    if info is None:
         return meta
 
-    info = fetch_video_info(vid) or {}
     meta["title"] = info.get("title") or meta.get("title")
     meta["author"] = info.get("author") or meta.get("author")
     meta["thumbnail_url"] = info.get("thumbnail_url") or meta.get("thumbnail_url")
@@ -101,3 +277,41 @@ def get_metadata_for_video(original_url: str, normalized_url: str) -> Dict[str,
     meta["channel_avatar"] = info.get("channel_avatar")
 
     return meta
+
+def _combine(oembed: Any, info: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if isinstance(oembed, EndpointUnavailable):
+        # video info alone is good enough; otherwise let the caller retry later
+        if not (info and info.get("title")):
+            raise oembed
+        oembed = None
+    return merge_metadata(oembed, info or {})
+
+def get_metadata_for_video(original_url: str, normalized_url: str) -> Dict[str, Optional[str]]:
+    """Best-effort metadata pull using oEmbed then get_video_info."""
+    try:
+        oembed = fetch_oembed(normalized_url)
+    except EndpointUnavailable as e:
+        oembed = e
+    vid = extract_video_id_from_normalized_url(normalized_url)
+    if not vid:
+        return _combine(oembed, None)
+    return _combine(oembed, fetch_video_info(vid))
+
+async def get_metadata_for_video_async(original_url: str, normalized_url: str) -> Dict[str, Any]:
+    """
+    Same as get_metadata_for_video, but both requests run concurrently.
+    Raises EndpointUnavailable when oEmbed is backing off and video info
+    could not stand in for it.
+    """
+    loop = asyncio.get_running_loop()
+    vid = extract_video_id_from_normalized_url(normalized_url)
+    oembed_fut = loop.run_in_executor(_executor, fetch_oembed, normalized_url)
+    if not vid:
+        return merge_metadata(await oembed_fut, None)
+    info_fut = loop.run_in_executor(_executor, fetch_video_info, vid)
+    oembed, info = await asyncio.gather(oembed_fut, info_fut, return_exceptions=True)
+    if isinstance(info, BaseException):
+        info = None
+    if isinstance(oembed, BaseException) and not isinstance(oembed, EndpointUnavailable):
+        raise oembed
+    return _combine(oembed, info)
@@ -0,0 +1,189 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+CACHE_FILE = Path(os.environ.get("LINKCASCADE_METADATA_CACHE", "metadata_cache.db"))
+MAX_ENTRIES = int(os.environ.get("LINKCASCADE_METADATA_CACHE_SIZE", "50000"))
+
+DAY = 86400
+# How long each field stays trustworthy. Titles and avatars get edited;
+# durations and publish dates practically never change.
+FIELD_TTLS = {
+    "title": 7 * DAY,
+    "author": 30 * DAY,
+    "thumbnail_url": 30 * DAY,
+    "channel_avatar": 7 * DAY,
+    "duration": 365 * DAY,
+    "duration_seconds": 365 * DAY,
+    "publish_date": 365 * DAY,
+    "video_type": 365 * DAY,
+}
+# Videos that returned nothing (private, deleted, region locked) are retried after this.
+NEGATIVE_TTL = 6 * 3600
+
+# Ids per SELECT ... IN (...) in lookup_many (SQLite caps bound parameters).
+LOOKUP_BATCH = 500
+# Access times are written once this many lookups have noted one.
+TOUCH_BATCH = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata_cache (
+    video_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    negative INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_metadata_cache_last_access ON metadata_cache(last_access);
+"""
+
+
+class MetadataCache:
+    """
+    On-disk cache of merged oEmbed + video-info results keyed by video id.
+
+    lookup() returns one of:
+      ("hit", meta)       every cached field is within its TTL
+      ("stale", meta)     usable now, but some field expired; refetch soon
+      ("negative", None)  the video recently resolved to nothing
+      ("miss", None)
+
+    Lookups only note the access time; the LRU column is written in one
+    statement every TOUCH_BATCH lookups, before evicting, on close and by
+    flush_touches().
+    """
+
+    def __init__(self, path: Path = CACHE_FILE, max_entries: int = MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.size = self.conn.execute("SELECT COUNT(*) FROM metadata_cache").fetchone()[0]
+        self.counters = {"hits": 0, "stale": 0, "negative_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        self._touched: Dict[str, float] = {}  # video id -> last access not yet written
+
+    def lookup(self, video_id: Optional[str]) -> Tuple[str, Optional[Dict[str, Any]]]:
+        if not video_id:
+            self.counters["misses"] += 1
+            return "miss", None
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT data, fetched_at, negative FROM metadata_cache WHERE video_id = ?", (video_id,)
+            ).fetchone()
+            return self._classify(video_id, row, time.time())
+
+    def lookup_many(self, video_ids: Iterable[Optional[str]]) -> Dict[str, Tuple[str, Optional[Dict[str, Any]]]]:
+        """lookup() for a batch (bulk ingest), one query per LOOKUP_BATCH ids."""
+        ids = list(dict.fromkeys(v for v in video_ids if v))
+        out: Dict[str, Tuple[str, Optional[Dict[str, Any]]]] = {}
+        with self._lock:
+            now = time.time()
+            for start in range(0, len(ids), LOOKUP_BATCH):
+                part = ids[start : start + LOOKUP_BATCH]
+                rows = {
+                    row[0]: row[1:]
+                    for row in self.conn.execute(
+                        "SELECT video_id, data, fetched_at, negative FROM metadata_cache"
+                        f" WHERE video_id IN ({','.join('?' * len(part))})",
+                        part,
+                    )
+                }
+                for video_id in part:
+                    out[video_id] = self._classify(video_id, rows.get(video_id), now)
+        return out
+
+    def _classify(self, video_id: str, row: Optional[Tuple[str, float, int]], now: float):
+        if row is None:
+            self.counters["misses"] += 1
+            return "miss", None
+        data, fetched_at, negative = row
+        age = now - fetched_at
+        if negative:
+            if age < NEGATIVE_TTL:
+                self._touched[video_id] = now
+                self.counters["negative_hits"] += 1
+                return "negative", None
+            self.counters["misses"] += 1
+            return "miss", None
+        self._touched[video_id] = now
+        if len(self._touched) >= TOUCH_BATCH:
+            self._flush_touches()
+        meta = json.loads(data)
+        expired = any(meta.get(f) is not None and age >= ttl for f, ttl in FIELD_TTLS.items())
+        if expired:
+            self.counters["stale"] += 1
+            return "stale", meta
+        self.counters["hits"] += 1
+        return "hit", meta
+
+    def put(self, video_id: Optional[str], meta: Dict[str, Any]):
+        if not video_id:
+            return
+        negative = not any(meta.get(f) for f in ("title", "author", "thumbnail_url"))
+        now = time.time()
+        with self._lock:
+            self._touched.pop(video_id, None)
+            existed = self.conn.execute(
+                "SELECT 1 FROM metadata_cache WHERE video_id = ?", (video_id,)
+            ).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO metadata_cache (video_id, data, fetched_at, last_access, negative)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (video_id, json.dumps({} if negative else meta), now, now, int(negative)),
+            )
+            self.counters["writes"] += 1
+            if not existed:
+                self.size += 1
+            if self.size > self.max_entries:
+                self._evict()
+
+    def invalidate(self, video_id: str):
+        with self._lock:
+            cur = self.conn.execute("DELETE FROM metadata_cache WHERE video_id = ?", (video_id,))
+            self.size -= cur.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.counters["hits"] + self.counters["stale"] + self.counters["negative_hits"] + self.counters["misses"]
+        served = self.counters["hits"] + self.counters["stale"] + self.counters["negative_hits"]
+        return {
+            **self.counters,
+            "size": self.size,
+            "max_entries": self.max_entries,
+            "hit_ratio": round(served / lookups, 4) if lookups else 0.0,
+        }
+
+    def flush_touches(self):
+        """Write the access times noted by lookups since the last flush; blocking."""
+        with self._lock:
+            self._flush_touches()
+
+    def _flush_touches(self):
+        if self._touched:
+            touched, self._touched = self._touched, {}
+            self.conn.executemany(
+                "UPDATE metadata_cache SET last_access = ? WHERE video_id = ?", [(t, v) for v, t in touched.items()]
+            )
+
+    def _evict(self):
+        self._flush_touches()
+        # drop the least recently used ~5% in one statement
+        excess = self.size - self.max_entries + max(1, self.max_entries // 20)
+        cur = self.conn.execute(
+            "DELETE FROM metadata_cache WHERE video_id IN"
+            " (SELECT video_id FROM metadata_cache ORDER BY last_access LIMIT ?)",
+            (excess,),
+        )
+        self.size -= cur.rowcount
+        self.counters["evictions"] += cur.rowcount
+
+    def close(self):
+        with self._lock:
+            self._flush_touches()
+            self.conn.close()
@@ -0,0 +1,308 @@
+import abc
+import collections
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Latency buckets in seconds, 1 ms .. 10 s.
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Queue waits and backoffs run much longer.
+WAIT_BUCKETS = (0.01, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+
+# The sampling profiler is opt-in: it walks every thread's stack many times a second.
+PROFILING = os.environ.get("LINKCASCADE_PROFILING", "") not in ("", "0")
+PROFILE_MAX_SECONDS = 120.0
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric(abc.ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Labels:
+        return tuple(str(labels.get(n, "")) for n in self.label_names)
+
+    def _labels(self, key: Labels, extra: str = "") -> str:
+        parts = [f'{n}="{_escape(v)}"' for n, v in zip(self.label_names, key)]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}", *self.samples()]
+
+    @abc.abstractmethod
+    def samples(self) -> List[str]:
+        """Exposition lines for every labelled series, without HELP/TYPE."""
+
+    @abc.abstractmethod
+    def summary(self) -> Any:
+        """The same values for /api/metrics, as JSON."""
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        super().__init__(name, help, labels)
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self.values.items())
+        return [f"{self.name}{self._labels(k)} {_fmt(v)}" for k, v in items]
+
+    def summary(self) -> Any:
+        with self._lock:
+            return {"|".join(k) or "total": v for k, v in self.values.items()}
+
+
+class Gauge(Metric):
+    """Read at scrape time from `fn`, which returns {label tuple: value} or a bare number."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, fn: Callable[[], Any], labels: Tuple[str, ...] = ()):
+        super().__init__(name, help, labels)
+        self.fn = fn
+
+    def _read(self) -> Dict[Labels, float]:
+        try:
+            value = self.fn()
+        except Exception:
+            return {}
+        return value if isinstance(value, dict) else {(): value}
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{self._labels(k)} {_fmt(v)}" for k, v in self._read().items()]
+
+    def summary(self) -> Any:
+        return {"|".join(k) or "value": v for k, v in self._read().items()}
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = buckets
+        self.series: Dict[Labels, List[float]] = {}  # per-bucket counts + [count, sum]
+
+    def observe(self, seconds: float, **labels: str):
+        key = self._key(labels)
+        i = bisect_left(self.buckets, seconds)
+        with self._lock:
+            row = self.series.get(key)
+            if row is None:
+                row = self.series[key] = [0] * (len(self.buckets) + 1) + [0, 0.0]
+            row[i] += 1
+            row[-2] += 1
+            row[-1] += seconds
+
+    def time(self, **labels: str) -> "_Timer":
+        return _Timer(self, labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = [(k, list(v)) for k, v in self.series.items()]
+        out = []
+        for key, row in items:
+            running = 0
+            for bound, n in zip(self.buckets + (float("inf"),), row):
+                running += n
+                le = 'le="' + _fmt(bound) + '"'
+                out.append(f"{self.name}_bucket{self._labels(key, le)} {running}")
+            out.append(f"{self.name}_count{self._labels(key)} {row[-2]}")
+            out.append(f"{self.name}_sum{self._labels(key)} {_fmt(row[-1])}")
+        return out
+
+    def _quantile(self, row: List[float], q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th observation."""
+        target = q * row[-2]
+        running = 0
+        for bound, n in zip(self.buckets + (float("inf"),), row):
+            running += n
+            if running >= target:
+                return bound if bound != float("inf") else None
+        return None
+
+    def summary(self) -> Any:
+        with self._lock:
+            items = [(k, list(v)) for k, v in self.series.items()]
+        out = {}
+        for key, row in items:
+            count, total = row[-2], row[-1]
+            out["|".join(key) or "all"] = {
+                "count": count,
+                "avg_ms": round(total / count * 1000, 3) if count else None,
+                "p50_ms": _ms(self._quantile(row, 0.5)),
+                "p95_ms": _ms(self._quantile(row, 0.95)),
+                "p99_ms": _ms(self._quantile(row, 0.99)),
+            }
+        return out
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+class _Timer:
+    __slots__ = ("hist", "labels", "start")
+
+    def __init__(self, hist: Histogram, labels: Dict[str, str]):
+        self.hist = hist
+        self.labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.observe(time.perf_counter() - self.start, **self.labels)
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+
+    def _add(self, metric: Metric) -> Any:
+        # modules may be re-imported (tests, reload); keep the first instance
+        return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help: str, labels: Tuple[str, ...] = ()) -> Counter:
+        return self._add(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, fn: Callable[[], Any], labels: Tuple[str, ...] = ()) -> Gauge:
+        metric = self._add(Gauge(name, help, fn, labels))
+        metric.fn = fn  # the latest owner of the value wins
+        return metric
+
+    def histogram(
+        self, name: str, help: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = BUCKETS
+    ) -> Histogram:
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def render(self) -> str:
+        """Prometheus text exposition format (0.0.4)."""
+        lines: List[str] = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> Dict[str, Any]:
+        return {name: metric.summary() for name, metric in self.metrics.items()}
+
+
+registry = Registry()
+
+# ---------- shared instruments ----------
+
+http_requests = registry.counter("linkcascade_http_requests_total", "HTTP requests by route and status.", ("route", "method", "status"))
+http_latency = registry.histogram("linkcascade_http_request_seconds", "Time to response headers by route.", ("route", "method"))
+fetch_latency = registry.histogram(
+    "linkcascade_metadata_fetch_seconds", "Metadata endpoint calls by source and outcome.", ("source", "outcome")
+)
+flush_latency = registry.histogram("linkcascade_persist_flush_seconds", "Background persistence flushes.")
+flush_entries = registry.counter("linkcascade_persist_entries_total", "Mutations written by persistence flushes.")
+snapshot_latency = registry.histogram("linkcascade_snapshot_write_seconds", "Full snapshot writes (compaction, /api/save).")
+queue_wait = registry.histogram(
+    "linkcascade_job_queue_wait_seconds", "Time metadata jobs spend waiting, by priority.", ("priority",), WAIT_BUCKETS
+)
+ratelimit_wait = registry.histogram("linkcascade_ratelimit_wait_seconds", "Time fetchers wait for a rate-limit token.", (), WAIT_BUCKETS)
+search_latency = registry.histogram("linkcascade_search_seconds", "Full-text search evaluation time.")
+
+
+class RequestMetrics:
+    """
+    ASGI middleware recording request counts and time to response headers,
+    labelled by route template (not raw path) so series stay bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        sent = []
+
+        def done(status: int):
+            route = getattr(scope.get("route"), "path", "unmatched")
+            http_latency.observe(time.perf_counter() - started, route=route, method=scope["method"])
+            http_requests.inc(route=route, method=scope["method"], status=str(status))
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                sent.append(message["status"])
+                done(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not sent:
+                done(500)
+
+
+# ---------- sampling profiler ----------
+
+_profile_lock = threading.Lock()
+
+
+def sample_profile(seconds: float, interval: float = 0.005) -> Tuple[str, int]:
+    """
+    Sample every thread's Python stack for `seconds` and return
+    (collapsed stacks, samples) in the "frame;frame;frame count" format
+    read by flamegraph.pl and speedscope. Blocking; run it on a thread.
+    """
+    if not _profile_lock.acquire(blocking=False):
+        raise RuntimeError("a profile is already running")
+    try:
+        me = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        stacks: "collections.Counter[str]" = collections.Counter()
+        samples = 0
+        deadline = time.monotonic() + min(seconds, PROFILE_MAX_SECONDS)
+        while time.monotonic() < deadline:
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                parts = []
+                while frame is not None:
+                    code = frame.f_code
+                    parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                parts.append(names.get(ident, str(ident)))
+                stacks[";".join(reversed(parts))] += 1
+            samples += 1
+            time.sleep(interval)
+        text = "\n".join(f"{stack} {n}" for stack, n in stacks.most_common())
+        return text + "\n", samples
+    finally:
+        _profile_lock.release()
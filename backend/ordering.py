@@ -0,0 +1,174 @@
+import base64
+import json
+from bisect import bisect_left, bisect_right, insort
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .records import LinkRecord as Link
+
+GLOBAL_SCOPE = ""
+
+
+def _created(link: "Link") -> Optional[int]:
+    return link.created_ms
+
+
+def _title(link: "Link") -> Optional[str]:
+    return link.title.casefold() if link.title else None
+
+
+SORT_KEYS: Dict[str, Callable[["Link"], Any]] = {
+    "created_at": _created,
+    "duration_seconds": lambda l: l.duration_seconds,
+    "title": _title,
+    "manual_order": lambda l: l.manual_order,
+    "publish_date": lambda l: l.publish_date or None,
+}
+
+# What each key's values are, to reject cursors that would not compare.
+SORT_TYPES = {"created_at": int, "duration_seconds": int, "title": str, "manual_order": int, "publish_date": str}
+
+# Entries are (0, value, id) or, when the value is missing, (1, 0, id), so
+# every list splits into a sorted "has value" run followed by a "missing" run.
+Entry = Tuple[int, Any, int]
+
+
+def _entry(value: Any, link_id: int) -> Entry:
+    return (1, 0, link_id) if value is None else (0, value, link_id)
+
+
+def encode_cursor(entry: Entry) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(entry)).encode()).decode()
+
+
+def decode_cursor(cursor: str, key: Optional[str] = None) -> Entry:
+    """Inverse of encode_cursor(); with `key`, raises ValueError unless it fits that sort."""
+    flag, value, link_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    if key is not None:
+        # bool is an int to Python but never a sort value
+        expected = int if flag else SORT_TYPES[key]
+        if flag not in (0, 1) or type(value) is not expected or type(link_id) is not int or flag and value:
+            raise ValueError(f"cursor does not belong to sort {key!r}")
+    return (int(flag), value, int(link_id))
+
+
+class SortedLinks:
+    """
+    Pre-sorted (scope, sort key) lists maintained on every mutation, where a
+    scope is the whole library or one category. Listing a page is a bisect
+    plus a short walk, independent of library size.
+    """
+
+    def __init__(self):
+        self.lists: Dict[Tuple[str, str], List[Entry]] = {}
+        self.entries: Dict[int, Dict[str, Entry]] = {}  # link id -> key -> current entry
+
+    def add(self, link: "Link"):
+        entries = {key: _entry(fn(link), link.id) for key, fn in SORT_KEYS.items()}
+        self.entries[link.id] = entries
+        for scope in self._scopes(link.categories):
+            for key, entry in entries.items():
+                lst = self.lists.setdefault((scope, key), [])
+                if not lst or lst[-1] < entry:
+                    lst.append(entry)  # a new link is newest, and its missing values sort last by id
+                else:
+                    insort(lst, entry)
+
+    def add_many(self, links: List["Link"]):
+        """add() for a batch: append everything, then sort each list once."""
+        touched: Dict[Tuple[str, str], List[Entry]] = {}
+        for link in links:
+            entries = {key: _entry(fn(link), link.id) for key, fn in SORT_KEYS.items()}
+            self.entries[link.id] = entries
+            for scope in self._scopes(link.categories):
+                for key, entry in entries.items():
+                    lst = touched.get((scope, key))
+                    if lst is None:
+                        lst = touched[(scope, key)] = self.lists.setdefault((scope, key), [])
+                    lst.append(entry)
+        for lst in touched.values():
+            lst.sort()
+
+    def remove(self, link: "Link", categories: Optional[List[str]] = None):
+        entries = self.entries.pop(link.id, None)
+        if entries is None:
+            return
+        for scope in self._scopes(link.categories if categories is None else categories):
+            for key, entry in entries.items():
+                self._discard((scope, key), entry)
+
+    def update(self, link: "Link", old_categories: Optional[List[str]] = None):
+        """Reposition `link` after its values or categories changed."""
+        entries = self.entries.get(link.id)
+        if entries is None:
+            self.add(link)
+            return
+        if old_categories is not None and list(old_categories) != list(link.categories):
+            self.remove(link, old_categories)
+            self.add(link)
+            return
+        for key, fn in SORT_KEYS.items():
+            new = _entry(fn(link), link.id)
+            old = entries[key]
+            if new == old:
+                continue
+            entries[key] = new
+            for scope in self._scopes(link.categories):
+                self._discard((scope, key), old)
+                insort(self.lists.setdefault((scope, key), []), new)
+
+    def walk(
+        self, key: str, scope: str = GLOBAL_SCOPE, descending: bool = False, after: Optional[Entry] = None
+    ) -> Iterator[Entry]:
+        """Entries in order (missing values last in both directions), resuming after `after`."""
+        return self._walk(self.lists.get((scope, key), []), descending, after)
+
+    def walk_ids(
+        self, key: str, ids: Iterable[int], descending: bool = False, after: Optional[Entry] = None
+    ) -> Iterator[Entry]:
+        """walk() restricted to `ids`: sorts a small filtered set instead of skipping through a list."""
+        entries = self.entries
+        return self._walk(sorted(entries[i][key] for i in ids if i in entries), descending, after)
+
+    @staticmethod
+    def _walk(lst: List[Entry], descending: bool, after: Optional[Entry]) -> Iterator[Entry]:
+        split = bisect_left(lst, (1,))
+        if not descending:
+            start = bisect_right(lst, after) if after is not None else 0
+            for i in range(start, len(lst)):
+                yield lst[i]
+            return
+        if after is None:
+            ranges = [(split - 1, -1), (len(lst) - 1, split - 1)]
+        elif after[0] == 0:
+            ranges = [(bisect_left(lst, after) - 1, -1), (len(lst) - 1, split - 1)]
+        else:
+            ranges = [(bisect_left(lst, after) - 1, split - 1)]
+        for hi, lo in ranges:
+            for i in range(hi, lo, -1):
+                yield lst[i]
+
+    def last(self, key: str, scope: str = GLOBAL_SCOPE) -> Optional[Entry]:
+        """The entry with the largest value in a list (None if no link has one)."""
+        lst = self.lists.get((scope, key))
+        if not lst:
+            return None
+        split = bisect_left(lst, (1,))
+        return lst[split - 1] if split else None
+
+    def size(self, scope: str = GLOBAL_SCOPE) -> int:
+        return len(self.lists.get((scope, "created_at"), []))
+
+    @staticmethod
+    def _scopes(categories: List[str]) -> List[str]:
+        return [GLOBAL_SCOPE] + list(dict.fromkeys(categories or []))
+
+    def _discard(self, list_key: Tuple[str, str], entry: Entry):
+        lst = self.lists.get(list_key)
+        if not lst:
+            return
+        i = bisect_left(lst, entry)
+        if i < len(lst) and lst[i] == entry:
+            del lst[i]
+        if not lst:
+            del self.lists[list_key]
@@ -0,0 +1,137 @@
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+# Throttling responses halve the effective rate (never below MIN_SCALE of
+# the configured limits, at most once per PENALTY_WINDOW); each clean fetch
+# wins back RECOVERY_STEP of it.
+MIN_SCALE = 0.1
+PENALTY_WINDOW = 2.0
+RECOVERY_STEP = 0.02
+
+
+class TokenBucket:
+    """`capacity` tokens refilled continuously at `rate` tokens per second."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self) -> float:
+        """Seconds until one whole token is available (0 if one is now)."""
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def reconfigure(self, rate: float, capacity: float, now: float):
+        self.refill(now)
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = min(self.tokens, capacity)
+
+    def snapshot(self) -> Dict[str, float]:
+        return {"rate": round(self.rate, 4), "capacity": self.capacity, "tokens": round(self.tokens, 3)}
+
+
+class RateLimiter:
+    """
+    Per-second and per-minute token buckets shared by every metadata fetcher.
+
+    acquire() is O(1): callers queue on a lock (FIFO), and the one at the
+    head sleeps exactly until both buckets hold a token. configure() applies
+    new limits immediately, waking the head waiter to recompute its wait.
+
+    penalize()/reward() scale both rates down and back up (AIMD) when the
+    upstream starts throttling.
+    """
+
+    def __init__(self, per_second: int, per_minute: int):
+        self.second = TokenBucket(1, 1)
+        self.minute = TokenBucket(1, 1)
+        self.acquired = 0
+        self.waited = 0.0
+        self.waiting = 0
+        self._lock: Optional[asyncio.Lock] = None
+        self._changed: Optional[asyncio.Event] = None
+        self.scale = 1.0
+        self.penalized_at = 0.0
+        self.configure(per_second, per_minute)
+        self.second.tokens = self.second.capacity
+        self.minute.tokens = self.minute.capacity
+
+    def configure(self, per_second: int, per_minute: int):
+        self.limits = (max(1, int(per_second)), max(1, int(per_minute)))
+        self._apply()
+
+    def penalize(self):
+        now = time.monotonic()
+        if now - self.penalized_at < PENALTY_WINDOW:
+            return  # one burst of 429s is one signal
+        self.penalized_at = now
+        self.scale = max(MIN_SCALE, self.scale / 2)
+        self._apply()
+
+    def reward(self):
+        if self.scale < 1.0:
+            self.scale = min(1.0, self.scale + RECOVERY_STEP)
+            self._apply()
+
+    def _apply(self):
+        per_second = max(1.0, self.limits[0] * self.scale)
+        per_minute = max(1.0, self.limits[1] * self.scale)
+        now = time.monotonic()
+        self.second.reconfigure(per_second, per_second, now)
+        self.minute.reconfigure(per_minute / 60, per_minute, now)
+        if self._changed is not None:
+            self._changed.set()
+
+    async def acquire(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+            self._changed = asyncio.Event()
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            async with self._lock:
+                while True:
+                    now = time.monotonic()
+                    self.second.refill(now)
+                    self.minute.refill(now)
+                    wait = max(self.second.wait_time(), self.minute.wait_time())
+                    if wait <= 0:
+                        self.second.tokens -= 1
+                        self.minute.tokens -= 1
+                        break
+                    self._changed.clear()
+                    try:
+                        await asyncio.wait_for(self._changed.wait(), wait)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            self.waiting -= 1
+        self.acquired += 1
+        self.waited += time.monotonic() - started
+
+    def spare(self) -> int:
+        """Whole tokens free in both buckets right now, net of callers already waiting."""
+        now = time.monotonic()
+        self.second.refill(now)
+        self.minute.refill(now)
+        return max(0, int(min(self.second.tokens, self.minute.tokens)) - self.waiting)
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        self.second.refill(now)
+        self.minute.refill(now)
+        return {
+            "per_second": self.second.snapshot(),
+            "per_minute": self.minute.snapshot(),
+            "scale": round(self.scale, 3),
+            "waiting": self.waiting,
+            "acquired": self.acquired,
+            "waited_seconds": round(self.waited, 3),
+        }
@@ -0,0 +1,232 @@
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .storage import Link
+
+# Low-cardinality strings shared by many links; stored once via sys.intern.
+INTERNED = {"primary_category", "author", "channel_avatar", "video_type", "metadata_status", "duration", "publish_date"}
+
+# Identical category/tag tuples (most links share a handful) are shared too.
+# Tag sets can be nearly as many as links, so the table is bounded: once full
+# it starts over (tuples already handed out stay valid, just unshared).
+MAX_SHARED_TUPLES = 4096
+_tuples: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def shared_tuple(values: Iterable[str]) -> Tuple[str, ...]:
+    t = tuple(sys.intern(v) for v in values)
+    shared = _tuples.get(t)
+    if shared is None:
+        if len(_tuples) >= MAX_SHARED_TUPLES:
+            _tuples.clear()
+        shared = _tuples[t] = t
+    return shared
+
+
+def to_ms(value: Optional[datetime]) -> Optional[int]:
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    delta = value - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000 + delta.microseconds // 1000
+
+
+def from_ms(ms: Optional[int]) -> Optional[datetime]:
+    if ms is None:
+        return None
+    return _EPOCH + timedelta(milliseconds=ms)
+
+
+class LinkRecord:
+    """
+    Compact in-memory form of a Link: slotted, with interned strings,
+    shared category/tag tuples and millisecond timestamps. This is what
+    LinkIndex holds; pydantic Link models are only built at the API
+    boundary via to_model(), and to_dict() gives the same JSON shape.
+    """
+
+    __slots__ = (
+        "id",
+        "original_url",
+        "normalized_url",
+        "_categories",
+        "primary_category",
+        "title",
+        "author",
+        "thumbnail_url",
+        "channel_avatar",
+        "duration",
+        "duration_seconds",
+        "publish_date",
+        "video_type",
+        "_tags",
+        "created_ms",
+        "refreshed_ms",
+        "metadata_status",
+        "manual_order",
+    )
+
+    def __init__(
+        self,
+        id: int,
+        original_url: str,
+        normalized_url: str,
+        categories: Iterable[str] = (),
+        primary_category: str = "Unsorted",
+        title: Optional[str] = None,
+        author: Optional[str] = None,
+        thumbnail_url: Optional[str] = None,
+        channel_avatar: Optional[str] = None,
+        duration: Optional[str] = None,
+        duration_seconds: Optional[int] = None,
+        publish_date: Optional[str] = None,
+        video_type: Optional[str] = "normal",
+        tags: Iterable[str] = (),
+        created_at: Optional[datetime] = None,
+        last_refreshed: Optional[datetime] = None,
+        metadata_status: str = "pending",
+        manual_order: Optional[int] = None,
+    ):
+        # straight into the slots: __setattr__ is for later assignments
+        init = object.__setattr__
+        intern = sys.intern
+        init(self, "id", id)
+        init(self, "original_url", original_url)
+        init(self, "normalized_url", normalized_url)
+        init(self, "_categories", shared_tuple(categories))
+        init(self, "primary_category", primary_category and intern(primary_category))
+        init(self, "title", title)
+        init(self, "author", author and intern(author))
+        init(self, "thumbnail_url", thumbnail_url)
+        init(self, "channel_avatar", channel_avatar and intern(channel_avatar))
+        init(self, "duration", duration and intern(duration))
+        init(self, "duration_seconds", duration_seconds)
+        init(self, "publish_date", publish_date and intern(publish_date))
+        init(self, "video_type", video_type and intern(video_type))
+        init(self, "_tags", shared_tuple(tags))
+        init(self, "created_ms", to_ms(created_at or datetime.utcnow()))
+        init(self, "refreshed_ms", to_ms(last_refreshed))
+        init(self, "metadata_status", metadata_status and intern(metadata_status))
+        init(self, "manual_order", manual_order)
+
+    def __setattr__(self, name: str, value: Any):
+        if name in INTERNED and value is not None:
+            value = sys.intern(value)
+        object.__setattr__(self, name, value)
+
+    @property
+    def categories(self) -> Tuple[str, ...]:
+        return self._categories
+
+    @categories.setter
+    def categories(self, values: Iterable[str]):
+        self._categories = shared_tuple(values)
+
+    @property
+    def tags(self) -> Tuple[str, ...]:
+        return self._tags
+
+    @tags.setter
+    def tags(self, values: Iterable[str]):
+        self._tags = shared_tuple(values)
+
+    @property
+    def created_at(self) -> datetime:
+        return from_ms(self.created_ms)
+
+    @created_at.setter
+    def created_at(self, value: datetime):
+        self.created_ms = to_ms(value)
+
+    @property
+    def last_refreshed(self) -> Optional[datetime]:
+        return from_ms(self.refreshed_ms)
+
+    @last_refreshed.setter
+    def last_refreshed(self, value: Optional[datetime]):
+        self.refreshed_ms = to_ms(value)
+
+    @classmethod
+    def from_model(cls, link: "Link") -> "LinkRecord":
+        return cls(**{name: getattr(link, name) for name in FIELDS})
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LinkRecord":
+        """Validate one raw link dict (snapshot, journal) into a record."""
+        from .storage import Link
+
+        return cls.from_model(Link.model_validate(data))
+
+    def to_dict(self, include: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """JSON-ready dict, same shape as Link.model_dump(mode="json")."""
+        names = FIELDS if include is None else [n for n in FIELDS if n in include]
+        out: Dict[str, Any] = {}
+        for name in names:
+            if name == "created_at" or name == "last_refreshed":
+                value = getattr(self, name)
+                out[name] = value.isoformat() if value is not None else None
+            elif name == "categories" or name == "tags":
+                out[name] = list(getattr(self, name))
+            else:
+                out[name] = getattr(self, name)
+        return out
+
+    def to_row(self) -> List[Any]:
+        """Values in ROW_FIELDS order, for binary snapshots (tuples are shared, never mutated)."""
+        return [getattr(self, name) for name in ROW_FIELDS]
+
+    @classmethod
+    def from_row(cls, row: List[Any]) -> "LinkRecord":
+        """Inverse of to_row(). Rows come from our own snapshots, so nothing is validated."""
+        link = cls.__new__(cls)
+        for (slot, how), value in zip(_ROW_SLOTS, row):
+            if value is not None:
+                if how == 1:
+                    value = sys.intern(value)
+                elif how == 2:
+                    value = shared_tuple(value)
+            object.__setattr__(link, slot, value)
+        return link
+
+    def to_model(self) -> "Link":
+        from .storage import Link
+
+        data = {name: getattr(self, name) for name in FIELDS}
+        data["categories"] = list(self.categories)
+        data["tags"] = list(self.tags)
+        return Link.model_construct(**data)
+
+
+FIELDS = (
+    "id",
+    "original_url",
+    "normalized_url",
+    "categories",
+    "primary_category",
+    "title",
+    "author",
+    "thumbnail_url",
+    "channel_avatar",
+    "duration",
+    "duration_seconds",
+    "publish_date",
+    "video_type",
+    "tags",
+    "created_at",
+    "last_refreshed",
+    "metadata_status",
+    "manual_order",
+)
+
+# FIELDS as binary snapshots store them: timestamps as epoch milliseconds.
+ROW_FIELDS = tuple({"created_at": "created_ms", "last_refreshed": "refreshed_ms"}.get(n, n) for n in FIELDS)
+
+# (slot, 0 = as is | 1 = interned | 2 = shared tuple) for each ROW_FIELDS entry
+_ROW_SLOTS = tuple(
+    ("_" + n, 2) if n in ("categories", "tags") else (n, 1 if n in INTERNED else 0) for n in ROW_FIELDS
+)
@@ -0,0 +1,90 @@
+import heapq
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from .records import from_ms
+
+if TYPE_CHECKING:
+    from .index import LinkIndex
+    from .records import LinkRecord as Link
+
+TICK = 1.0  # seconds between scheduler passes
+# Unused refresh allowance carries over, but only this many links' worth,
+# so a long idle stretch does not turn into a burst.
+MAX_CREDIT = 8.0
+
+
+def _stamp(link: "Link") -> int:
+    return link.refreshed_ms if link.refreshed_ms is not None else link.created_ms
+
+
+class RefreshScheduler:
+    """
+    Feeds background metadata work into the job table a little at a time:
+    the startup backlog (links left pending or failed) and links whose
+    metadata is older than the configured max age.
+
+    Stale links come off a heap ordered by last refresh; entries are
+    pushed again whenever a link's metadata is applied, and outdated ones
+    are skipped when popped. Refreshes are paced by a credit that grows
+    at len(library) / max_age per second, so the library cycles evenly
+    once per max age instead of all links going stale together.
+    """
+
+    def __init__(self):
+        self.heap: List[Tuple[int, int]] = []  # (last refreshed or created ms, link id)
+        self.backlog: Deque[int] = deque()
+        self.credit = 0.0
+        self.counters = {"backlog_queued": 0, "refresh_queued": 0}
+
+    def load(self, links: Iterable["Link"]):
+        self.heap = []
+        self.backlog.clear()
+        for link in links:
+            self.heap.append((_stamp(link), link.id))
+            if link.metadata_status in ("pending", "failed"):
+                self.backlog.append(link.id)
+        heapq.heapify(self.heap)
+
+    def note(self, link: "Link"):
+        """Reschedule `link` after its metadata was refreshed (or a refresh gave up)."""
+        heapq.heappush(self.heap, (_stamp(link), link.id))
+
+    def take(
+        self, index: "LinkIndex", budget: int, max_age: float, elapsed: float
+    ) -> Tuple[List["Link"], List["Link"]]:
+        """Up to `budget` links to queue now: (backlog, stale)."""
+        backlog: List["Link"] = []
+        while self.backlog and len(backlog) < budget:
+            link = index.get(self.backlog.popleft())
+            if link is not None and link.metadata_status in ("pending", "failed"):
+                backlog.append(link)
+        budget -= len(backlog)
+        stale: List["Link"] = []
+        if max_age > 0:
+            self.credit = min(MAX_CREDIT, self.credit + len(index) * elapsed / max_age)
+            cutoff = int(time.time() * 1000 - max_age * 1000)
+            while self.heap and budget > 0 and self.credit >= 1 and self.heap[0][0] < cutoff:
+                stamp, link_id = heapq.heappop(self.heap)
+                link = index.get(link_id)
+                if link is None or _stamp(link) != stamp or link.metadata_status not in ("done", "failed"):
+                    continue  # deleted, refreshed since, or already queued
+                stale.append(link)
+                budget -= 1
+                self.credit -= 1
+        self.counters["backlog_queued"] += len(backlog)
+        self.counters["refresh_queued"] += len(stale)
+        return backlog, stale
+
+    def stats(self, max_age: float) -> Dict[str, Any]:
+        oldest: Optional[int] = self.heap[0][0] if self.heap else None
+        next_due = from_ms(oldest + int(max_age * 1000)) if oldest is not None and max_age > 0 else None
+        return {
+            **self.counters,
+            "backlog": len(self.backlog),
+            "tracked": len(self.heap),
+            "credit": round(self.credit, 2),
+            "max_age_seconds": max_age,
+            "next_due": next_due.isoformat() if next_due else None,
+        }
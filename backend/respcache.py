@@ -0,0 +1,133 @@
+import gzip
+import json
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+try:  # optional, noticeably faster for large dicts
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies smaller than this are not worth compressing.
+MIN_COMPRESS = 1024
+MAX_ENTRIES = 64
+
+
+def dumps(obj: Any) -> bytes:
+    if isinstance(obj, BaseModel):
+        # pydantic's own serializer; orjson would need a model_dump() first
+        return obj.model_dump_json().encode("utf-8")
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def make_etag(key: Hashable, revision: int) -> str:
+    return f'"{revision}-{zlib.crc32(repr(key).encode()):08x}"'
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """If-None-Match check, ignoring the per-encoding suffix of our own tags."""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    base = etag.strip('"')
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        tag = tag.strip('"')
+        if tag == base or tag.rsplit("-", 1)[0] == base:
+            return True
+    return False
+
+
+class CachedBody:
+    """One serialized response plus its lazily built compressed variants."""
+
+    __slots__ = ("etag", "raw", "variants")
+
+    def __init__(self, etag: str, raw: bytes):
+        self.etag = etag
+        self.raw = raw
+        self.variants: Dict[str, bytes] = {}
+
+    def encoded(self, accept_encoding: str) -> Tuple[bytes, Optional[str], str]:
+        """(body, content-encoding, etag) for the best encoding the client accepts."""
+        if len(self.raw) < MIN_COMPRESS:
+            return self.raw, None, self.etag
+        accepted = {part.split(";")[0].strip() for part in accept_encoding.lower().split(",")}
+        for encoding in ("br", "gzip"):
+            if encoding not in accepted or (encoding == "br" and brotli is None):
+                continue
+            body = self.variants.get(encoding)
+            if body is None:
+                if encoding == "br":
+                    body = brotli.compress(self.raw, quality=5)
+                else:
+                    body = gzip.compress(self.raw, compresslevel=6)
+                self.variants[encoding] = body
+            return body, encoding, self.etag[:-1] + "-" + encoding + '"'
+        return self.raw, None, self.etag
+
+
+class ResponseCache:
+    """
+    Serialized read responses keyed by (endpoint, params) and tagged with the
+    change-log revision they were built at. A lookup at the same revision
+    reuses the bytes (and compressed variants); a newer revision rebuilds.
+    Revisions come from ChangeLog, so every mutation that touches the log
+    invalidates exactly the responses that depend on it.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[Hashable, Tuple[int, CachedBody]]" = OrderedDict()
+        self.counters = {"hits": 0, "builds": 0, "not_modified": 0}
+
+    def get(self, key: Hashable, revision: int, build: Callable[[], Any]) -> CachedBody:
+        cached = self.entries.get(key)
+        if cached is not None and cached[0] == revision:
+            self.entries.move_to_end(key)
+            self.counters["hits"] += 1
+            return cached[1]
+        body = CachedBody(make_etag(key, revision), dumps(build()))
+        self.entries[key] = (revision, body)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        self.counters["builds"] += 1
+        return body
+
+    def respond(
+        self,
+        request: Request,
+        key: Hashable,
+        revision: int,
+        build: Callable[[], Any],
+        media_type: str = "application/json",
+    ) -> Response:
+        etag = make_etag(key, revision)
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            # the client already holds this revision; nothing to build or send
+            self.counters["not_modified"] += 1
+            return Response(status_code=304, headers=headers)
+        body = self.get(key, revision, build)
+        content, encoding, headers["ETag"] = body.encoded(request.headers.get("accept-encoding", ""))
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(content, media_type=media_type, headers=headers)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.counters, "entries": len(self.entries)}
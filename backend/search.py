@@ -0,0 +1,365 @@
+import heapq
+import math
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from functools import lru_cache
+from typing import TYPE_CHECKING, AbstractSet, Dict, Iterator, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from .records import LinkRecord as Link
+
+# Han, kana, Hangul and friends: no spaces between words, so index as n-grams.
+_CJK = (
+    r"\u2e80-\u2fdf\u3040-\u30ff\u3100-\u312f\u3190-\u31ff\u3400-\u4dbf"
+    r"\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff\uff66-\uff9f"
+)
+_TOKEN_RE = re.compile(rf"([{_CJK}]+)|([^\W_{_CJK}]+)")
+
+FIELD_BOOSTS = {
+    "title": 3.0,
+    "author": 2.0,
+    "tags": 1.5,
+    "categories": 1.0,
+    "url": 0.5,
+}
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# A prefix that is not itself a full term scores a bit lower than an exact hit.
+PREFIX_PENALTY = 0.7
+MAX_PREFIX_EXPANSIONS = 64
+
+# Up to this many matches are simply all scored. Above it, the top of the
+# ranking is found by walking each query term's documents best first and
+# stopping once no unseen document can make the page (threshold algorithm).
+SCORE_ALL = 2000
+# The best-first order of a term is kept for terms with this many documents,
+# for the IMPACT_TERMS most recently searched ones; smaller ones are sorted
+# per query.
+IMPACT_MIN = 256
+IMPACT_TERMS = 32
+
+# Terms new to the vocabulary are buffered and merged into the sorted list in
+# one sort when this many wait or a prefix lookup needs them: every video id
+# is a new term, and inserting each into a 100k-term list shifts half of it.
+VOCAB_PENDING = 4096
+
+# term frequency -> [(doc length, -doc id)] ascending, i.e. best score first
+Impacts = Dict[float, List[Tuple[float, int]]]
+
+
+def _fold(text: str) -> str:
+    return unicodedata.normalize("NFKC", text).casefold()
+
+
+def tokenize(text: str, query: bool = False) -> List[str]:
+    """
+    Split text into searchable terms. Latin/Cyrillic/etc. runs become words;
+    CJK runs become character bigrams (plus unigrams when indexing, so a
+    single-character query still matches).
+    """
+    tokens: List[str] = []
+    for m in _TOKEN_RE.finditer(_fold(text or "")):
+        cjk, word = m.group(1), m.group(2)
+        if word:
+            tokens.append(word)
+            continue
+        if len(cjk) == 1:
+            tokens.append(cjk)
+            continue
+        tokens.extend(cjk[i : i + 2] for i in range(len(cjk) - 1))
+        if not query:
+            tokens.extend(cjk)
+    return tokens
+
+
+def _video_id(url: str) -> str:
+    # normalized URLs look like https://www.youtube.com/watch?v=ID[&t=..]
+    _, _, rest = url.partition("v=")
+    return rest.split("&", 1)[0]
+
+
+@lru_cache(maxsize=4096)
+def _shared_tokens(text: str) -> Tuple[str, ...]:
+    """tokenize() for values many links share (authors, tag and category sets)."""
+    return tuple(tokenize(text))
+
+
+def _doc_terms(link: "Link") -> Dict[str, float]:
+    weights: Dict[str, float] = {}
+    fields = (
+        ("title", tokenize(link.title or "")),
+        ("author", _shared_tokens(link.author or "")),
+        ("tags", _shared_tokens(" ".join(link.tags or []))),
+        ("categories", _shared_tokens(" ".join(link.categories or []))),
+        ("url", tokenize(_video_id(link.normalized_url))),
+    )
+    for field, tokens in fields:
+        boost = FIELD_BOOSTS[field]
+        for tok in tokens:
+            weights[tok] = weights.get(tok, 0.0) + boost
+    return weights
+
+
+class SearchIndex:
+    """
+    Incrementally maintained inverted index with BM25F-style scoring.
+    Term frequencies are pre-multiplied by field boosts, so a title hit
+    outweighs the same word in tags.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[int, float]] = {}
+        self.doc_terms: Dict[int, Dict[str, float]] = {}
+        self.doc_len: Dict[int, float] = {}
+        self.total_len = 0.0
+        self.vocab: List[str] = []  # sorted, for prefix lookups
+        self.vocab_pending: List[str] = []  # not merged into `vocab` yet
+        # common searched terms -> (impacts, entries left behind by removals)
+        self.impacts: "OrderedDict[str, List]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.doc_terms)
+
+    def update(self, link: "Link"):
+        self.remove(link.id)
+        new_terms = self._add(link)
+        if new_terms:
+            self.vocab_pending.extend(new_terms)
+            if len(self.vocab_pending) >= VOCAB_PENDING:
+                self._merge_vocab()
+
+    def update_many(self, links: List["Link"]):
+        """update() for a batch, sorting the vocabulary once at the end."""
+        new_terms: List[str] = []
+        for link in links:
+            self.remove(link.id)
+            new_terms.extend(self._add(link))
+        if new_terms:
+            self.vocab_pending.extend(new_terms)
+            self._merge_vocab()
+
+    def _merge_vocab(self) -> List[str]:
+        if self.vocab_pending:
+            self.vocab.extend(self.vocab_pending)
+            self.vocab.sort()
+            self.vocab_pending = []
+        return self.vocab
+
+    def _add(self, link: "Link") -> List[str]:
+        """Index `link`; returns the terms that are new to the vocabulary."""
+        terms = _doc_terms(link)
+        self.doc_terms[link.id] = terms
+        length = sum(terms.values())
+        self.doc_len[link.id] = length
+        self.total_len += length
+        new_terms = []
+        impacts = self.impacts
+        for term, weight in terms.items():
+            posting = self.postings.get(term)
+            if posting is None:
+                posting = self.postings[term] = {}
+                new_terms.append(term)
+            posting[link.id] = weight
+            if term in impacts:
+                insort(impacts[term][0].setdefault(weight, []), (length, -link.id))
+        return new_terms
+
+    def remove(self, link_id: int):
+        terms = self.doc_terms.pop(link_id, None)
+        if terms is None:
+            return
+        self.total_len -= self.doc_len.pop(link_id, 0.0)
+        impacts = self.impacts
+        for term in terms:
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            posting.pop(link_id, None)
+            cached = impacts.get(term)
+            if cached is not None:
+                # the entry stays until too many have; readers skip it
+                cached[1] += 1
+                if cached[1] > len(posting):
+                    del impacts[term]
+            if not posting:
+                del self.postings[term]
+                i = bisect_left(self.vocab, term)
+                if i < len(self.vocab) and self.vocab[i] == term:
+                    del self.vocab[i]
+                else:
+                    self.vocab_pending.remove(term)
+
+    def _expand(self, token: str) -> List[Tuple[str, float]]:
+        """Exact term plus vocabulary terms it is a prefix of."""
+        if len(token) < 2:
+            # a single letter would expand to half the vocabulary
+            return [(token, 1.0)] if token in self.postings else []
+        out: List[Tuple[str, float]] = []
+        vocab = self._merge_vocab()
+        i = bisect_left(vocab, token)
+        while i < len(vocab) and len(out) < MAX_PREFIX_EXPANSIONS:
+            term = vocab[i]
+            if not term.startswith(token):
+                break
+            out.append((term, 1.0 if term == token else PREFIX_PENALTY))
+            i += 1
+        return out
+
+    def search(
+        self,
+        query: str,
+        allowed: Optional[Set[int]] = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> Tuple[List[int], int]:
+        """
+        Return (ids for the requested page, total match count). Every query
+        token must match (as a word or prefix); `allowed` narrows the
+        candidates, e.g. to a category/tag intersection.
+        """
+        tokens = list(dict.fromkeys(tokenize(query, query=True)))
+        if not tokens:
+            return [], 0
+
+        expansions = []
+        for tok in tokens:
+            terms = self._expand(tok)
+            if not terms:
+                return [], 0
+            expansions.append(terms)
+
+        # candidate set via C-level set ops before any per-document scoring
+        per_token_docs = []
+        for terms in expansions:
+            if len(terms) == 1:
+                per_token_docs.append(self.postings[terms[0][0]].keys())
+            else:
+                per_token_docs.append(set().union(*(self.postings[t].keys() for t, _ in terms)))
+        per_token_docs.sort(key=len)
+        if allowed is not None:
+            per_token_docs.insert(0, allowed)
+        # only read from here on, so a single posting needs no copy
+        matched = per_token_docs[0]
+        for docs in per_token_docs[1:]:
+            matched = matched & docs
+        if not matched:
+            return [], 0
+
+        n_docs = len(self.doc_terms) or 1
+        avgdl = (self.total_len / n_docs) or 1.0
+        # fold idf, prefix factor and (k1 + 1) into one constant per term
+        weighted = []
+        for terms in expansions:
+            group = []
+            for term, factor in terms:
+                df = len(self.postings[term])
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                group.append((term, factor * idf * (K1 + 1)))
+            weighted.append(group)
+
+        norm_base, norm_scale = K1 * (1 - B), K1 * B / avgdl
+        k = offset + limit
+        if len(matched) <= max(SCORE_ALL, k):
+            scored = [(self._score(doc_id, weighted, norm_base, norm_scale), doc_id) for doc_id in matched]
+            top = heapq.nlargest(k, scored)
+        else:
+            top = self._top(matched, weighted, norm_base, norm_scale, k)
+        return [doc_id for _, doc_id in top[offset:]], len(matched)
+
+    def _score(self, doc_id: int, weighted: List[List[Tuple[str, float]]], norm_base: float, norm_scale: float) -> float:
+        norm = norm_base + norm_scale * self.doc_len[doc_id]
+        doc = self.doc_terms[doc_id]
+        total = 0.0
+        for group in weighted:
+            best = 0.0
+            for term, weight in group:
+                tf = doc.get(term)
+                if tf:
+                    s = weight * tf / (tf + norm)
+                    if s > best:
+                        best = s
+            total += best
+        return total
+
+    def _top(
+        self, matched: AbstractSet[int], weighted: List[List[Tuple[str, float]]], norm_base: float, norm_scale: float, k: int
+    ) -> List[Tuple[float, int]]:
+        """
+        heapq.nlargest(k) of the scores of `matched`, without scoring all of
+        them. Each query token's documents arrive best first; a document not
+        seen yet scores at most the sum of the tokens' next scores, so once
+        the k-th best beats that sum the rest cannot make the page.
+        """
+        streams = [self._best_first(group, norm_base, norm_scale) for group in weighted]
+        heads = [next(stream, None) for stream in streams]
+        top: List[Tuple[float, int]] = []
+        seen: Set[int] = set()
+        single = len(streams) == 1
+        while None not in heads:
+            # a token with nothing left means every document having it was seen
+            if len(top) == k and top[0][0] > sum(score for score, _ in heads):
+                break
+            for i, stream in enumerate(streams):
+                score, doc_id = heads[i]
+                heads[i] = next(stream, None)
+                if doc_id in seen:
+                    continue
+                seen.add(doc_id)
+                if doc_id not in matched:
+                    continue
+                if not single:
+                    score = self._score(doc_id, weighted, norm_base, norm_scale)
+                if len(top) < k:
+                    heapq.heappush(top, (score, doc_id))
+                elif (score, doc_id) > top[0]:
+                    heapq.heapreplace(top, (score, doc_id))
+        top.sort(reverse=True)
+        return top
+
+    def _best_first(self, group: List[Tuple[str, float]], norm_base: float, norm_scale: float) -> Iterator[Tuple[float, int]]:
+        """(score, doc id) for one query token (the best of its terms), best first, ties by higher id."""
+        heap = []
+        for term, weight in group:
+            posting = self.postings[term]
+            for tf, entries in self._impacts(term).items():
+                lst = iter(entries)
+                for dl, neg_id in lst:
+                    if posting.get(-neg_id) == tf and self.doc_len.get(-neg_id) == dl:
+                        heap.append((-(weight * tf / (tf + norm_base + norm_scale * dl)), neg_id, weight, tf, posting, lst))
+                        break
+        heapq.heapify(heap)
+        doc_len = self.doc_len
+        while heap:
+            neg_score, neg_id, weight, tf, posting, lst = heap[0]
+            yield -neg_score, -neg_id
+            for dl, neg_id in lst:
+                # entries of removed or re-indexed documents are left behind; skip them
+                if posting.get(-neg_id) == tf and doc_len.get(-neg_id) == dl:
+                    heapq.heapreplace(heap, (-(weight * tf / (tf + norm_base + norm_scale * dl)), neg_id, weight, tf, posting, lst))
+                    break
+            else:
+                heapq.heappop(heap)
+
+    def _impacts(self, term: str) -> Impacts:
+        """The documents of `term` grouped by frequency, each group best score first (for any avgdl)."""
+        cached = self.impacts.get(term)
+        if cached is not None:
+            self.impacts.move_to_end(term)
+            return cached[0]
+        posting = self.postings[term]
+        doc_len = self.doc_len
+        impacts: Impacts = {}
+        for doc_id, tf in posting.items():
+            impacts.setdefault(tf, []).append((doc_len[doc_id], -doc_id))
+        for entries in impacts.values():
+            entries.sort()
+        if len(posting) >= IMPACT_MIN:
+            self.impacts[term] = [impacts, 0]
+            if len(self.impacts) > IMPACT_TERMS:
+                self.impacts.popitem(last=False)
+        return impacts
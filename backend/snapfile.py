@@ -0,0 +1,90 @@
+import json
+import struct
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Sequence, Union
+
+try:  # optional, several times faster on the row chunks
+    import orjson
+except ImportError:
+    orjson = None
+
+from .records import ROW_FIELDS
+
+MAGIC = b"LCSNAP"
+VERSION = 1
+_PREFIX = struct.Struct("<6sHI")  # magic, version, header length
+
+# The first chunk is what startup indexes before serving (at least one
+# full page of GET /api/links); the rest is hydrated in the background.
+FIRST_CHUNK = 500
+CHUNK = 4096
+
+
+def _dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def write(f: BinaryIO, meta: Dict[str, Any], rows: List[Sequence[Any]]):
+    """
+    Write a snapshot: a fixed prefix, a JSON header (`meta` plus the row
+    layout and an (offset, length, count) index of chunks) and the rows,
+    newest first, as chunks of JSON arrays. A reader can index the newest
+    links alone and seek to the rest later.
+    """
+    blobs: List[bytes] = []
+    chunks: List[List[int]] = []
+    offset = start = 0
+    size = FIRST_CHUNK
+    while start < len(rows):
+        part = rows[start : start + size]
+        blob = _dumps(part)
+        chunks.append([offset, len(blob), len(part)])
+        blobs.append(blob)
+        offset += len(blob)
+        start += len(part)
+        size = CHUNK
+    header = _dumps({**meta, "fields": list(ROW_FIELDS), "count": len(rows), "chunks": chunks})
+    f.write(_PREFIX.pack(MAGIC, VERSION, len(header)))
+    f.write(header)
+    for blob in blobs:
+        f.write(blob)
+
+
+class SnapshotReader:
+    """Reads the header eagerly and row chunks on demand, in any order."""
+
+    def __init__(self, source: Union[Path, BinaryIO]):
+        path = source if isinstance(source, Path) else "snapshot"
+        self._f = open(source, "rb") if isinstance(source, Path) else source
+        try:
+            magic, version, length = _PREFIX.unpack(self._f.read(_PREFIX.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a LinkCascade snapshot")
+            if version != VERSION:
+                raise ValueError(f"{path}: unsupported snapshot version {version}")
+            self.header: Dict[str, Any] = _loads(self._f.read(length))
+            if tuple(self.header["fields"]) != ROW_FIELDS:
+                raise ValueError(f"{path}: row layout {self.header['fields']} does not match this build")
+        except Exception:
+            self._f.close()
+            raise
+        self._base = self._f.tell()
+
+    def __len__(self) -> int:
+        return len(self.header["chunks"])
+
+    def chunk(self, i: int) -> List[List[Any]]:
+        offset, length, _count = self.header["chunks"][i]
+        self._f.seek(self._base + offset)
+        return _loads(self._f.read(length))
+
+    def close(self):
+        self._f.close()
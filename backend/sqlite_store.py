@@ -0,0 +1,247 @@
+import json
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+from .records import ROW_FIELDS, LinkRecord, to_ms
+from .storage import LINK_FIELD_OPS, upgrade_legacy
+from . import snapfile
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS links (
+    id INTEGER PRIMARY KEY,
+    original_url TEXT NOT NULL,
+    normalized_url TEXT NOT NULL,
+    primary_category TEXT NOT NULL DEFAULT 'Unsorted',
+    title TEXT,
+    author TEXT,
+    thumbnail_url TEXT,
+    channel_avatar TEXT,
+    duration TEXT,
+    duration_seconds INTEGER,
+    publish_date TEXT,
+    video_type TEXT,
+    created_ms INTEGER NOT NULL,
+    refreshed_ms INTEGER,
+    metadata_status TEXT NOT NULL DEFAULT 'pending',
+    manual_order INTEGER
+);
+CREATE TABLE IF NOT EXISTS link_categories (
+    link_id INTEGER NOT NULL REFERENCES links(id) ON DELETE CASCADE,
+    category TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (link_id, category)
+);
+CREATE TABLE IF NOT EXISTS tags (
+    link_id INTEGER NOT NULL REFERENCES links(id) ON DELETE CASCADE,
+    tag TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (link_id, tag)
+);
+CREATE TABLE IF NOT EXISTS config (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_links_normalized_url ON links(normalized_url);
+CREATE INDEX IF NOT EXISTS idx_links_primary_category ON links(primary_category);
+CREATE INDEX IF NOT EXISTS idx_links_metadata_status ON links(metadata_status);
+CREATE INDEX IF NOT EXISTS idx_link_categories_category ON link_categories(category);
+CREATE INDEX IF NOT EXISTS idx_tags_tag ON tags(tag);
+"""
+
+# ROW_FIELDS without the two lists, which live in their own tables
+COLUMNS = [name for name in ROW_FIELDS if name not in ("categories", "tags")]
+_CATEGORIES = ROW_FIELDS.index("categories")
+_TAGS = ROW_FIELDS.index("tags")
+_INSERT = f"INSERT OR REPLACE INTO links ({', '.join(COLUMNS)}) VALUES ({', '.join('?' for _ in COLUMNS)})"
+
+# journal field names whose column holds epoch milliseconds
+_MS_COLUMNS = {"created_at": "created_ms", "last_refreshed": "refreshed_ms"}
+
+
+class SqliteStore:
+    """
+    SQLite (WAL) persistence for the library, in place of the snapshot +
+    journal: record_many() turns each journaled mutation into a small row
+    update in one transaction per batch, so nothing ever rewrites the whole
+    library. Rows use the binary snapshot's layout (LinkRecord.to_row), so
+    loading needs no validation.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+
+    def load(self) -> Tuple[Dict[str, Any], List[LinkRecord]]:
+        """(next_id/categories/config, links newest first)."""
+        with self._lock:
+            meta = {key: json.loads(value) for key, value in self.conn.execute("SELECT key, value FROM config")}
+            children = {
+                name: self._children(table, column)
+                for name, table, column in (("categories", "link_categories", "category"), ("tags", "tags", "tag"))
+            }
+            links = []
+            for row in self.conn.execute(f"SELECT {', '.join(COLUMNS)} FROM links ORDER BY id DESC"):
+                values = dict(zip(COLUMNS, row))
+                values["categories"] = children["categories"].get(row[0], ())
+                values["tags"] = children["tags"].get(row[0], ())
+                links.append(LinkRecord.from_row([values[name] for name in ROW_FIELDS]))
+        return meta, links
+
+    def replace(self, meta: Dict[str, Any], links: Iterable[LinkRecord]):
+        """Make the database hold exactly `meta` and `links`, in one transaction."""
+        with self._lock:
+            self.conn.execute("BEGIN")
+            try:
+                for table in ("tags", "link_categories", "links", "config"):
+                    self.conn.execute(f"DELETE FROM {table}")
+                for link in links:
+                    self._insert(link.to_row())
+                for key, value in meta.items():
+                    self._set(key, value)
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def record_many(self, entries: List[Tuple[str, Dict[str, Any]]]):
+        """Apply journal-style (op, data) mutations in one transaction."""
+        with self._lock:
+            self.conn.execute("BEGIN")
+            try:
+                for op, data in entries:
+                    self._apply(op, data)
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def _apply(self, op: str, data: Dict[str, Any]):
+        if op == "link_added":
+            link = LinkRecord.from_dict(data["link"])
+            self._insert(link.to_row())
+            row = self.conn.execute("SELECT value FROM config WHERE key = 'next_id'").fetchone()
+            self._set("next_id", max(json.loads(row[0]) if row else 1, link.id + 1))
+        elif op == "link_deleted":
+            self.conn.execute("DELETE FROM links WHERE id = ?", (data["id"],))
+        elif op in LINK_FIELD_OPS:
+            self._update(data["id"], data["fields"])
+        elif op == "categories_updated":
+            self._set("categories", data["categories"])
+        elif op == "config_updated":
+            self._set("config", data["config"])
+
+    def _children(self, table: str, column: str) -> Dict[int, Tuple[str, ...]]:
+        out: Dict[int, List[str]] = {}
+        for link_id, value in self.conn.execute(f"SELECT link_id, {column} FROM {table} ORDER BY link_id, position"):
+            out.setdefault(link_id, []).append(value)
+        return out
+
+    def _set(self, key: str, value: Any):
+        self.conn.execute("INSERT OR REPLACE INTO config (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def _insert(self, row: List[Any]):
+        link_id = row[0]
+        self.conn.execute(_INSERT, [v for i, v in enumerate(row) if i not in (_CATEGORIES, _TAGS)])
+        self._replace_children(link_id, "link_categories", "category", row[_CATEGORIES])
+        self._replace_children(link_id, "tags", "tag", row[_TAGS])
+
+    def _update(self, link_id: int, fields: Dict[str, Any]):
+        values = {}
+        for name, value in fields.items():
+            if name in _MS_COLUMNS:
+                name, value = _MS_COLUMNS[name], to_ms(datetime.fromisoformat(value)) if value else None
+            if name in COLUMNS and name != "id":
+                values[name] = value
+        if values:
+            self.conn.execute(
+                f"UPDATE links SET {', '.join(f'{c} = ?' for c in values)} WHERE id = ?", [*values.values(), link_id]
+            )
+        if "categories" in fields:
+            self._replace_children(link_id, "link_categories", "category", fields["categories"] or ())
+        if "tags" in fields:
+            self._replace_children(link_id, "tags", "tag", fields["tags"] or ())
+
+    def _replace_children(self, link_id: int, table: str, column: str, values: Iterable[str]):
+        self.conn.execute(f"DELETE FROM {table} WHERE link_id = ?", (link_id,))
+        self.conn.executemany(
+            f"INSERT OR IGNORE INTO {table} (link_id, {column}, position) VALUES (?, ?, ?)",
+            [(link_id, v, i) for i, v in enumerate(values)],
+        )
+
+
+def _read_source(path: Path) -> Tuple[Dict[str, Any], List[LinkRecord]]:
+    """A binary snapshot, a draft_state.json or a legacy single-category links.json."""
+    if path.suffix == ".snap":
+        reader = snapfile.SnapshotReader(path)
+        try:
+            return reader.header, [LinkRecord.from_row(row) for i in range(len(reader)) for row in reader.chunk(i)]
+        finally:
+            reader.close()
+    with open(path, "r", encoding="utf-8") as f:
+        data = upgrade_legacy(json.load(f))
+    return data, [LinkRecord.from_dict(raw) for raw in data.get("links", [])]
+
+
+def migrate(db_path: Path, sources: List[Path]) -> Tuple[Dict[str, Any], List[LinkRecord]]:
+    """
+    One-shot import into a SQLite database. With no `sources`, the current
+    library (snapshot + journal, as the server would load it) is imported;
+    otherwise the given files are, in order. Links from later sources are
+    merged into earlier ones by normalized URL (categories combined) and
+    renumbered when their id is taken. The database is replaced.
+    """
+    if sources:
+        loaded = [_read_source(path) for path in sources]
+    else:
+        from . import storage
+
+        state = storage.load_files()
+        loaded = [(state.model_dump(mode="json", include={"next_id", "categories", "config"}), state.index.ordered())]
+
+    meta: Dict[str, Any] = {"next_id": 1, "categories": ["Unsorted"]}
+    by_url: Dict[str, LinkRecord] = {}
+    by_id: Dict[int, LinkRecord] = {}
+    for i, (data, links) in enumerate(loaded):
+        if i == 0 and "config" in data:
+            meta["config"] = data["config"]
+        meta["categories"] += [c for c in data.get("categories", []) if c not in meta["categories"]]
+        meta["next_id"] = max(meta["next_id"], data.get("next_id", 1))
+        for link in sorted(links, key=lambda l: l.id):
+            existing = by_url.get(link.normalized_url)
+            if existing is not None:
+                existing.categories = list(dict.fromkeys([*existing.categories, *link.categories]))
+                continue
+            if link.id in by_id:
+                link.id = max(meta["next_id"], max(by_id) + 1)
+            by_url[link.normalized_url] = by_id[link.id] = link
+            meta["next_id"] = max(meta["next_id"], link.id + 1)
+    links = sorted(by_id.values(), key=lambda l: l.id, reverse=True)
+
+    store = SqliteStore(db_path)
+    try:
+        store.replace(meta, links)
+    finally:
+        store.close()
+    return meta, links
+
+
+if __name__ == "__main__":
+    # python -m backend.sqlite_store draft_state.db [draft_state.json backend/data/links.json ...]
+    if len(sys.argv) < 2:
+        print("usage: python -m backend.sqlite_store <db> [source.json|source.snap ...]")
+        sys.exit(2)
+    meta, links = migrate(Path(sys.argv[1]), [Path(p) for p in sys.argv[2:]])
+    print(f"[migrate] {len(links)} links, {len(meta['categories'])} categories -> {sys.argv[1]}")
@@ -1,10 +1,63 @@
 import json
+import os
+import threading
+import time
 from pathlib import Path
-from pydantic import BaseModel, Field
-from typing import List, Dict, Any
+from pydantic import BaseModel, Field, PrivateAttr, computed_field, field_serializer
+from typing import Iterable, List, Dict, Any, Optional, Set, Tuple
 from datetime import datetime
 
+from .changes import ChangeLog
+from .index import LinkIndex
+from .jobs import JobTable
+from .journal import Journal
+from .metrics import flush_entries, flush_latency, snapshot_latency
+from .records import LinkRecord
+from . import snapfile
+from .writeback import WriteBehind
+
 STATE_FILE = Path("draft_state.json")
+SNAP_FILE = Path("draft_state.snap")
+JOURNAL_FILE = Path("draft_state.journal")
+
+# Snapshot format: "binary" (draft_state.snap, loads
+# without validation and can be hydrated lazily) or "json" (draft_state.json,
+# human readable). At startup draft_state.snap wins whenever it exists; the
+# JSON file is only read without one (a JSON save deletes the binary file).
+SNAPSHOT_FORMAT = os.environ.get("LINKCASCADE_SNAPSHOT", "binary").lower()
+
+# "snapshot" (the files above + journal) or "sqlite" (one row per link in
+# DB_FILE, updated in place; see backend/sqlite_store.py).
+STORAGE_BACKEND = os.environ.get("LINKCASCADE_STORAGE", "snapshot").lower()
+DB_FILE = Path(os.environ.get("LINKCASCADE_DB", "draft_state.db"))
+
+# Fold the journal back into the snapshot after this many entries.
+COMPACT_EVERY = 500
+
+# Mutations are persisted by a background writer: one write + fsync for
+# everything recorded within FLUSH_MS, or sooner once FLUSH_EVERY are waiting.
+FLUSH_MS = int(os.environ.get("LINKCASCADE_FLUSH_MS", "50"))
+FLUSH_EVERY = int(os.environ.get("LINKCASCADE_FLUSH_EVERY", "512"))
+
+# Jobs embedded in /api/draft; the rest are paged through /api/queue.
+QUEUE_PREVIEW = 200
+
+# Derived fields that are served to clients but never persisted.
+SNAPSHOT_EXCLUDE = {"revision", "queue", "queue_counts"}
+
+# Journal ops that merge a `fields` dict into an existing link.
+LINK_FIELD_OPS = {"tags_updated", "category_changed", "metadata_merged"}
+
+journal = Journal(JOURNAL_FILE)
+_compacting = threading.Lock()
+_sqlite_store = None
+_writer = None
+_snapshot_seq = 0
+
+# Cleared while load_state(lazy=True) leaves part of a snapshot in `hydration`.
+hydrated = threading.Event()
+hydrated.set()
+hydration: Optional["Hydration"] = None
 
 
 class Link(BaseModel):
@@ -31,6 +84,8 @@ class Link(BaseModel):
 class Config(BaseModel):
     rate_limit_per_second: int = 20
     rate_limit_per_minute: int = 150
+    metadata_workers: int = 4
+    metadata_max_age_days: float = 30  # refresh metadata older than this in the background; 0 = never
     duplicate_policy: str = "block_category"  # block_category | warn_global | allow_all
     category_order_strategy: str = "recent"  # recent | alphabetical | most_items | pinned_first
     pinned_categories: List[str] = Field(default_factory=list)
@@ -45,22 +100,428 @@ class Config(BaseModel):
 
 
 class AppState(BaseModel):
+    """
+    Links passed in `links` are moved into the index as compact LinkRecords
+    on construction, so the field itself stays empty at runtime; it is
+    serialized from the index, newest first.
+    """
+
     next_id: int = 1
     categories: List[str] = ["Unsorted"]
     links: List[Link] = Field(default_factory=list)
     config: Config = Field(default_factory=Config)
-    queue: List[Dict[str, Any]] = Field(default_factory=list)
 
+    _index: LinkIndex = PrivateAttr(default_factory=LinkIndex)
+    _changes: ChangeLog = PrivateAttr(default_factory=ChangeLog)
+    _jobs: JobTable = PrivateAttr(default_factory=JobTable)
+
+    def model_post_init(self, __context: Any):
+        if self.links:
+            self._index.rebuild(LinkRecord.from_model(l) for l in self.links)
+            self.links = []
+
+    def load_links(self, raw: Iterable[Dict[str, Any]]):
+        """Index raw link dicts (newest first) one at a time, without a full list of models."""
+        self._index.rebuild(LinkRecord.from_dict(d) for d in raw)
+
+    @field_serializer("links")
+    def _serialize_links(self, _links: List[Link]) -> List[Dict[str, Any]]:
+        return [link.to_dict() for link in self._index.ordered()]
+
+    # read straight from the private dict: `self._index` goes through
+    # BaseModel.__getattr__, and these are used several times per link
+    @property
+    def index(self) -> LinkIndex:
+        return self.__pydantic_private__["_index"]
+
+    @property
+    def changes(self) -> ChangeLog:
+        return self.__pydantic_private__["_changes"]
+
+    @property
+    def jobs(self) -> JobTable:
+        return self.__pydantic_private__["_jobs"]
+
+    @computed_field
+    @property
+    def revision(self) -> int:
+        """Bumped on every change; clients pass it to /api/changes."""
+        return self._changes.rev
+
+    @computed_field
+    @property
+    def queue(self) -> List[Dict[str, Any]]:
+        """The first QUEUE_PREVIEW jobs; the full table is behind /api/queue."""
+        return self._jobs.listing(QUEUE_PREVIEW)
+
+    @computed_field
+    @property
+    def queue_counts(self) -> Dict[str, int]:
+        return self._jobs.counts()
+
+
+def upgrade_legacy(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Map the old single `category` field onto categories/primary_category."""
+    for link in data.get("links", []):
+        cat = link.pop("category", None)
+        if cat and not link.get("categories"):
+            link["categories"] = [cat]
+            link.setdefault("primary_category", cat)
+        if cat and cat not in data.setdefault("categories", ["Unsorted"]):
+            data["categories"].append(cat)
+    return data
+
+
+def _sqlite():
+    global _sqlite_store
+    if _sqlite_store is None:
+        from .sqlite_store import SqliteStore
+
+        _sqlite_store = SqliteStore(DB_FILE)
+    return _sqlite_store
+
+
+class Replay:
+    """
+    Journal entries newer than a snapshot, folded per link so they can be
+    applied while the snapshot's links are read, in one pass or lazily.
+    """
+
+    def __init__(self, entries: List[Dict[str, Any]], base_seq: int):
+        self.added: Dict[int, Dict[str, Any]] = {}
+        self.deleted: Set[int] = set()
+        self.fields: Dict[int, Dict[str, Any]] = {}
+        self.meta: Dict[str, Any] = {}
+        for entry in entries:
+            if entry.get("seq", 0) <= base_seq:
+                continue
+            op = entry["op"]
+            if op == "link_added":
+                link = entry["link"]
+                self.added[link["id"]] = link
+                self.meta["next_id"] = max(self.meta.get("next_id", 1), link["id"] + 1)
+            elif op == "link_deleted":
+                if self.added.pop(entry["id"], None) is None:
+                    self.deleted.add(entry["id"])
+                    self.fields.pop(entry["id"], None)
+            elif op in LINK_FIELD_OPS:
+                link = self.added.get(entry["id"])
+                if link is not None:
+                    link.update(entry["fields"])
+                elif entry["id"] not in self.deleted:
+                    self.fields.setdefault(entry["id"], {}).update(entry["fields"])
+            elif op == "categories_updated":
+                self.meta["categories"] = entry["categories"]
+            elif op == "config_updated":
+                self.meta["config"] = entry["config"]
+
+    def apply_meta(self, data: Dict[str, Any]):
+        next_id = max(data.get("next_id", 1), self.meta.get("next_id", 1))
+        data.update(self.meta)
+        data["next_id"] = next_id
+
+    def new_links(self) -> List[Dict[str, Any]]:
+        """Links added since the snapshot, newest first, matching add_link."""
+        return list(reversed(self.added.values()))
+
+    def link(self, raw: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if raw["id"] in self.deleted:
+            return None
+        fields = self.fields.get(raw["id"])
+        if fields:
+            raw.update(fields)
+        return raw
+
+    def records(self, rows: List[List[Any]]) -> List[LinkRecord]:
+        """Binary snapshot rows as records, with the journal applied."""
+        out = []
+        for row in rows:
+            link_id = row[0]
+            if link_id in self.deleted:
+                continue
+            fields = self.fields.get(link_id)
+            if fields:
+                raw = LinkRecord.from_row(row).to_dict()
+                raw.update(fields)
+                link = LinkRecord.from_dict(raw)
+            else:
+                link = LinkRecord.from_row(row)
+            if link.metadata_status == "fetching":
+                link.metadata_status = "pending"
+            out.append(link)
+        return out
+
+
+def _replay(data: Dict[str, Any], entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Apply journal entries newer than the snapshot to its raw JSON form."""
+    replay = Replay(entries, data.pop("journal_seq", 0))
+    replay.apply_meta(data)
+    links = [l for l in map(replay.link, data.get("links", [])) if l is not None]
+    data["links"] = replay.new_links() + links
+    return data
+
+
+class Hydration:
+    """
+    The part of a binary snapshot that load_state(lazy=True) left out: the
+    server indexes it chunk by chunk after startup (next_chunk() on a
+    thread, LinkIndex.backfill() on the loop), then calls finish().
+    """
+
+    def __init__(self, reader: snapfile.SnapshotReader, replay: Replay, loaded: int):
+        self.reader = reader
+        self.replay = replay
+        self.next = 1
+        self.loaded = loaded
+        self.total = reader.header["count"] - len(replay.deleted) + len(replay.added)
+        self.started = time.perf_counter()
+        self.seconds: Optional[float] = None
+
+    def next_chunk(self) -> Optional[List[LinkRecord]]:
+        if self.next >= len(self.reader):
+            return None
+        links = self.replay.records(self.reader.chunk(self.next))
+        self.next += 1
+        self.loaded += len(links)
+        return links
+
+    def finish(self):
+        global hydration
+        self.reader.close()
+        self.seconds = time.perf_counter() - self.started
+        hydration = None
+        hydrated.set()
 
-def load_state() -> AppState:
-    if not STATE_FILE.exists():
-        return AppState()
-    with open(STATE_FILE, "r") as f:
-        data = json.load(f)
-    return AppState.model_validate(data)
+    def stats(self) -> Dict[str, Any]:
+        return {"loaded": self.loaded, "total": self.total, "chunks_left": len(self.reader) - self.next}
+
+
+def _open_journal(snapshot_seq: int) -> List[Dict[str, Any]]:
+    global _snapshot_seq
+    _snapshot_seq = snapshot_seq
+    entries = journal.read()
+    last_seq = max([snapshot_seq] + [e.get("seq", 0) for e in entries])
+    journal.open(last_seq, pending=sum(1 for e in entries if e.get("seq", 0) > snapshot_seq))
+    return entries
+
+
+def load_state(lazy: bool = False) -> AppState:
+    """
+    Load the library. With `lazy` and a binary snapshot, only its newest
+    chunk is indexed before returning; the rest is left in `hydration`
+    and `hydrated` stays clear until the caller finishes it.
+    """
+    if STORAGE_BACKEND == "sqlite":
+        return _load_sqlite()
+    return load_files(lazy)
+
+
+def _load_sqlite() -> AppState:
+    if not DB_FILE.exists() and (SNAP_FILE.exists() or STATE_FILE.exists()):
+        # first start on SQLite: bring the existing library over once
+        from .sqlite_store import migrate
+
+        migrate(DB_FILE, [])
+    meta, links = _sqlite().load()
+    state = AppState.model_validate(meta)
+    for link in links:
+        if link.metadata_status == "fetching":
+            link.metadata_status = "pending"
+    state.index.rebuild(links)
+    return state
+
+
+def load_files(lazy: bool = False) -> AppState:
+    """load_state() for the snapshot backend: snapshot file plus journal."""
+    # a JSON save removes the binary file, a binary save leaves the JSON one
+    # alone (it can be the seed library checked in next to the code), so the
+    # binary file is the current one whenever it exists
+    if SNAP_FILE.exists():
+        return _load_binary(lazy)
+    data: Dict[str, Any] = {}
+    if STATE_FILE.exists():
+        with open(STATE_FILE, "r") as f:
+            data = upgrade_legacy(json.load(f))
+    data = _replay(data, _open_journal(data.get("journal_seq", 0)))
+    raw_links = data.pop("links", [])
+    state = AppState.model_validate(data)
+    state.load_links(raw_links)
+    del raw_links
+    for link in state.index.links():
+        # a fetch interrupted by shutdown never finished; let startup re-queue it
+        if link.metadata_status == "fetching":
+            state.index.set_status(link, "pending")
+    return state
+
+
+def _load_binary(lazy: bool) -> AppState:
+    global hydration
+    reader = snapfile.SnapshotReader(SNAP_FILE)
+    meta = reader.header
+    replay = Replay(_open_journal(meta.get("journal_seq", 0)), meta.get("journal_seq", 0))
+    data = {k: meta[k] for k in ("next_id", "categories", "config") if k in meta}
+    replay.apply_meta(data)
+    state = AppState.model_validate(data)
+    links = [LinkRecord.from_dict(raw) for raw in replay.new_links()]
+    if len(reader):
+        links += replay.records(reader.chunk(0))
+    rest = Hydration(reader, replay, len(links))
+    if lazy and len(reader) > 1:
+        state.index.rebuild(links)
+        hydrated.clear()
+        hydration = rest
+        return state
+    while True:
+        chunk = rest.next_chunk()
+        if chunk is None:
+            break
+        links += chunk
+    reader.close()
+    state.index.rebuild(links)
+    return state
+
+
+Capture = Tuple[Dict[str, Any], List[LinkRecord]]
+
+
+def _capture(state: AppState) -> Capture:
+    """
+    What a snapshot needs, taken on the event loop without serializing the
+    links: the other fields and the list of records. _dump() encodes it on
+    a thread while the loop may change records; those changes are journaled
+    after the snapshot's seq and replayed over it on load, so a row that
+    already has them is harmless. Mutations must be recorded before their
+    caller awaits, so every captured record is covered by the journal up
+    to seq.
+    """
+    if not hydrated.is_set():
+        raise RuntimeError("the library is still loading")
+    return state.model_dump(mode="json", exclude=SNAPSHOT_EXCLUDE | {"links"}), state.index.ordered()
+
+
+def _dump(captured: Capture) -> Dict[str, Any]:
+    """Snapshot payload in SNAPSHOT_FORMAT; binary snapshots carry links as `rows`."""
+    data, links = captured
+    if SNAPSHOT_FORMAT == "binary":
+        data["rows"] = [link.to_row() for link in links]
+    else:
+        data["links"] = [link.to_dict() for link in links]
+    return data
+
+
+def _write_snapshot(data: Dict[str, Any], seq: int):
+    global _snapshot_seq
+    if seq < _snapshot_seq:
+        return  # a newer snapshot already folded the journal past this point
+    data["journal_seq"] = seq
+    rows = data.pop("rows", None)
+    path = SNAP_FILE if rows is not None else STATE_FILE
+    with snapshot_latency.time():
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "wb") as f:
+            if rows is not None:
+                snapfile.write(f, data, rows)
+            else:
+                f.write(json.dumps(data, indent=2).encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        # a binary file would be loaded first but predates the entries dropped below
+        if rows is None and SNAP_FILE.exists():
+            SNAP_FILE.unlink()
+        _snapshot_seq = seq
+        journal.truncate_through(seq)
+
+
+def writer() -> WriteBehind:
+    global _writer
+    if _writer is None:
+
+        def timed_write(batch: List[Any]):
+            with flush_latency.time():
+                if STORAGE_BACKEND == "sqlite":
+                    _sqlite().record_many(batch)
+                else:
+                    journal.write(batch)
+            flush_entries.inc(len(batch))
+
+        _writer = WriteBehind(timed_write, FLUSH_MS / 1000, FLUSH_EVERY, name="state-writer")
+    return _writer
+
+
+def flush(timeout: Optional[float] = None) -> bool:
+    """Durability barrier: block until every mutation recorded so far is on disk."""
+    return _writer is None or _writer.barrier(timeout)
+
+
+def close_storage():
+    """Flush and stop the background writer; later records are written inline."""
+    global _sqlite_store
+    if _writer is not None:
+        _writer.close()
+    if _sqlite_store is not None:
+        _sqlite_store.close()
+        _sqlite_store = None
+
+
+def snapshot(state: AppState) -> Optional[Tuple[Capture, int]]:
+    """
+    Capture a snapshot consistent with the journal. Cheap enough for the
+    event loop (no serialization or I/O); hand the result to
+    save_snapshot() on a thread. SQLite rows are kept current, so there is
+    nothing to capture.
+    """
+    if STORAGE_BACKEND == "sqlite":
+        return None
+    return _capture(state), journal.seq
+
+
+def save_snapshot(snap: Optional[Tuple[Capture, int]]):
+    """Flush pending mutations and write `snap` (from snapshot()); blocking."""
+    flush()
+    if snap is not None:
+        captured, seq = snap
+        with _compacting:
+            _write_snapshot(_dump(captured), seq)
 
 
 def save_state(state: AppState):
-    STATE_FILE.write_text(
-        json.dumps(state.model_dump(mode="json"), indent=2)
-    )
+    """Write a full snapshot synchronously and fold the journal into it."""
+    if STORAGE_BACKEND == "sqlite":
+        flush()
+        with snapshot_latency.time():
+            data, links = _capture(state)
+            _sqlite().replace(data, links)
+        return
+    save_snapshot(snapshot(state))
+
+
+def record(state: AppState, op: str, **data: Any):
+    """
+    Log a single mutation. Cost to the caller is encoding it; the write
+    happens on the background writer within FLUSH_MS (see flush()), and
+    the snapshot is rewritten in the background every COMPACT_EVERY entries.
+    """
+    record_many(state, [(op, data)])
+
+
+def record_many(state: AppState, entries: List[Tuple[str, Dict[str, Any]]]):
+    """Like record(), for a batch of (op, data) pairs. Values must not be mutated afterwards."""
+    if not entries:
+        return
+    if STORAGE_BACKEND == "sqlite":
+        writer().stage(entries)
+        return
+    writer().stage(journal.encode(entries))
+    if journal.pending >= COMPACT_EVERY and hydrated.is_set() and _compacting.acquire(blocking=False):
+        # capture on the caller's thread, at `seq`; serializing is the thread's
+        captured = _capture(state)
+        seq = journal.seq
+
+        def compact():
+            try:
+                _write_snapshot(_dump(captured), seq)
+            finally:
+                _compacting.release()
+
+        threading.Thread(target=compact, name="state-compaction", daemon=True).start()
@@ -0,0 +1,272 @@
+import asyncio
+import hashlib
+import io
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .metadata import session
+
+try:  # optional; without it images are served at their original size
+    from PIL import Image
+except ImportError:
+    Image = None
+
+THUMB_DIR = Path(os.environ.get("LINKCASCADE_THUMB_DIR", "thumb_cache"))
+MAX_BYTES = int(os.environ.get("LINKCASCADE_THUMB_CACHE_MB", "512")) * 1024 * 1024
+
+# Requested widths snap up to one of these so each image has few variants.
+WIDTHS = (96, 240, 480, 720)
+GRID_WIDTH = 480
+AVATAR_WIDTH = 96
+PREFETCH_CONCURRENCY = 4
+# Images waiting to be prefetched; past this (a huge paste) the rest are fetched on demand.
+PREFETCH_BACKLOG = 2000
+# A failed fetch (404, not an image, network error) is not retried for this
+# long, so a grid full of missing avatars does not hit the CDN on every render.
+NEGATIVE_TTL = 120.0
+NEGATIVE_MAX = 10000
+
+DEFAULT_THUMB = "https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    key TEXT PRIMARY KEY,
+    sha TEXT NOT NULL,
+    content_type TEXT NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_images_last_access ON images(last_access);
+CREATE INDEX IF NOT EXISTS idx_images_sha ON images(sha);
+CREATE TABLE IF NOT EXISTS blobs (
+    sha TEXT PRIMARY KEY,
+    size INTEGER NOT NULL
+);
+"""
+
+
+def snap_width(width: Optional[int]) -> Optional[int]:
+    if not width or Image is None:
+        return None
+    for w in WIDTHS:
+        if width <= w:
+            return w
+    return None  # larger than any variant: serve the original
+
+
+class ThumbCache:
+    """
+    Disk cache for thumbnails and channel avatars.
+
+    Image bytes are stored once under objects/<sha[:2]>/<sha>, so the same
+    avatar behind many videos (or an identical placeholder) takes one file.
+    `images` maps a (source url, width) key to its blob; when the total
+    blob size passes `max_bytes`, least recently served keys are dropped
+    and blobs nobody references any more are deleted.
+    """
+
+    def __init__(self, root: Path = THUMB_DIR, max_bytes: int = MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        (root / "objects").mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(root / "index.db"), check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        self.sources: Dict[str, Tuple[Optional[str], Optional[str]]] = {}  # video id -> (thumb, avatar)
+        self.counters = {
+            "hits": 0,
+            "negative_hits": 0,
+            "fetches": 0,
+            "fetch_errors": 0,
+            "evictions": 0,
+            "prefetch_dropped": 0,
+        }
+        self._failed: Dict[str, float] = {}  # key -> monotonic time a fetch may be tried again
+        self._executor = ThreadPoolExecutor(max_workers=PREFETCH_CONCURRENCY * 2, thread_name_prefix="thumbs")
+        self._inflight: Dict[str, "asyncio.Future"] = {}
+        self._prefetch_queue: Optional["asyncio.Queue[Tuple[str, Optional[int]]]"] = None
+        self._prefetchers: List[asyncio.Task] = []
+
+    # ---------- sources ----------
+
+    def remember(self, video_id: Optional[str], thumbnail_url: Optional[str], channel_avatar: Optional[str]):
+        if video_id:
+            self.sources[video_id] = (thumbnail_url, channel_avatar)
+
+    def forget(self, video_id: Optional[str]):
+        self.sources.pop(video_id, None)
+
+    def source_url(self, video_id: str, kind: str) -> Optional[str]:
+        thumb, avatar = self.sources.get(video_id, (None, None))
+        if kind == "avatar":
+            return avatar
+        return thumb or DEFAULT_THUMB.format(video_id=video_id)
+
+    # ---------- lookup / fetch ----------
+
+    async def get(self, url: str, width: Optional[int] = None) -> Optional[Tuple[Path, str, str]]:
+        """(path, content type, sha) for `url` at `width`, fetching it once if needed."""
+        width = snap_width(width)
+        key = f"{url}|{width or 0}"
+        retry_at = self._failed.get(key)
+        if retry_at is not None:
+            if time.monotonic() < retry_at:
+                self.counters["negative_hits"] += 1
+                return None
+            self._failed.pop(key, None)
+        loop = asyncio.get_running_loop()
+        found = await loop.run_in_executor(self._executor, self._lookup, key)
+        if found is not None:
+            self.counters["hits"] += 1
+            return found
+        pending = self._inflight.get(key)
+        if pending is None:
+            pending = loop.run_in_executor(self._executor, self._fetch, key, url, width)
+            self._inflight[key] = pending
+            pending.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(pending)
+
+    def prefetch(self, url: Optional[str], width: Optional[int]):
+        """Queue `url` to be cached in the background, PREFETCH_CONCURRENCY at a time."""
+        if not url:
+            return
+        if self._prefetch_queue is None:
+            self._prefetch_queue = asyncio.Queue(PREFETCH_BACKLOG)
+            self._prefetchers = [asyncio.create_task(self._prefetcher()) for _ in range(PREFETCH_CONCURRENCY)]
+        try:
+            self._prefetch_queue.put_nowait((url, width))
+        except asyncio.QueueFull:
+            self.counters["prefetch_dropped"] += 1
+
+    async def _prefetcher(self):
+        while True:
+            url, width = await self._prefetch_queue.get()
+            try:
+                await self.get(url, width)
+            except Exception:
+                pass  # best effort; the page will fetch it on demand
+
+    def stop_prefetch(self):
+        for task in self._prefetchers:
+            task.cancel()
+        self._prefetchers = []
+        self._prefetch_queue = None
+
+    def _lookup(self, key: str) -> Optional[Tuple[Path, str, str]]:
+        with self._lock:
+            row = self.conn.execute("SELECT sha, content_type FROM images WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            path = self._blob_path(row[0])
+            if not path.exists():
+                self.conn.execute("DELETE FROM images WHERE key = ?", (key,))
+                return None
+            self.conn.execute("UPDATE images SET last_access = ? WHERE key = ?", (time.time(), key))
+        return path, row[1], row[0]
+
+    def _fetch(self, key: str, url: str, width: Optional[int]) -> Optional[Tuple[Path, str, str]]:
+        self.counters["fetches"] += 1
+        try:
+            resp = session.get(url, timeout=10)
+        except Exception:
+            return self._fetch_failed(key)
+        ctype = resp.headers.get("Content-Type", "").split(";")[0].strip()
+        if resp.status_code != 200 or not ctype.startswith("image/"):
+            return self._fetch_failed(key)
+        data = resp.content
+        if width:
+            data, ctype = _downscale(data, ctype, width)
+        return self._store(key, data, ctype)
+
+    def _fetch_failed(self, key: str) -> None:
+        self.counters["fetch_errors"] += 1
+        with self._lock:
+            if len(self._failed) >= NEGATIVE_MAX:
+                self._failed.pop(next(iter(self._failed)), None)  # oldest first
+            self._failed[key] = time.monotonic() + NEGATIVE_TTL
+        return None
+
+    def _store(self, key: str, data: bytes, ctype: str) -> Tuple[Path, str, str]:
+        sha = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(sha)
+        with self._lock:
+            known = self.conn.execute("SELECT 1 FROM blobs WHERE sha = ?", (sha,)).fetchone()
+            if not known or not path.exists():
+                path.parent.mkdir(exist_ok=True)
+                tmp = path.with_suffix(".tmp")
+                tmp.write_bytes(data)
+                os.replace(tmp, path)
+                if not known:
+                    self.conn.execute("INSERT INTO blobs (sha, size) VALUES (?, ?)", (sha, len(data)))
+                    self.total += len(data)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO images (key, sha, content_type, last_access) VALUES (?, ?, ?, ?)",
+                (key, sha, ctype, time.time()),
+            )
+            if self.total > self.max_bytes:
+                self._evict(keep=sha)
+        return path, ctype, sha
+
+    def _evict(self, keep: str):
+        # drop least recently served keys until ~90% of the budget
+        target = self.max_bytes * 0.9
+        rows = self.conn.execute("SELECT key, sha FROM images ORDER BY last_access").fetchall()
+        for key, sha in rows:
+            if self.total <= target:
+                break
+            if sha == keep:
+                continue
+            self.conn.execute("DELETE FROM images WHERE key = ?", (key,))
+            self.counters["evictions"] += 1
+            if self.conn.execute("SELECT 1 FROM images WHERE sha = ? LIMIT 1", (sha,)).fetchone():
+                continue  # blob still referenced by another key
+            size = self.conn.execute("SELECT size FROM blobs WHERE sha = ?", (sha,)).fetchone()
+            self.conn.execute("DELETE FROM blobs WHERE sha = ?", (sha,))
+            self.total -= size[0] if size else 0
+            try:
+                self._blob_path(sha).unlink()
+            except FileNotFoundError:
+                pass
+
+    def _blob_path(self, sha: str) -> Path:
+        return self.root / "objects" / sha[:2] / sha
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            images = self.conn.execute("SELECT COUNT(*) FROM images").fetchone()[0]
+            blobs = self.conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0]
+        return {
+            **self.counters,
+            "images": images,
+            "blobs": blobs,
+            "failed": len(self._failed),
+            "bytes": self.total,
+            "max_bytes": self.max_bytes,
+            "downscaling": Image is not None,
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        with self._lock:
+            self.conn.close()
+
+
+def _downscale(data: bytes, ctype: str, width: int) -> Tuple[bytes, str]:
+    try:
+        img = Image.open(io.BytesIO(data))
+        if img.width <= width:
+            return data, ctype
+        height = max(1, round(img.height * width / img.width))
+        img = img.convert("RGB").resize((width, height), Image.LANCZOS)
+        out = io.BytesIO()
+        img.save(out, "JPEG", quality=82, optimize=True)
+        return out.getvalue(), "image/jpeg"
+    except Exception:
+        return data, ctype  # not decodable here; serve as fetched
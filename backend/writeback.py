@@ -0,0 +1,109 @@
+import threading
+import time
+import traceback
+from typing import Any, Callable, Dict, List, Optional
+
+
+class WriteBehind:
+    """
+    Coalesces persistence work off the request path.
+
+    Callers `stage()` already-encoded items and return immediately. A
+    writer thread hands everything staged so far to `write` in a single
+    call, `delay` seconds after the first item of a batch arrived or as
+    soon as `max_batch` items are waiting. `barrier()` blocks until
+    everything staged before it has been written; after `close()` items
+    are written inline.
+    """
+
+    def __init__(self, write: Callable[[List[Any]], None], delay: float, max_batch: int, name: str = "write-behind"):
+        self.write = write
+        self.delay = delay
+        self.max_batch = max_batch
+        self.name = name
+        self._cond = threading.Condition()
+        self._pending: List[Any] = []
+        self._first_at = 0.0
+        self._staged = 0  # items ever staged
+        self._written = 0  # items ever handed to `write`
+        self._urgent = False
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self.counters = {"flushes": 0, "items": 0, "errors": 0, "largest_batch": 0}
+        self.last_error: Optional[str] = None
+
+    def stage(self, items: List[Any]):
+        if not items:
+            return
+        with self._cond:
+            if not self._closed:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                    self._thread.start()
+                if not self._pending:
+                    self._first_at = time.monotonic()
+                self._pending.extend(items)
+                self._staged += len(items)
+                self._cond.notify_all()
+                return
+        self._write(list(items))
+
+    def barrier(self, timeout: Optional[float] = None) -> bool:
+        """Flush now and wait until every item staged so far is written."""
+        with self._cond:
+            target = self._staged
+            self._urgent = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._written >= target, timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        self.barrier(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+                # let more changes pile up, unless someone is waiting on them
+                while not (self._urgent or self._closed or len(self._pending) >= self.max_batch):
+                    remaining = self._first_at + self.delay - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch, self._pending = self._pending, []
+                self._urgent = False
+            self._write(batch)
+            with self._cond:
+                self._written += len(batch)
+                self._cond.notify_all()
+
+    def _write(self, batch: List[Any]):
+        try:
+            self.write(batch)
+        except Exception as e:
+            # the in-memory state still has these changes; the next snapshot picks them up
+            self.counters["errors"] += 1
+            self.last_error = repr(e)
+            traceback.print_exc()
+            return
+        self.counters["flushes"] += 1
+        self.counters["items"] += len(batch)
+        self.counters["largest_batch"] = max(self.counters["largest_batch"], len(batch))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            pending = len(self._pending)
+        return {
+            **self.counters,
+            "pending": pending,
+            "delay_ms": round(self.delay * 1000),
+            "max_batch": self.max_batch,
+            "last_error": self.last_error,
+        }
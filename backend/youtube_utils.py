@@ -1,4 +1,5 @@
-
+import re
+from typing import List, Optional, Tuple
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
 
 YOUTUBE_HOSTS = {
@@ -8,16 +9,109 @@ YOUTUBE_HOSTS = {
     "music.youtube.com",
     "youtu.be",
     "www.youtu.be",
+    "youtube-nocookie.com",
+    "www.youtube-nocookie.com",
 }
 
-def normalize_youtube_url(url: str) -> str | None:
-    """
-    Normalize a YouTube URL:
-    - Convert youtu.be/ID to https://www.youtube.com/watch?v=ID
-    - Drop playlist-related params (list, index, etc.)
-    - Keep only relevant params: v, t
-    - Return normalized URL or None if not a direct video.
-    """
+# Path forms that carry the video id: /shorts/ID, /embed/ID, /live/ID, /v/ID.
+ID_PATHS = ("/shorts/", "/embed/", "/live/", "/v/")
+VIDEO_ID = re.compile(r"[A-Za-z0-9_-]{11}")
+
+# ---------- fast path ----------
+# Covers the shapes people actually paste. Anything the regexes cannot
+# vouch for (escapes, ports, userinfo, odd characters) goes to the slow
+# parser, so both always agree.
+_URL = re.compile(r"(?:https?://)([^/?#]*)([^?#]*)(?:\?([^#]*))?(?:#.*)?", re.I | re.S)
+_ODD = re.compile(r"[\x00-\x20\;]")
+_SAFE = re.compile(r"[A-Za-z0-9_.~-]+")
+_NORMALIZED = re.compile(r"https://www\.youtube\.com/watch\?(?:t=[A-Za-z0-9_.~-]*&)?v=([A-Za-z0-9_.~-]+)(?:&|$)")
+
+# URL-looking tokens in pasted text: anything with a scheme, or a bare
+# YouTube host such as "youtu.be/ID".
+_CANDIDATE = re.compile(
+    r"(?<![\w.@-])(?:https?://[^\s<>\"'\[\]{}|^`]+"
+    r"|(?:[\w-]+\.)*(?:youtube(?:-nocookie)?\.com|youtu\.be)(?:[/?#][^\s<>\"'\[\]{}|^`]*)?)",
+    re.I,
+)
+_TRAILING = ".,;:!?)"
+
+
+class _Slow(Exception):
+    pass
+
+
+def _fast(url: str) -> Optional[str]:
+    s = url.strip()
+    m = _URL.fullmatch(s)
+    if m is None or _ODD.search(s) or not s.isascii():
+        raise _Slow
+    host, path, query = m.group(1).lower(), m.group(2), m.group(3) or ""
+    if host not in YOUTUBE_HOSTS:
+        if not host or any(c in host for c in ":@[%"):
+            raise _Slow
+        return None
+
+    # first non-blank v / t, in the order they appear (what parse_qs keeps)
+    params: List[Tuple[str, str]] = []
+    seen = set()
+    for part in query.split("&"):
+        key, eq, value = part.partition("=")
+        if not eq or not value:
+            continue
+        if "%" in key or "+" in key:
+            raise _Slow
+        if key in ("v", "t") and key not in seen:
+            if not _SAFE.fullmatch(value):
+                raise _Slow
+            seen.add(key)
+            params.append((key, value))
+
+    if "youtu.be" in host:
+        video_id = path.lstrip("/")
+        if not video_id:
+            return None
+        if not _SAFE.fullmatch(video_id):
+            raise _Slow
+        return _watch([("v", video_id)] + [(key, value) for key, value in params if key == "t"])
+
+    if path.startswith("/shorts/"):
+        video_id = path[len("/shorts/"):].split("/")[0]
+        if not _SAFE.fullmatch(video_id):
+            raise _Slow
+        params = _path_id(video_id, params)
+    elif path.startswith(ID_PATHS):
+        video_id = _id_from_path(path)
+        if video_id is None:
+            return None
+        params = _path_id(video_id, params)
+    elif "v" not in seen:
+        return None
+    return _watch(params)
+
+
+def _path_id(video_id: str, params: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    # the id takes the first slot; an explicit ?v= still wins
+    query_v = [value for key, value in params if key == "v"]
+    rest = [(key, value) for key, value in params if key != "v"]
+    return [("v", query_v[0] if query_v else video_id)] + rest
+
+
+def _watch(params: List[Tuple[str, str]]) -> str:
+    return "https://www.youtube.com/watch?" + "&".join(f"{key}={value}" for key, value in params)
+
+
+def _id_from_path(path: str) -> Optional[str]:
+    """Video id from /embed/ID, /live/ID or /v/ID (old embeds append &hl=...)."""
+    for prefix in ID_PATHS[1:]:
+        if path.startswith(prefix):
+            candidate = re.split(r"[/&]", path[len(prefix):], 1)[0]
+            return candidate if VIDEO_ID.fullmatch(candidate) else None
+    return None
+
+
+# ---------- slow path ----------
+
+def _normalize_slow(url: str) -> str | None:
     parsed = urlparse(url.strip())
     host = (parsed.hostname or "").lower()
 
@@ -50,6 +144,12 @@ def normalize_youtube_url(url: str) -> str | None:
     if parsed.path.startswith("/shorts/"):
         video_id = parsed.path.split("/shorts/")[1].split("/")[0]
         qs = {"v": [video_id], **qs}
+    # Embeds, live streams, old flash embeds -> watch
+    elif parsed.path.startswith(ID_PATHS):
+        video_id = _id_from_path(parsed.path)
+        if video_id is None:
+            return None
+        qs = {"v": [video_id], **qs}
 
     if "v" not in qs:
         # probably not a direct video link (channel/playlist/etc.)
@@ -72,7 +172,41 @@ def normalize_youtube_url(url: str) -> str | None:
         ""
     ))
 
+
+def normalize_youtube_url(url: str) -> str | None:
+    """
+    Normalize a YouTube URL:
+    - Convert youtu.be/ID, /shorts/, /embed/, /live/ and /v/ to https://www.youtube.com/watch?v=ID
+    - Drop playlist-related params (list, index, etc.)
+    - Keep only relevant params: v, t
+    - Return normalized URL or None if not a direct video.
+    """
+    try:
+        return _fast(url)
+    except _Slow:
+        return _normalize_slow(url)
+
+
+def normalize_many(text: str) -> List[Tuple[str, Optional[str]]]:
+    """
+    (url, normalized or None) for every URL-looking token in pasted text,
+    in order. Prose around the links is ignored; scheme-less YouTube links
+    ("youtu.be/ID") are accepted.
+    """
+    out: List[Tuple[str, Optional[str]]] = []
+    for m in _CANDIDATE.finditer(text):
+        raw = m.group(0).rstrip(_TRAILING)
+        if not raw:
+            continue
+        url = raw if raw[:4].lower() == "http" and "://" in raw[:8] else "https://" + raw
+        out.append((raw, normalize_youtube_url(url)))
+    return out
+
+
 def extract_video_id_from_normalized_url(url: str) -> str | None:
+    m = _NORMALIZED.match(url)
+    if m is not None:
+        return m.group(1)
     parsed = urlparse(url)
     qs = parse_qs(parsed.query)
     vals = qs.get("v")
@@ -0,0 +1,129 @@
+"""
+Near-duplicate index (backend/dedupe.py) on a synthetic music library:
+songs by a few thousand artists, each uploaded one to three times as
+official video, lyric video, visualizer, audio, live or re-upload.
+
+  insert      microseconds per SimilarityIndex.add at each library size
+  similar     microseconds per similar() lookup (what POST /api/links pays)
+  memory      bytes per link held by the index
+  clusters    time to group the whole library (GET /api/duplicates)
+  recall      share of all pairs at or above the threshold (by brute force
+              on a sample) that the LSH buckets find
+
+    python -m bench.bench_dedupe --sizes 10000 100000
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from itertools import combinations
+from typing import List
+
+from backend.dedupe import SIMILARITY, SimilarityIndex, durations_match, jaccard, shingles
+from backend.records import LinkRecord
+
+VARIANTS = [
+    ("{artist} - {song} (Official Music Video)", "{artist}VEVO", 0),
+    ("{artist} - {song} (Lyrics)", "7clouds", 0),
+    ("{artist} - {song} [Official Lyric Video]", "{artist}", 3),
+    ("{song} (Visualizer)", "{artist}", 0),
+    ("{artist} - {song} (Official Audio)", "{artist} - Topic", -8),
+    ("{artist} - {song} (Live at the Garden)", "{artist}", 70),
+    ("{artist} '{song}' M/V", "Label Music", 1),
+]
+
+
+def synthetic(n: int, seed: int = 11) -> List[LinkRecord]:
+    rng = random.Random(seed)
+    words = [f"w{i}" for i in range(8000)]
+    artists = [" ".join(rng.sample(words, rng.randint(1, 2))).title() for _ in range(3000)]
+    links: List[LinkRecord] = []
+    while len(links) < n:
+        artist = rng.choice(artists)
+        song = " ".join(rng.sample(words, rng.randint(1, 4)))
+        duration = rng.randint(120, 300)
+        for title, channel, offset in rng.sample(VARIANTS, rng.choice((1, 1, 2, 3))):
+            i = len(links) + 1
+            link = LinkRecord(
+                id=i,
+                original_url=f"https://youtu.be/{i:011d}",
+                normalized_url=f"https://www.youtube.com/watch?v={i:011d}",
+                categories=["Music"],
+                title=title.format(artist=artist, song=song),
+                author=channel.format(artist=artist),
+            )
+            link.duration_seconds = duration + offset
+            links.append(link)
+    return links[:n]
+
+
+def measure(links: List[LinkRecord]) -> dict:
+    by_id = {l.id: l for l in links}
+    index = SimilarityIndex()
+    started = time.perf_counter()
+    for link in links:
+        index.add(link)
+    insert = time.perf_counter() - started
+
+    probe = random.Random(5).sample(links, min(2000, len(links)))
+    started = time.perf_counter()
+    found = sum(len(index.similar(link, by_id.get)) for link in probe)
+    similar = time.perf_counter() - started
+
+    started = time.perf_counter()
+    clusters = index.clusters(by_id.get)
+    grouped = time.perf_counter() - started
+
+    del index
+    gc.collect()
+    tracemalloc.start()
+    index = SimilarityIndex()
+    for link in links:
+        index.add(link)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return {
+        "insert_us": insert / len(links) * 1e6,
+        "similar_us": similar / len(probe) * 1e6,
+        "matches_per_probe": found / len(probe),
+        "bytes_per_link": memory / len(links),
+        "clusters_s": grouped,
+        "clusters": len(clusters),
+    }
+
+
+def recall(links: List[LinkRecord], threshold: float = SIMILARITY) -> float:
+    by_id = {l.id: l for l in links}
+    tokens = {l.id: shingles(l.title, l.author) for l in links}
+    index = SimilarityIndex()
+    for link in links:
+        index.add(link)
+    truth = {
+        (a.id, b.id)
+        for a, b in combinations(links, 2)
+        if durations_match(a.duration_seconds, b.duration_seconds) and jaccard(tokens[a.id], tokens[b.id]) >= threshold
+    }
+    found = {(min(l.id, o.id), max(l.id, o.id)) for l in links for o, _ in index.similar(l, by_id.get, threshold, limit=1000)}
+    return len(truth & found) / len(truth) if truth else 1.0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    ap.add_argument("--recall-sample", type=int, default=3000)
+    args = ap.parse_args()
+
+    for size in args.sizes:
+        r = measure(synthetic(size))
+        print(
+            f"[dedupe] {size:>7} links  insert {r['insert_us']:.1f} us  similar {r['similar_us']:.1f} us "
+            f"({r['matches_per_probe']:.2f} matches)  {r['bytes_per_link']:.0f} B/link  "
+            f"clusters {r['clusters']} in {r['clusters_s']:.2f}s"
+        )
+    sample = synthetic(args.recall_sample, seed=12)
+    print(f"[dedupe] recall at {SIMILARITY} on {len(sample)} links: {recall(sample):.3f}")
+
+
+if __name__ == "__main__":
+    main()
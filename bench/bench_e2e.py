@@ -0,0 +1,288 @@
+"""
+End-to-end benchmark of backend.main:app against the local YouTube stub.
+
+For each library size a fresh process gets its own scratch directory with a
+synthetic draft_state.json (records modelled on backend/data/links.json),
+then measures:
+
+  load_state      startup load of the snapshot
+  ingest          POST /api/links, one link per request
+  search          GET /api/search over title words
+  draft           GET /api/draft, cold (serialize) and warm (cached)
+  save_state      full snapshot write
+  pipeline        bulk-add links and wait until their metadata is fetched
+
+Results are written as JSON so runs can be compared across commits:
+
+    python -m bench.bench_e2e --sizes 1000 10000 100000 --latency 0.02 --throttle-rate 0.01
+    python -m bench.bench_e2e --sizes 1000 --out bench/results/base.json
+    python -m bench.bench_e2e --compare bench/results/base.json bench/results/e2e-<commit>-<ts>.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+TEMPLATES = ROOT / "backend" / "data" / "links.json"
+
+
+def _pct(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _latency(samples: List[float]) -> Dict[str, float]:
+    return {
+        "n": len(samples),
+        "p50_ms": round(_pct(samples, 0.5) * 1000, 3),
+        "p95_ms": round(_pct(samples, 0.95) * 1000, 3),
+        "max_ms": round(max(samples) * 1000, 3),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+    }
+
+
+def synthetic_library(n: int, seed: int = 7) -> Dict[str, Any]:
+    """`n` links shaped like the records in backend/data/links.json."""
+    rng = random.Random(seed)
+    templates = json.loads(TEMPLATES.read_text(encoding="utf-8"))["links"]
+    categories = sorted({t.get("category") or "Unsorted" for t in templates})[:20] or ["Unsorted"]
+    now = datetime.utcnow()
+    links = []
+    for i in range(n):
+        t = templates[i % len(templates)]
+        vid = f"{i:011d}"
+        cat = rng.choice(categories)
+        created = now - timedelta(minutes=n - i)
+        links.append(
+            {
+                "id": i + 1,
+                "original_url": f"https://youtu.be/{vid}",
+                "normalized_url": f"https://www.youtube.com/watch?v={vid}",
+                "categories": [cat],
+                "primary_category": cat,
+                "title": f"{t.get('title') or 'Untitled'} #{i}",
+                "author": t.get("author"),
+                "thumbnail_url": f"https://i.ytimg.com/vi/{vid}/hqdefault.jpg",
+                "duration_seconds": rng.randint(30, 3600),
+                "video_type": "normal",
+                "tags": rng.sample(["music", "live", "cover", "mix", "tutorial", "news"], rng.randint(0, 2)),
+                "created_at": created.isoformat(),
+                # fresh, so the background refresher stays idle during the run
+                "last_refreshed": now.isoformat(),
+                "metadata_status": "done",
+            }
+        )
+    links.reverse()  # snapshots store newest first
+    return {"links": links, "categories": categories, "next_id": n + 1}
+
+
+def run_size(args) -> Dict[str, Any]:
+    """Child process: cwd is a scratch directory."""
+    from .stub_youtube import start_stub
+
+    _, stub, base = start_stub(latency=args.latency, error_rate=args.error_rate, throttle_rate=args.throttle_rate)
+    os.environ["LINKCASCADE_OEMBED_ENDPOINT"] = f"{base}/oembed"
+    os.environ["LINKCASCADE_VIDEO_INFO_ENDPOINT"] = f"{base}/get_video_info"
+    os.symlink(ROOT / "frontend", "frontend")
+
+    data = synthetic_library(args.size)
+    data["config"] = {"rate_limit_per_second": args.rate, "rate_limit_per_minute": args.rate * 60}
+    Path("draft_state.json").write_text(json.dumps(data))
+    words = sorted({w for l in data["links"][:2000] for w in (l["title"] or "").split() if len(w) > 3})
+    del data
+
+    from backend import storage
+
+    started = time.perf_counter()
+    loaded = storage.load_state()
+    load_seconds = time.perf_counter() - started
+    del loaded
+
+    from fastapi.testclient import TestClient
+
+    from backend import main
+
+    out: Dict[str, Any] = {"links": args.size, "load_state_s": round(load_seconds, 4)}
+    with TestClient(main.app) as client:
+        # ingest: one POST per link, as the paste box does for single URLs
+        samples = []
+        started = time.perf_counter()
+        for i in range(args.ingest):
+            t = time.perf_counter()
+            client.post("/api/links", json={"url": f"https://youtu.be/i{i:010d}", "category": "Bench"})
+            samples.append(time.perf_counter() - t)
+        elapsed = time.perf_counter() - started
+        out["ingest"] = {"links_per_s": round(args.ingest / elapsed, 1), **_latency(samples)}
+
+        rng = random.Random(3)
+        samples = []
+        for _ in range(args.searches):
+            q = " ".join(rng.sample(words, 2 if rng.random() < 0.3 else 1))
+            t = time.perf_counter()
+            client.get("/api/search", params={"q": q, "limit": 50})
+            samples.append(time.perf_counter() - t)
+        out["search"] = _latency(samples)
+
+        t = time.perf_counter()
+        body = client.get("/api/draft", headers={"Accept-Encoding": "identity"}).content
+        cold = time.perf_counter() - t
+        samples = []
+        for _ in range(5):
+            t = time.perf_counter()
+            client.get("/api/draft", headers={"Accept-Encoding": "identity"})
+            samples.append(time.perf_counter() - t)
+        out["draft"] = {"bytes": len(body), "cold_ms": round(cold * 1000, 3), "warm": _latency(samples)}
+
+        t = time.perf_counter()
+        storage.save_state(main.state)
+        out["save_state_s"] = round(time.perf_counter() - t, 4)
+
+        # pipeline: wait for the ingest links too, then time a bulk batch end to end
+        _drain(main, timeout=args.timeout)
+        stub_before = stub.requests
+        urls = [f"https://youtu.be/p{i:010d}" for i in range(args.pipeline)]
+        started = time.perf_counter()
+        client.post("/api/links/bulk?category=Bench", content="\n".join(urls))
+        drained = _drain(main, timeout=args.timeout)
+        elapsed = time.perf_counter() - started
+        counts = main.state.jobs.counts()
+        out["pipeline"] = {
+            "links": args.pipeline,
+            "seconds": round(elapsed, 3),
+            "links_per_s": round(args.pipeline / elapsed, 1),
+            "completed": drained,
+            "done": counts["done"],
+            "failed": counts["failed"],
+            "stub_requests": stub.requests - stub_before,
+            "ratelimit_scale": main.rate_limiter.scale,
+        }
+    return out
+
+
+def _drain(main, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        counts = main.state.jobs.counts()
+        if counts["waiting"] == 0 and counts["fetching"] == 0:
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def _flatten(prefix: str, value: Any, out: Dict[str, float]):
+    if isinstance(value, dict):
+        for k, v in value.items():
+            _flatten(f"{prefix}.{k}" if prefix else k, v, out)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        out[prefix] = value
+
+
+def compare(old_path: Path, new_path: Path):
+    """Print every metric of two result files side by side, per library size."""
+    old = {r["links"]: r for r in json.loads(old_path.read_text())["results"]}
+    new = json.loads(new_path.read_text())
+    for result in new["results"]:
+        base = old.get(result["links"])
+        if base is None:
+            continue
+        a: Dict[str, float] = {}
+        b: Dict[str, float] = {}
+        _flatten("", base, a)
+        _flatten("", result, b)
+        print(f"[compare] {result['links']} links")
+        for key in b:
+            if key in a and key != "links":
+                change = (b[key] - a[key]) / a[key] if a[key] else 0.0
+                print(f"  {key:28} {a[key]:>12} -> {b[key]:>12}  {change:+7.1%}")
+
+
+def _commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    ap.add_argument("--ingest", type=int, default=300)
+    ap.add_argument("--searches", type=int, default=300)
+    ap.add_argument("--pipeline", type=int, default=500)
+    ap.add_argument("--rate", type=int, default=200, help="metadata fetches per second allowed")
+    ap.add_argument("--latency", type=float, default=0.02)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--throttle-rate", type=float, default=0.0)
+    ap.add_argument("--timeout", type=float, default=300.0)
+    ap.add_argument("--out", type=Path, default=None)
+    ap.add_argument("--compare", type=Path, nargs=2, metavar=("OLD", "NEW"))
+    ap.add_argument("--size", type=int, help=argparse.SUPPRESS)  # child mode
+    args = ap.parse_args()
+
+    if args.size:
+        print(json.dumps(run_size(args)))
+        return
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    commit = _commit()
+    report: Dict[str, Any] = {
+        "commit": commit,
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {k: v for k, v in vars(args).items() if k not in ("out", "size", "compare")},
+        "results": [],
+    }
+    child_args = [
+        f"--ingest={args.ingest}",
+        f"--searches={args.searches}",
+        f"--pipeline={args.pipeline}",
+        f"--rate={args.rate}",
+        f"--latency={args.latency}",
+        f"--error-rate={args.error_rate}",
+        f"--throttle-rate={args.throttle_rate}",
+        f"--timeout={args.timeout}",
+    ]
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")]))}
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory(prefix="linkcascade-bench-") as scratch:
+            proc = subprocess.run(
+                [sys.executable, "-m", "bench.bench_e2e", f"--size={size}", *child_args],
+                cwd=scratch,
+                env=env,
+                capture_output=True,
+                text=True,
+            )
+        if proc.returncode != 0:
+            sys.stderr.write(proc.stderr)
+            raise SystemExit(f"size {size} failed")
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        report["results"].append(result)
+        print(
+            f"[bench] {size:>7} links  load {result['load_state_s']:.2f}s  "
+            f"ingest {result['ingest']['links_per_s']}/s (p95 {result['ingest']['p95_ms']} ms)  "
+            f"search p95 {result['search']['p95_ms']} ms  "
+            f"draft cold {result['draft']['cold_ms']:.0f} ms  save {result['save_state_s']:.2f}s  "
+            f"pipeline {result['pipeline']['links_per_s']}/s"
+        )
+
+    out = args.out or ROOT / "bench" / "results" / f"e2e-{commit}-{int(time.time())}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print(f"[bench] wrote {out}")
+
+
+if __name__ == "__main__":
+    main()
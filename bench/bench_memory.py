@@ -0,0 +1,75 @@
+"""
+Resident bytes per link: pydantic Link models vs compact LinkRecords.
+
+    python -m bench.bench_memory --links 100000
+"""
+import argparse
+import gc
+import random
+import tracemalloc
+from datetime import datetime, timedelta
+
+from backend.records import LinkRecord
+from backend.storage import Link
+
+
+def synthetic(n: int, seed: int = 7):
+    """Raw link dicts shaped like a real library: few categories/tags, many channels."""
+    rng = random.Random(seed)
+    categories = [f"Category {i}" for i in range(20)]
+    tags = [f"tag{i}" for i in range(50)]
+    authors = [f"Channel {i}" for i in range(2000)]
+    start = datetime(2023, 1, 1)
+    for i in range(n):
+        vid = f"{i:011d}"
+        author = rng.choice(authors)
+        cat = rng.choice(categories)
+        yield {
+            "id": i + 1,
+            "original_url": f"https://youtu.be/{vid}",
+            "normalized_url": f"https://www.youtube.com/watch?v={vid}",
+            "categories": [cat],
+            "primary_category": cat,
+            "title": f"Video number {i} about {rng.choice(tags)}",
+            "author": author,
+            "thumbnail_url": f"https://i.ytimg.com/vi/{vid}/hqdefault.jpg",
+            "channel_avatar": f"https://yt3.ggpht.com/{author.replace(' ', '_')}=s88",
+            "duration": "4:20",
+            "duration_seconds": 260,
+            "publish_date": (start + timedelta(days=i % 700)).date().isoformat(),
+            "video_type": "normal",
+            "tags": rng.sample(tags, rng.randint(0, 3)),
+            "created_at": (start + timedelta(seconds=i * 37)).isoformat(),
+            "last_refreshed": (start + timedelta(seconds=i * 41)).isoformat(),
+            "metadata_status": "done",
+        }
+
+
+def measure(n: int, build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    kept = build(n)
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--links", type=int, default=100_000)
+    args = ap.parse_args()
+    n = args.links
+
+    # raw dicts are generated lazily, so only the kept objects are counted
+    models = measure(n, lambda k: [Link.model_validate(d) for d in synthetic(k)])
+    records = measure(n, lambda k: [LinkRecord.from_dict(d) for d in synthetic(k)])
+    print(f"[bench] {n} links")
+    print(f"  pydantic Link   {models / n:8.0f} B/link  {models / 2**20:8.1f} MiB")
+    print(f"  LinkRecord      {records / n:8.0f} B/link  {records / 2**20:8.1f} MiB")
+    print(f"  saved           {1 - records / models:8.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Metadata fetch throughput against the local stub.
+
+    python -m bench.bench_metadata --links 400 --workers 1 4 8 --latency 0.05
+"""
+import argparse
+import asyncio
+import importlib
+import os
+import time
+
+from .stub_youtube import start_stub
+
+
+async def _run(fetch, urls, workers: int) -> float:
+    queue: asyncio.Queue = asyncio.Queue()
+    for u in urls:
+        queue.put_nowait(u)
+
+    async def worker():
+        while not queue.empty():
+            url = queue.get_nowait()
+            await fetch(url, url)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    return time.perf_counter() - start
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--links", type=int, default=400)
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    ap.add_argument("--latency", type=float, default=0.05)
+    args = ap.parse_args()
+
+    _, stub, base = start_stub(latency=args.latency)
+    os.environ["LINKCASCADE_OEMBED_ENDPOINT"] = f"{base}/oembed"
+    os.environ["LINKCASCADE_VIDEO_INFO_ENDPOINT"] = f"{base}/get_video_info"
+    metadata = importlib.import_module("backend.metadata")
+
+    urls = [f"https://www.youtube.com/watch?v={i:011d}" for i in range(args.links)]
+    for n in args.workers:
+        elapsed = asyncio.run(_run(metadata.get_metadata_for_video_async, urls, n))
+        print(f"workers={n:<3} links={len(urls)} {elapsed:6.2f}s  {len(urls) / elapsed:7.1f} links/s")
+    print(f"stub served {stub.requests} requests")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Cold start of the JSON and binary snapshot formats.
+
+Every measurement runs in a fresh interpreter inside a scratch directory
+holding a synthetic library (see bench_e2e.synthetic_library):
+
+  load_state     storage.load_state() reading the whole snapshot
+  first_page     import backend.main, run startup and answer GET /api/links
+  ready          ... until a request that needs every link is answered
+
+    python -m bench.bench_startup --sizes 10000 100000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from .bench_e2e import ROOT, synthetic_library
+
+FORMATS = ("json", "binary")
+
+
+def measure(mode: str) -> dict:
+    """Child process: cwd holds the snapshot, LINKCASCADE_SNAPSHOT picks the format."""
+    started = time.perf_counter()
+    if mode == "load":
+        from backend import storage
+
+        state = storage.load_state()
+        return {"load_state_s": round(time.perf_counter() - started, 3), "links": len(state.index)}
+
+    from fastapi.testclient import TestClient
+
+    from backend import main
+
+    imported = time.perf_counter() - started
+    with TestClient(main.app) as client:
+        page = client.get("/api/links", params={"limit": 50}).json()
+        first_page = time.perf_counter() - started
+        stats = client.get("/api/categories/stats").json()
+        ready = time.perf_counter() - started
+    return {
+        "import_s": round(imported, 3),
+        "first_page_s": round(first_page, 3),
+        "ready_s": round(ready, 3),
+        "page_items": len(page["items"]),
+        "links": stats["total"],
+    }
+
+
+def _child(args, cwd: str, fmt: str) -> dict:
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")])),
+        "LINKCASCADE_SNAPSHOT": fmt,
+    }
+    proc = subprocess.run(
+        [sys.executable, "-m", "bench.bench_startup", *args], cwd=cwd, env=env, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr)
+        raise SystemExit(f"{args} failed")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    ap.add_argument("--formats", nargs="+", default=list(FORMATS), choices=FORMATS)
+    ap.add_argument("--repeat", type=int, default=3, help="best of N per measurement")
+    ap.add_argument("--mode", choices=("load", "app", "convert"), help=argparse.SUPPRESS)  # child
+    args = ap.parse_args()
+
+    if args.mode == "convert":
+        from backend import storage
+
+        storage.save_state(storage.load_state())
+        storage.close_storage()
+        print("{}")
+        return
+    if args.mode:
+        print(json.dumps(measure(args.mode)))
+        return
+
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory(prefix="linkcascade-startup-") as scratch:
+            data = synthetic_library(size)
+            for fmt in args.formats:
+                cwd = Path(scratch) / fmt
+                cwd.mkdir()
+                (cwd / "frontend").symlink_to(ROOT / "frontend")
+                (cwd / "draft_state.json").write_text(json.dumps(data))
+                if fmt != "json":
+                    _child(["--mode=convert"], str(cwd), fmt)
+                size_mb = sum(p.stat().st_size for p in cwd.glob("draft_state.*")) / 1e6
+                load = min((_child(["--mode=load"], str(cwd), fmt) for _ in range(args.repeat)), key=lambda r: r["load_state_s"])
+                app = min((_child(["--mode=app"], str(cwd), fmt) for _ in range(args.repeat)), key=lambda r: r["ready_s"])
+                print(
+                    f"[startup] {size:>7} links  {fmt:6}  {size_mb:6.1f} MB  "
+                    f"load_state {load['load_state_s']:.2f}s  first page {app['first_page_s']:.2f}s  "
+                    f"ready {app['ready_s']:.2f}s  (import {app['import_s']:.2f}s)"
+                )
+
+
+if __name__ == "__main__":
+    main()
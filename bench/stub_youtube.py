@@ -0,0 +1,130 @@
+"""
+Local stand-in for the YouTube oEmbed and get_video_info endpoints.
+
+    python -m bench.stub_youtube --port 8899 --latency 0.05 --error-rate 0.01
+
+Point the app at it with
+    LINKCASCADE_OEMBED_ENDPOINT=http://127.0.0.1:8899/oembed
+    LINKCASCADE_VIDEO_INFO_ENDPOINT=http://127.0.0.1:8899/get_video_info
+"""
+import argparse
+import json
+import random
+import struct
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+
+class StubConfig:
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0, throttle_rate: float = 0.0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.requests = 0
+        self.lock = threading.Lock()
+
+
+def _video_id(query: dict) -> str:
+    if "video_id" in query:
+        return query["video_id"][0]
+    url = query.get("url", [""])[0]
+    return parse_qs(urlparse(url).query).get("v", ["unknown"])[0]
+
+
+def _png(seed: str, width: int = 64, height: int = 36) -> bytes:
+    """Small solid-colour PNG, distinct per video id."""
+    h = zlib.crc32(seed.encode())
+    row = b"\x00" + bytes((h & 0xFF, (h >> 8) & 0xFF, (h >> 16) & 0xFF)) * width
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(row * height)) + chunk(b"IEND", b"")
+
+
+def make_handler(cfg: StubConfig):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real endpoints
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status: int, body: bytes, ctype: str, headers: dict = None):
+            self.send_response(status)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            with cfg.lock:
+                cfg.requests += 1
+            if cfg.latency:
+                time.sleep(cfg.latency)
+            roll = random.random()
+            if roll < cfg.throttle_rate:
+                return self._send(429, b"slow down", "text/plain", {"Retry-After": "1"})
+            if roll < cfg.throttle_rate + cfg.error_rate:
+                return self._send(503, b"unavailable", "text/plain")
+
+            parsed = urlparse(self.path)
+            if parsed.path.startswith("/vi/"):
+                return self._send(200, _png(parsed.path.split("/")[2]), "image/png")
+            query = parse_qs(parsed.query)
+            vid = _video_id(query)
+            base = f"http://{self.headers.get('Host', '127.0.0.1')}"
+            if parsed.path.endswith("/oembed"):
+                body = {
+                    "title": f"Stub video {vid}",
+                    "author_name": f"Channel {vid[:3]}",
+                    "thumbnail_url": f"{base}/vi/{vid}/hqdefault.jpg",
+                }
+                return self._send(200, json.dumps(body).encode(), "application/json")
+            if parsed.path.endswith("/get_video_info"):
+                player = {
+                    "videoDetails": {
+                        "title": f"Stub video {vid}",
+                        "author": f"Channel {vid[:3]}",
+                        "lengthSeconds": str(60 + sum(map(ord, vid)) % 600),
+                        "thumbnail": {"thumbnails": [{"url": f"{base}/vi/{vid}/maxres.jpg"}]},
+                    },
+                    "microformat": {"playerMicroformatRenderer": {"publishDate": "2024-01-01"}},
+                }
+                body = urlencode({"player_response": json.dumps(player)}).encode()
+                return self._send(200, body, "application/x-www-form-urlencoded")
+            return self._send(404, b"not found", "text/plain")
+
+    return Handler
+
+
+def start_stub(port: int = 0, **kwargs) -> tuple:
+    """Start the stub in a daemon thread; returns (server, config, base_url)."""
+    cfg = StubConfig(**kwargs)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(cfg))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, cfg, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--port", type=int, default=8899)
+    ap.add_argument("--latency", type=float, default=0.05)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--throttle-rate", type=float, default=0.0)
+    args = ap.parse_args()
+    server, _, url = start_stub(
+        args.port, latency=args.latency, error_rate=args.error_rate, throttle_rate=args.throttle_rate
+    )
+    print(f"[stub] serving on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
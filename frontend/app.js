@@ -4,6 +4,19 @@ const API_BASE = "";
 
 const SETTINGS_KEY = "yt_link_ui_settings_v1";
 const THEME_KEY = "yt_theme";
+const QUEUE_ROWS = 200; // rows drawn in the queue panel
+const PAGE_SIZE = 60; // links fetched per category, then per "Load more"
+const MAX_PAGE = 500; // the server's /api/links limit
+const SEARCH_LIMIT = 500;
+const SEARCH_DEBOUNCE_MS = 200;
+
+// settings.sortMode -> /api/links sort and order
+const SORT_PARAMS = {
+  newest: ["created_at", "desc"],
+  oldest: ["created_at", "asc"],
+  alpha: ["title", "asc"],
+  duration: ["duration_seconds", "asc"],
+};
 
 const DEFAULT_SETTINGS = {
   columns: 5,              // cards per row (2–10)
@@ -20,28 +33,46 @@ let settings = loadSettings();
 let lastSelectedCategory = "Unsorted";
 
 let appState = {
-  links: [],
   categories: [],
   queue: [],
+  queue_counts: {},
   next_id: 1,
   config: {},
 };
 
-let categoryLastActive = {}; // catName -> timestamp (ms)
+let categoryStats = null; // GET /api/categories/stats: counts and server-side category order
+let pages = {}; // category -> { items, cursor, total }: what is loaded of each category, server-sorted
+let searchResults = null; // GET /api/search results while a query is typed
 
 let pendingQueue = [];
-let requestsThisSecond = 0;
-let requestsThisMinute = 0;
 let currentSearchQuery = "";
 
 let notificationTimeout = null;
 
+// same test as the server's category aggregates
+function isShort(link) {
+  return link.video_type === "short" || (link.original_url || "").includes("/shorts/");
+}
+
 function primaryCategory(link) {
   if (link.primary_category) return link.primary_category;
   if (Array.isArray(link.categories) && link.categories.length) return link.categories[0];
   return "Unsorted";
 }
 
+// Server order, then any category added since the stats were fetched.
+function listedCategories() {
+  const cats = [...(categoryStats?.order || [])];
+  appState.categories.forEach((c) => {
+    if (!cats.includes(c)) cats.push(c);
+  });
+  return cats;
+}
+
+function linkCategories(link) {
+  return link.categories && link.categories.length ? link.categories : [primaryCategory(link)];
+}
+
 
 // ---------- SETTINGS HELPERS ----------
 
@@ -59,11 +90,6 @@ function saveSettings() {
   localStorage.setItem(SETTINGS_KEY, JSON.stringify(settings));
 }
 
-function touchCategory(cat) {
-  categoryLastActive[cat] = Date.now();
-}
-
-
 // ---------- TOAST ----------
 
 function showToast(message, type = "info") {
@@ -117,11 +143,102 @@ function setTheme(theme) {
 
 // ---------- API ----------
 
-async function fetchDraft() {
-  const res = await fetch("/api/draft");
+// Everything the page shows: config, queue, category stats and the first
+// page of each category. Links are never fetched all at once; each
+// category loads more as asked.
+async function fetchLibrary() {
+  // the revision first, so whatever changes while the rest loads is replayed after
+  const revRes = await fetch("/api/changes?since=0");
+  if (!revRes.ok) return;
+  const { revision } = await revRes.json();
+
+  const [cfgRes, queueRes] = await Promise.all([fetch("/api/config"), fetch(`/api/queue?limit=${QUEUE_ROWS}`)]);
+  if (cfgRes.ok) appState.config = await cfgRes.json();
+  if (queueRes.ok) {
+    const queue = await queueRes.json();
+    appState.queue = queue.jobs;
+    appState.queue_counts = queue.counts;
+  }
+  await fetchCategoryStats();
+  if (categoryStats) appState.categories = [...categoryStats.order];
+  await loadPages(listedCategories(), false);
+  if (currentSearchQuery) await runSearch();
+  appState.revision = revision;
+  applyConfig();
+  renderQueue();
+  render();
+}
+
+// Paint the newest links before the rest, which waits while a large
+// library is still loading on the server.
+async function fetchFirstPage() {
+  const [cfgRes, pageRes] = await Promise.all([fetch("/api/config"), fetch("/api/links?limit=200")]);
+  if (!cfgRes.ok || !pageRes.ok) return;
+  const page = await pageRes.json();
+  appState.config = await cfgRes.json();
+  pages = {};
+  page.items.forEach((l) => {
+    linkCategories(l).forEach((cat) => {
+      if (!pages[cat]) pages[cat] = { items: [], cursor: null, total: null };
+      pages[cat].items.push(l);
+    });
+  });
+  appState.categories = Object.keys(pages);
+  categoryStats = { total: page.total ?? page.items.length, order: appState.categories, categories: {} };
+  applyConfig();
+  render();
+}
+
+// One page of `cat` in the current sort, at least `shown` links long.
+async function fetchCategoryPage(cat, shown = 0, cursor = null) {
+  const [sort, order] = SORT_PARAMS[settings.sortMode] || SORT_PARAMS.newest;
+  const limit = Math.min(MAX_PAGE, Math.max(PAGE_SIZE, shown));
+  const params = new URLSearchParams({ category: cat, sort, order, limit: String(limit) });
+  if (cursor) params.set("cursor", cursor);
+  const res = await fetch(`/api/links?${params}`);
+  if (!res.ok) return null;
+  const page = await res.json();
+  return { items: page.items, cursor: page.next_cursor, total: page.total };
+}
+
+// (Re)load the first page of each of `cats`, as long as what is shown when `keepShown`.
+async function loadPages(cats, keepShown = true) {
+  const loaded = await Promise.all(
+    cats.map((cat) => fetchCategoryPage(cat, keepShown ? pages[cat]?.items.length || 0 : 0))
+  );
+  if (!keepShown) pages = {};
+  cats.forEach((cat, i) => {
+    if (loaded[i]) pages[cat] = loaded[i];
+  });
+}
+
+async function loadMore(cat) {
+  const page = pages[cat];
+  if (!page?.cursor) return;
+  const next = await fetchCategoryPage(cat, 0, page.cursor);
+  if (!next) return;
+  pages[cat] = { items: page.items.concat(next.items), cursor: next.cursor, total: next.total };
+  render();
+}
+
+async function runSearch() {
+  const q = currentSearchQuery.trim();
+  if (!q) {
+    searchResults = null;
+    return;
+  }
+  const res = await fetch(`/api/search?q=${encodeURIComponent(q)}&limit=${SEARCH_LIMIT}`);
+  if (!res.ok || q !== currentSearchQuery.trim()) return; // a newer query is on its way
+  searchResults = (await res.json()).results;
+}
+
+async function fetchCategoryStats() {
+  const res = await fetch("/api/categories/stats");
   if (!res.ok) return;
-  appState = await res.json();
+  categoryStats = await res.json();
+}
 
+function applyConfig() {
    // sync view defaults with server config
   if (appState.config?.view_defaults) {
     settings = { ...settings, ...appState.config.view_defaults };
@@ -140,13 +257,116 @@ async function fetchDraft() {
   const minute = document.getElementById("limit-minute");
   if (sec) sec.value = appState.config?.rate_limit_per_second || settings.maxUrlsPerSecond;
   if (minute) minute.value = appState.config?.rate_limit_per_minute || settings.maxUrlsPerMinute;
+}
 
-  appState.categories.forEach((c) => {
-    if (!(c in categoryLastActive)) categoryLastActive[c] = 0;
+
+// ---------- LIVE UPDATES ----------
+
+let renderPending = false;
+
+function scheduleRender() {
+  if (renderPending) return;
+  renderPending = true;
+  requestAnimationFrame(() => {
+    renderPending = false;
+    renderQueue();
+    render();
   });
+}
 
-  renderQueue();
-  render();
+// Merge a delta from /api/changes or /api/events into appState.
+async function applyChanges(delta) {
+  if (delta.full) {
+    await fetchLibrary();
+    return;
+  }
+
+  // categories whose loaded page may have changed order or membership
+  const stale = new Set();
+  if (delta.deleted_links.length) {
+    const gone = new Set(delta.deleted_links);
+    Object.values(pages).forEach((page) => {
+      page.items = page.items.filter((l) => !gone.has(l.id));
+    });
+    if (searchResults) searchResults = searchResults.filter((l) => !gone.has(l.id));
+  }
+  const [sort] = SORT_PARAMS[settings.sortMode] || SORT_PARAMS.newest;
+  delta.links.forEach((link) => {
+    const cats = linkCategories(link);
+    Object.entries(pages).forEach(([cat, page]) => {
+      const i = page.items.findIndex((l) => l.id === link.id);
+      if (i < 0) return;
+      // metadata landing leaves the creation order alone: swap it in place
+      if (cats.includes(cat) && sort === "created_at") page.items[i] = link;
+      else stale.add(cat);
+    });
+    cats.forEach((cat) => {
+      if (!pages[cat]?.items.some((l) => l.id === link.id) && fallsInPage(pages[cat], link, sort)) stale.add(cat);
+    });
+    if (searchResults) searchResults = searchResults.map((l) => (l.id === link.id ? link : l));
+  });
+  if (delta.similar) warnSimilar(delta.similar, delta.links);
+  if (delta.categories) {
+    appState.categories = delta.categories;
+  }
+  if (delta.config) {
+    appState.config = delta.config;
+    applyConfig();
+  }
+  if (delta.queue || delta.deleted_queue) {
+    const byLink = new Map((appState.queue || []).map((q) => [q.link_id, q]));
+    (delta.deleted_queue || []).forEach((id) => byLink.delete(id));
+    (delta.queue || []).forEach((q) => byLink.set(q.link_id, q));
+    appState.queue = [...byLink.values()];
+  }
+  if (delta.queue_counts) appState.queue_counts = delta.queue_counts;
+  appState.revision = delta.revision;
+  if (stale.size) await loadPages([...stale]);
+  if (delta.links.length || delta.deleted_links.length || delta.categories || delta.config) {
+    await fetchCategoryStats();
+  }
+  scheduleRender();
+}
+
+// Whether `link`, missing from a loaded page, belongs somewhere in it rather
+// than past its end (an old link whose metadata was refreshed).
+function fallsInPage(page, link, sort) {
+  if (!page || !page.cursor || !page.items.length || sort !== "created_at") return true;
+  const last = new Date(page.items[page.items.length - 1].created_at).getTime();
+  const t = new Date(link.created_at).getTime();
+  return settings.sortMode === "oldest" ? t <= last : t >= last;
+}
+
+// Revision to ask for changes after. 0 when the library never loaded: older
+// than any history, so the server answers with a full reload.
+function knownRevision() {
+  return appState.revision ?? 0;
+}
+
+// Links whose metadata just arrived and that look like re-uploads of ones
+// already in the library: {link id: [matches, best first]}.
+function warnSimilar(similar, links) {
+  const loaded = links.concat(...Object.values(pages).map((page) => page.items));
+  const found = Object.entries(similar)
+    .map(([id, matches]) => [loaded.find((l) => l.id === Number(id)), matches[0]])
+    .filter(([link, match]) => link && match);
+  if (!found.length) return;
+  const [link, match] = found[0];
+  const more = found.length > 1 ? ` (and ${found.length - 1} more)` : "";
+  showToast(`"${link.title}" looks like "${match.title}" already in your library${more}.`, "info");
+}
+
+function subscribeChanges() {
+  if (!window.EventSource) {
+    // no push channel: cheap delta poll instead
+    setInterval(async () => {
+      const res = await fetch(`/api/changes?since=${knownRevision()}`);
+      if (res.ok) await applyChanges(await res.json());
+    }, 5000);
+    return;
+  }
+  const source = new EventSource(`/api/events?since=${knownRevision()}`);
+  source.onmessage = (ev) => applyChanges(JSON.parse(ev.data));
 }
 
 async function addCategory(name) {
@@ -155,50 +375,57 @@ async function addCategory(name) {
   await fetch("/api/categories?name=" + encodeURIComponent(name), {
     method: "POST",
   });
-  touchCategory(name);
-  await fetchDraft();
 }
 
-async function apiAddLink(url, category) {
-  const res = await fetch("/api/links", {
+async function apiAddLinksBulk(urls, category) {
+  const res = await fetch("/api/links/bulk", {
     method: "POST",
     headers: { "Content-Type": "application/json" },
-    body: JSON.stringify({ url, category }),
+    body: JSON.stringify({ urls, category }),
   });
-
-  if (res.status === 409) {
-    showToast("Duplicate link in this category – skipped.", "error");
+  if (!res.ok || !res.body) {
+    showToast("Failed to add links.", "error");
     return;
   }
 
-  if (!res.ok) {
-    showToast("Failed to add link (invalid or network issue).", "error");
-    return;
+  // NDJSON: one outcome per URL, then a summary line
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buf = "";
+  let done = 0;
+  let summary = null;
+  for (;;) {
+    const { value, done: finished } = await reader.read();
+    if (finished) break;
+    buf += decoder.decode(value, { stream: true });
+    const lines = buf.split("\n");
+    buf = lines.pop();
+    lines.forEach((line) => {
+      if (!line) return;
+      const row = JSON.parse(line);
+      if (row.summary) summary = row.summary;
+      else done += 1;
+    });
+    if (urls.length > 50) showToast(`Adding links… ${done}/${urls.length}`, "info");
   }
 
-  const payload = await res.json();
-  const link = payload.link || payload;
-  touchCategory(primaryCategory(link) || category);
-  await fetchDraft();
-  if (payload.duplicate) {
-    showToast("Link already existed – added to category.", "info");
-  } else {
-    showToast("Link added to queue.", "success");
+  if (summary) {
+    const parts = [`${summary.added} added`];
+    if (summary.duplicate) parts.push(`${summary.duplicate} duplicate`);
+    if (summary.invalid) parts.push(`${summary.invalid} invalid`);
+    showToast(parts.join(", ") + ".", summary.added ? "success" : "info");
   }
 }
 
 async function deleteLink(id) {
   await fetch(`/api/links/${id}`, { method: "DELETE" });
-  await fetchDraft();
 }
 
 async function changeLinkCategory(id, category) {
   lastSelectedCategory = category;
-  touchCategory(category);
   await fetch(`/api/links/${id}/category?category=` + encodeURIComponent(category), {
     method: "PATCH",
   });
-  await fetchDraft();
 }
 
 async function updateTags(id, tags) {
@@ -215,52 +442,6 @@ async function saveMain() {
 }
 
 
-// ---------- URL NORMALIZE (JS SIDE, for dupes) ----------
-
-function normalizeYouTubeUrl(url) {
-  try {
-    const u = new URL(url);
-    if (!u.hostname.includes("youtube.com") && !u.hostname.includes("youtu.be")) {
-      return null;
-    }
-
-    if (u.pathname.startsWith("/shorts/")) {
-      const id = u.pathname.split("/shorts/")[1].split("/")[0];
-      if (!id) return null;
-      return `https://www.youtube.com/shorts/${id}`;
-    }
-
-    if (u.hostname === "youtu.be") {
-      const id = u.pathname.replace("/", "");
-      if (!id) return null;
-      return `https://www.youtube.com/watch?v=${id}`;
-    }
-
-    const params = u.searchParams;
-    const id = params.get("v");
-    if (!id) return null;
-
-    return `https://www.youtube.com/watch?v=${id}`;
-  } catch {
-    return null;
-  }
-}
-
-function isDuplicateInCategory(rawUrl, category) {
-  const norm = normalizeYouTubeUrl(rawUrl);
-  if (!norm) return false;
-  return appState.links.some(
-    (l) => (l.categories || []).includes(category) && l.normalized_url === norm
-  );
-}
-
-function isGlobalDuplicate(rawUrl) {
-  const norm = normalizeYouTubeUrl(rawUrl);
-  if (!norm) return false;
-  return appState.links.some((l) => l.normalized_url === norm);
-}
-
-
 // ---------- QUEUE / RATE LIMIT ----------
 
 function enqueueUrl(url, category) {
@@ -269,44 +450,33 @@ function enqueueUrl(url, category) {
 }
 
 function setupQueueProcessor() {
-  setInterval(() => {
-    requestsThisSecond = 0;
-  }, 1000);
-
-  setInterval(() => {
-    requestsThisMinute = 0;
-  }, 60000);
-
-  async function processOne() {
-    if (!pendingQueue.length) return;
-    if (requestsThisSecond >= settings.maxUrlsPerSecond) return;
-    if (requestsThisMinute >= settings.maxUrlsPerMinute) return;
-
-    const item = pendingQueue.shift();
-    requestsThisSecond += 1;
-    requestsThisMinute += 1;
-
-    const { url, category } = item;
-
-    const policy = settings.duplicatePolicy || "block_category";
-    if (policy === "block_category" && isDuplicateInCategory(url, category)) {
-      showToast("Duplicate in this category – skipped.", "error");
-      return;
-    }
-    if (policy === "warn_global" && isGlobalDuplicate(url)) {
-      showToast("Duplicate exists elsewhere — adding anyway.", "info");
-    }
-
+  let flushing = false;
+
+  // Everything queued since the last tick goes out as one bulk request
+  // per category instead of one POST per URL.
+  async function flush() {
+    if (flushing || !pendingQueue.length) return;
+    flushing = true;
+    const batch = pendingQueue.splice(0, pendingQueue.length);
+    const byCategory = {};
+    batch.forEach(({ url, category }) => {
+      if (!byCategory[category]) byCategory[category] = [];
+      byCategory[category].push(url);
+    });
     try {
-      await apiAddLink(url, category);
+      for (const [category, urls] of Object.entries(byCategory)) {
+        await apiAddLinksBulk(urls, category);
+      }
     } catch (err) {
       console.error(err);
-      showToast("Error while adding link.", "error");
+      showToast("Error while adding links.", "error");
+    } finally {
+      flushing = false;
+      renderQueue();
     }
-    renderQueue();
   }
 
-  setInterval(processOne, 50); // ~20 ops/sec max
+  setInterval(flush, 250);
 }
 
 function renderQueue() {
@@ -319,8 +489,11 @@ function renderQueue() {
     ...pendingQueue.map((q) => ({ url: q.url, status: "local" })),
     ...(appState.queue || []),
   ];
-  count.textContent = combined.length.toString();
-  combined.forEach((q) => {
+  // the server only sends a window of its job table; the badge uses its counts
+  const counts = appState.queue_counts || {};
+  const active = (counts.waiting || 0) + (counts.fetching || 0);
+  count.textContent = (pendingQueue.length + active).toString();
+  combined.slice(0, QUEUE_ROWS).forEach((q) => {
     const row = document.createElement("div");
     row.className = "flex items-center justify-between bg-slate-900/80 border border-slate-800 rounded px-2 py-1";
     const url = document.createElement("span");
@@ -338,6 +511,30 @@ function renderQueue() {
 
 // ---------- RENDER HELPERS ----------
 
+function videoIdOf(link) {
+  try {
+    return new URL(link.normalized_url).searchParams.get("v");
+  } catch {
+    return null;
+  }
+}
+
+// Images go through the server's /thumbs cache; the CDN URL is the fallback.
+function setCachedImage(img, link, kind, width, fallback) {
+  const vid = videoIdOf(link);
+  img.loading = "lazy";
+  img.decoding = "async";
+  if (!vid) {
+    img.src = fallback;
+    return;
+  }
+  img.src = `/thumbs/${encodeURIComponent(vid)}${kind === "avatar" ? "/avatar" : ""}?w=${width}`;
+  img.onerror = () => {
+    img.onerror = null;
+    img.src = fallback;
+  };
+}
+
 function gridColumnsClass() {
   const n = settings.columns || 5;
   const value = Math.max(2, Math.min(10, n));
@@ -351,49 +548,6 @@ function gridColumnsClass() {
   return `grid-cols-1 sm:grid-cols-2 md:grid-cols-3 lg:grid-cols-${lg}`;
 }
 
-function sortLinks(links) {
-  const mode = settings.sortMode || "newest";
-
-  return [...links].sort((a, b) => {
-    const ta = new Date(a.created_at || 0).getTime();
-    const tb = new Date(b.created_at || 0).getTime();
-
-    if (mode === "newest") return tb - ta;
-    if (mode === "oldest") return ta - tb;
-
-    if (mode === "alpha") {
-      const sa = (a.title || "").toLowerCase();
-      const sb = (b.title || "").toLowerCase();
-      return sa.localeCompare(sb);
-    }
-
-    if (mode === "duration") {
-      const da = a.duration_seconds || 0;
-      const db = b.duration_seconds || 0;
-      return da - db;
-    }
-
-    return tb - ta;
-  });
-}
-
-function filterLinksBySearch(links) {
-  if (!currentSearchQuery) return links;
-  const q = currentSearchQuery.toLowerCase();
-  return links.filter((l) => {
-    const text = [
-      l.title || "",
-      l.author || "",
-      l.normalized_url || "",
-      (l.tags || []).join(" "),
-    ]
-      .join(" ")
-      .toLowerCase();
-    return text.includes(q);
-  });
-}
-
-
 // ---------- RENDER ----------
 
 function render() {
@@ -401,36 +555,16 @@ function render() {
   const container = document.getElementById("links-container");
   if (!categorySelect || !container) return;
 
-  document.getElementById("mini-total")?.textContent = appState.links.length.toString();
-  document.getElementById("mini-cats")?.textContent = appState.categories.length.toString();
+  // counts and category order come precomputed from the server
+  const stats = categoryStats || { total: 0, order: appState.categories, categories: {} };
+  const miniTotal = document.getElementById("mini-total");
+  if (miniTotal) miniTotal.textContent = stats.total.toString();
+  const miniCats = document.getElementById("mini-cats");
+  if (miniCats) miniCats.textContent = appState.categories.length.toString();
 
-  // Categories order
   categorySelect.innerHTML = "";
 
-  const cats = [...appState.categories];
-
-  const counts = {};
-  appState.links.forEach((l) => {
-    (l.categories || [primaryCategory(l)]).forEach((cat) => {
-      counts[cat] = (counts[cat] || 0) + 1;
-    });
-  });
-
-  const strategy = document.getElementById("category-order")?.value || appState.config?.category_order_strategy || "recent";
-  cats.sort((a, b) => {
-    if (strategy === "alphabetical") return a.localeCompare(b);
-    if (strategy === "most_items") return (counts[b] || 0) - (counts[a] || 0);
-    if (strategy === "pinned_first") {
-      const pinned = appState.config?.pinned_categories || [];
-      const ap = pinned.includes(a);
-      const bp = pinned.includes(b);
-      if (ap !== bp) return ap ? -1 : 1;
-    }
-    const ta = categoryLastActive[a] || 0;
-    const tb = categoryLastActive[b] || 0;
-    if (tb !== ta) return tb - ta;
-    return a.localeCompare(b);
-  });
+  const cats = listedCategories();
 
   cats.forEach((c) => {
     const opt = document.createElement("option");
@@ -442,15 +576,20 @@ function render() {
 
   container.innerHTML = "";
 
-  // Build category → links mapping
+  // category → links, already sorted (and searched) by the server
   const byCategory = {};
-  appState.links.forEach((l) => {
-    const catsForLink = l.categories && l.categories.length ? l.categories : [primaryCategory(l)];
-    catsForLink.forEach((cat) => {
-      if (!byCategory[cat]) byCategory[cat] = [];
-      byCategory[cat].push(l);
+  if (searchResults) {
+    searchResults.forEach((l) => {
+      linkCategories(l).forEach((cat) => {
+        if (!byCategory[cat]) byCategory[cat] = [];
+        byCategory[cat].push(l);
+      });
     });
-  });
+  } else {
+    Object.entries(pages).forEach(([cat, page]) => {
+      byCategory[cat] = page.items;
+    });
+  }
 
   const viewMode = settings.viewMode || "grid";
 
@@ -458,11 +597,6 @@ function render() {
     const links = byCategory[cat] || [];
     if (!links.length) return;
 
-    const filtered = filterLinksBySearch(links);
-    if (!filtered.length && currentSearchQuery) return;
-
-    const sorted = sortLinks(filtered);
-
     const card = document.createElement("div");
     card.className =
       "glass-strong border border-white/40 rounded-2xl p-4 shadow-lg soft-card mb-3 transition duration-150";
@@ -472,7 +606,8 @@ function render() {
 
     const title = document.createElement("h2");
     title.className = "text-sm font-semibold text-slate-800";
-    title.textContent = `${cat} (${sorted.length})`;
+    const count = searchResults ? links.length : stats.categories[cat]?.count ?? pages[cat]?.total ?? links.length;
+    title.textContent = `${cat} (${count})`;
 
     const sortLabel = document.createElement("div");
     sortLabel.className = "text-[11px] text-slate-500";
@@ -489,8 +624,8 @@ function render() {
     // separate shorts vs normal
     const normal = [];
     const shorts = [];
-    sorted.forEach((l) => {
-      if ((l.normalized_url || "").includes("/shorts/")) shorts.push(l);
+    links.forEach((l) => {
+      if (isShort(l)) shorts.push(l);
       else normal.push(l);
     });
 
@@ -500,6 +635,17 @@ function render() {
       renderListMode(card, cat, normal.concat(shorts));
     }
 
+    if (!searchResults && pages[cat]?.cursor) {
+      const more = document.createElement("button");
+      more.className = "mt-3 w-full text-[11px] px-3 py-[6px] glass rounded-lg text-slate-700 focus-ring";
+      more.textContent = `Load more (${links.length} of ${count})`;
+      more.addEventListener("click", () => {
+        more.disabled = true;
+        loadMore(cat);
+      });
+      card.appendChild(more);
+    }
+
     container.appendChild(card);
   });
 }
@@ -523,7 +669,7 @@ function renderGridMode(card, cat, normal, shorts) {
 
       if (link.thumbnail_url) {
         const img = document.createElement("img");
-        img.src = link.thumbnail_url;
+        setCachedImage(img, link, "thumb", 480, link.thumbnail_url);
         img.alt = link.title || "thumb";
         img.className = "w-full h-full object-cover";
         thumbWrap.appendChild(img);
@@ -560,9 +706,11 @@ function renderGridMode(card, cat, normal, shorts) {
       const avatar = document.createElement("img");
       avatar.className =
         "w-9 h-9 rounded-full object-cover flex-shrink-0 bg-slate-200 shadow-inner";
-      avatar.src =
-        link.channel_avatar ||
-        "https://www.youtube.com/s/desktop/fe4547c5/img/favicon_144x144.png";
+      if (link.channel_avatar) {
+        setCachedImage(avatar, link, "avatar", 96, link.channel_avatar);
+      } else {
+        avatar.src = "https://www.youtube.com/s/desktop/fe4547c5/img/favicon_144x144.png";
+      }
       bottom.appendChild(avatar);
 
       const textBox = document.createElement("div");
@@ -658,7 +806,7 @@ function renderGridMode(card, cat, normal, shorts) {
 
       if (link.thumbnail_url) {
         const img = document.createElement("img");
-        img.src = link.thumbnail_url;
+        setCachedImage(img, link, "thumb", 240, link.thumbnail_url);
         img.alt = link.title || "short";
         img.className = "w-full h-40 object-cover";
         s.appendChild(img);
@@ -694,7 +842,7 @@ function renderListMode(card, cat, links) {
 
     if (link.thumbnail_url) {
       const img = document.createElement("img");
-      img.src = link.thumbnail_url;
+      setCachedImage(img, link, "thumb", 240, link.thumbnail_url);
       img.alt = link.title || "thumb";
       img.className = "w-full h-full object-cover";
       thumb.appendChild(img);
@@ -859,10 +1007,16 @@ function setupControls() {
 
   const resetBtn = document.getElementById("reset-filters-btn");
   if (resetBtn) {
-    resetBtn.addEventListener("click", () => {
+    resetBtn.addEventListener("click", async () => {
       currentSearchQuery = "";
+      searchResults = null;
+      const searchInput = document.getElementById("search-input");
+      if (searchInput) searchInput.value = "";
       settings.sortMode = "newest";
       saveSettings();
+      const sortSelect = document.getElementById("sort-select");
+      if (sortSelect) sortSelect.value = settings.sortMode;
+      await loadPages(listedCategories(), false);
       render();
     });
   }
@@ -871,10 +1025,7 @@ function setupControls() {
     .getElementById("export-json-btn")
     ?.addEventListener("click", async () => {
       const res = await fetch("/api/export/json");
-      const data = await res.json();
-      const blob = new Blob([JSON.stringify(data, null, 2)], {
-        type: "application/json",
-      });
+      const blob = await res.blob();
       const url = URL.createObjectURL(blob);
       const a = document.createElement("a");
       a.href = url;
@@ -887,8 +1038,7 @@ function setupControls() {
     .getElementById("export-txt-btn")
     ?.addEventListener("click", async () => {
       const res = await fetch("/api/export/txt");
-      const text = await res.text();
-      const blob = new Blob([text], { type: "text/plain" });
+      const blob = await res.blob();
       const url = URL.createObjectURL(blob);
       const a = document.createElement("a");
       a.href = url;
@@ -924,6 +1074,7 @@ function setupControls() {
       headers: { "Content-Type": "application/json" },
       body: JSON.stringify({ category_order_strategy: e.target.value }),
     });
+    await fetchCategoryStats();
     render();
   });
 
@@ -988,9 +1139,10 @@ function setupControls() {
   const sortSelect = document.getElementById("sort-select");
   if (sortSelect) {
     sortSelect.value = settings.sortMode;
-    sortSelect.addEventListener("change", () => {
+    sortSelect.addEventListener("change", async () => {
       settings.sortMode = sortSelect.value;
       saveSettings();
+      await loadPages(listedCategories(), false);
       render();
     });
   }
@@ -998,9 +1150,14 @@ function setupControls() {
   const searchInput = document.getElementById("search-input");
   if (searchInput) {
     searchInput.value = currentSearchQuery;
+    let searchTimer = null;
     searchInput.addEventListener("input", () => {
       currentSearchQuery = searchInput.value;
-      render();
+      clearTimeout(searchTimer);
+      searchTimer = setTimeout(async () => {
+        await runSearch();
+        render();
+      }, SEARCH_DEBOUNCE_MS);
     });
   }
 }
@@ -1012,6 +1169,7 @@ window.addEventListener("DOMContentLoaded", async () => {
   setupControls();
   setupDragAndPaste();
   setupQueueProcessor();
-  await fetchDraft();
-  setInterval(fetchDraft, 5000);
+  await fetchFirstPage();
+  await fetchLibrary();
+  subscribeChanges();
 });
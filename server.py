@@ -18,10 +18,10 @@ WATCH_FILES = [
 ]
 
 
-def run_uvicorn():
+def make_server() -> uvicorn.Server:
     """
-    Run the FastAPI app via uvicorn in this process
-    (called in a background thread).
+    The FastAPI app via uvicorn in this process; its run() goes in a
+    background thread, stopped with stop_server().
     """
     config = uvicorn.Config(
         "backend.main:app",
@@ -29,9 +29,19 @@ def run_uvicorn():
         port=PORT,
         log_level="info",
         reload=False,  # we are doing our own watch/restart
+        timeout_graceful_shutdown=3,  # open /api/events streams would hold shutdown
     )
-    server = uvicorn.Server(config)
-    server.run()
+    return uvicorn.Server(config)
+
+
+def stop_server(server: uvicorn.Server, thread: threading.Thread):
+    """
+    Shut the server down and wait for it. The thread is a daemon, so
+    exiting (or exec'ing) without this skips the app's shutdown handler,
+    which flushes pending writes and closes storage.
+    """
+    server.should_exit = True
+    thread.join(30)
 
 
 def open_browser_once():
@@ -45,7 +55,8 @@ def open_browser_once():
 
 def main():
     # start uvicorn in a separate thread
-    t = threading.Thread(target=run_uvicorn, daemon=True)
+    server = make_server()
+    t = threading.Thread(target=server.run, daemon=True)
     t.start()
 
     # give it a moment to boot before opening browser
@@ -79,12 +90,14 @@ def main():
                     mtimes[p] = new_mtime
                     if ans == "y":
                         print("[server] Restarting with new code...")
+                        stop_server(server, t)
                         # restart the entire python process (works for exe too)
                         os.execv(sys.executable, [sys.executable] + sys.argv)
                     else:
                         print("[server] Ignoring change. Continuing...")
     except KeyboardInterrupt:
         print("\n[server] Shutting down.")
+        stop_server(server, t)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,76 @@
+import importlib
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from backend import storage
+from backend.journal import Journal
+from backend.records import LinkRecord
+
+try:
+    import pytest_benchmark  # noqa: F401
+except ImportError:  # timings are optional; the checks around them still run
+
+    @pytest.fixture
+    def benchmark():
+        pytest.skip("needs pytest-benchmark")
+
+
+def make_link(link_id: int, title: str = None, categories=("Unsorted",), **fields) -> LinkRecord:
+    vid = f"{link_id:011d}"
+    return LinkRecord(
+        id=link_id,
+        original_url=f"https://youtu.be/{vid}",
+        normalized_url=f"https://www.youtube.com/watch?v={vid}",
+        categories=list(categories),
+        primary_category=categories[0] if categories else "Unsorted",
+        title=title,
+        **fields,
+    )
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """backend.storage writing to a scratch directory instead of the working tree."""
+    monkeypatch.setattr(storage, "STATE_FILE", tmp_path / "draft_state.json")
+    monkeypatch.setattr(storage, "SNAP_FILE", tmp_path / "draft_state.snap")
+    monkeypatch.setattr(storage, "JOURNAL_FILE", tmp_path / "draft_state.journal")
+    monkeypatch.setattr(storage, "DB_FILE", tmp_path / "draft_state.db")
+    monkeypatch.setattr(storage, "_sqlite_store", None)
+    monkeypatch.setattr(storage, "journal", Journal(tmp_path / "draft_state.journal"))
+    monkeypatch.setattr(storage, "_writer", None)
+    monkeypatch.setattr(storage, "_snapshot_seq", 0)
+    monkeypatch.setattr(storage, "hydration", None)
+    yield storage
+    storage.close_storage()
+    storage.journal.close()
+    storage.hydrated.set()
+
+
+def crash(store):
+    """What survives a kill -9 once the writer has flushed: the files, nothing in memory."""
+    store.flush()
+    store.close_storage()
+    store.journal.close()
+    store.journal = Journal(store.JOURNAL_FILE)
+    store._writer = None
+
+
+@pytest.fixture(scope="session")
+def main(tmp_path_factory):
+    """backend.main imported in a scratch working directory (empty library, no startup run)."""
+    root = tmp_path_factory.mktemp("app")
+    (root / "frontend").symlink_to(Path(__file__).resolve().parent.parent / "frontend")
+    cwd = os.getcwd()
+    os.chdir(root)
+    sys.modules.pop("backend.main", None)
+    try:
+        module = importlib.import_module("backend.main")
+        yield module
+    finally:
+        storage.close_storage()
+        storage.journal.close()
+        storage._writer = None
+        os.chdir(cwd)
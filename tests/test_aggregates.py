@@ -0,0 +1,122 @@
+import random
+from datetime import datetime, timedelta
+
+from backend.aggregates import CategoryStats, categories_of
+from backend.index import LinkIndex
+
+from .conftest import make_link
+
+T0 = datetime(2026, 1, 1)
+
+
+def _stats(index):
+    return {cat: agg.as_dict() for cat, agg in index.stats.by_category.items()}
+
+
+def _recount(index):
+    """The aggregates counted from scratch, for comparison."""
+    fresh = CategoryStats()
+    for link in index.links():
+        fresh.add(link)
+    return {cat: agg.as_dict() for cat, agg in fresh.by_category.items()}
+
+
+def test_add_counts_every_category_of_a_link():
+    index = LinkIndex()
+    index.add(make_link(1, categories=("Music", "Live"), duration_seconds=200))
+    index.add(make_link(2, categories=("Music",), video_type="short", duration_seconds=30))
+    index.add(make_link(3, categories=("Music",)))  # duration not known yet
+    assert _stats(index) == {
+        "Music": {"count": 3, "normal": 2, "shorts": 1, "duration_seconds": 230, "timed": 2},
+        "Live": {"count": 1, "normal": 1, "shorts": 0, "duration_seconds": 200, "timed": 1},
+    }
+
+
+def test_shorts_by_url_and_the_primary_fallback():
+    link = make_link(1, categories=())
+    link.original_url = "https://www.youtube.com/shorts/abcdefghijk"
+    link.primary_category = "Inbox"
+    assert categories_of(link) == ("Inbox",)
+    stats = CategoryStats()
+    stats.add(link)
+    assert stats.get("Inbox").shorts == 1
+
+
+def test_delete_subtracts_and_drops_empty_categories():
+    index = LinkIndex()
+    index.add(make_link(1, categories=("Music", "Live"), duration_seconds=200))
+    index.add(make_link(2, categories=("Music",), duration_seconds=100))
+    index.remove(1)
+    assert _stats(index) == {"Music": {"count": 1, "normal": 1, "shorts": 0, "duration_seconds": 100, "timed": 1}}
+    index.remove(2)
+    index.remove(2)  # twice: nothing left to subtract
+    assert _stats(index) == {} and index.stats.contrib == {}
+
+
+def test_recategorize_and_metadata_refresh_move_the_contribution():
+    index = LinkIndex()
+    link = make_link(1, categories=("Music",), duration_seconds=120)
+    index.add(link)
+    index.set_categories(link, ["Talks", "Live"], primary="Talks")
+    assert set(_stats(index)) == {"Talks", "Live"} and index.stats.get("Talks").duration_seconds == 120
+
+    link.duration_seconds, link.video_type = 40, "short"
+    index.refresh(link)
+    assert index.stats.get("Live").as_dict() == {
+        "count": 1,
+        "normal": 0,
+        "shorts": 1,
+        "duration_seconds": 40,
+        "timed": 1,
+    }
+
+
+def test_random_edits_match_a_recount():
+    rng = random.Random(7)
+    cats = ["A", "B", "C", "D"]
+    index = LinkIndex()
+    for i in range(1, 301):
+        categories = tuple(rng.sample(cats, rng.randint(1, 2)))
+        index.add(make_link(i, categories=categories, duration_seconds=rng.randint(0, 9)))
+    for _ in range(600):
+        link = index.get(rng.randint(1, 300))
+        if link is None:
+            continue
+        op = rng.random()
+        if op < 0.2:
+            index.remove(link.id)
+        elif op < 0.6:
+            index.set_categories(link, rng.sample(cats, rng.randint(1, 3)))
+        else:
+            link.duration_seconds = rng.choice([None, 0, rng.randint(1, 600)])
+            link.video_type = rng.choice(["short", "video", None])
+            index.refresh(link)
+    assert _stats(index) == _recount(index)
+
+
+def test_order_strategies_and_summary():
+    index = LinkIndex()
+    for i, cat in enumerate(["beta", "Alpha", "beta", "gamma", "beta", "gamma"], start=1):
+        index.add(make_link(i, categories=(cat,), created_at=T0 + timedelta(hours=i)))
+    cats = ["gamma", "Alpha", "beta", "empty"]
+
+    def order(strategy, pinned=()):
+        return index.stats.ordered(cats, strategy, list(pinned), index.last_added)
+
+    assert order("alphabetical") == ["Alpha", "beta", "empty", "gamma"]
+    assert order("most_items") == ["beta", "gamma", "Alpha", "empty"]
+    assert order("recent") == ["gamma", "beta", "Alpha", "empty"]
+    assert order("pinned_first", ["Alpha", "empty"]) == ["Alpha", "empty", "gamma", "beta"]
+
+    summary = index.stats.summary(cats, "recent", [], index.last_added)
+    assert summary["order"] == order("recent")
+    assert summary["categories"]["beta"]["count"] == 3
+    assert summary["categories"]["beta"]["last_added"] == (T0 + timedelta(hours=5)).isoformat()
+    assert summary["categories"]["empty"] == {
+        "count": 0,
+        "normal": 0,
+        "shorts": 0,
+        "duration_seconds": 0,
+        "timed": 0,
+        "last_added": None,
+    }
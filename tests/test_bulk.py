@@ -0,0 +1,86 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from backend.index import LinkIndex
+from backend.jobs import JobTable
+
+from .conftest import make_link
+
+
+class _Request:
+    """What add_links_bulk reads of a request: the content type and the JSON body."""
+
+    def __init__(self, body):
+        self.headers = {"content-type": "application/json"}
+        self._body = body
+
+    async def json(self):
+        if isinstance(self._body, bytes):
+            return json.loads(self._body)
+        return self._body
+
+
+@pytest.fixture
+def library(main, monkeypatch):
+    """main with an empty library and queue and a metadata cache that never hits."""
+    monkeypatch.setitem(main.state.__pydantic_private__, "_index", LinkIndex())
+    monkeypatch.setattr(main.state, "_jobs", JobTable())
+    monkeypatch.setattr(main.metadata_cache, "lookup", lambda vid: ("miss", None))
+    monkeypatch.setattr(main.metadata_cache, "lookup_many", lambda vids: {v: ("miss", None) for v in vids if v})
+    monkeypatch.setattr(main, "_prefetch_images", lambda link: None)
+    return main
+
+
+def _bulk(main, body):
+    async def run():
+        response = await main.add_links_bulk(_Request(body))
+        return "".join([chunk async for chunk in response.body_iterator])
+
+    return [json.loads(line) for line in asyncio.run(run()).splitlines()]
+
+
+def test_bulk_streams_one_outcome_per_url(library):
+    library.state.index.add(make_link(900_001, categories=("Music",)))
+    new = "https://youtu.be/Aa1Bb2Cc3Dd"
+    urls = ["https://youtu.be/00000900001", new, "not a link", new]
+    rows = _bulk(library, {"urls": urls, "category": "Music"})
+    assert [row.get("status") for row in rows[:-1]] == ["duplicate", "added", "invalid", "duplicate"]
+    assert rows[-1] == {"summary": {"added": 1, "duplicate": 2, "invalid": 1}, "committed": True}
+    assert len(library.state.index) == 2
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b"{not json",
+        ["https://youtu.be/Aa1Bb2Cc3Dd"],
+        {"urls": ["https://youtu.be/Aa1Bb2Cc3Dd", 7]},
+        {"urls": "https://youtu.be/Aa1Bb2Cc3Dd"},
+        {"urls": [], "tags": [None]},
+        {"urls": [], "category": ["Music"]},
+        {"urls": [], "allow_duplicate": "yes"},
+    ],
+)
+def test_malformed_bulk_body_is_a_400(library, body):
+    with pytest.raises(HTTPException) as raised:
+        _bulk(library, body)
+    assert raised.value.status_code == 400
+    assert len(library.state.index) == 0
+
+
+def test_unchanged_duplicate_is_not_journaled(library):
+    url = "https://www.youtube.com/watch?v=Aa1Bb2Cc3Dd"
+    ops = []
+    _, link = library._ingest(url, url, "Music", None, False, ops)
+    assert [op for op, _ in ops] == ["link_added"]
+    rev = library.state.changes.rev
+    ops = []
+    assert library._ingest(url, url, "Music", None, True, ops) == ("duplicate", link)
+    assert ops == [] and library.state.changes.rev == rev
+    # a new category is a change
+    library._ingest(url, url, "Chill", None, False, ops)
+    assert [op for op, _ in ops] == ["category_changed"] and link.categories == ("Music", "Chill")
+    assert library.state.changes.rev > rev
@@ -0,0 +1,59 @@
+import asyncio
+
+from backend import changes as changes_mod
+from backend.changes import ChangeLog
+
+
+def test_touch_bumps_revision_and_keeps_latest_per_key():
+    log = ChangeLog()
+    start = log.rev
+    log.touch("link", 1)
+    log.touch("link", 2)
+    log.touch("link", 1)  # moves to the end
+    log.touch("queue", 2, deleted=True)
+    assert log.rev == start + 4
+    assert log.changes_since(start) == [("link", 2, False), ("link", 1, False), ("queue", 2, True)]
+    assert log.changes_since(start + 3) == [("queue", 2, True)]
+    assert log.changes_since(log.rev) == []
+
+
+def test_changes_since_outside_history_needs_full_reload():
+    log = ChangeLog()
+    log.touch("link", 1)
+    assert log.changes_since(log.rev + 1) is None  # from a future (or other) run
+    assert log.changes_since(0) is None
+    assert log.changes_since(log.floor) == [("link", 1, False)]
+
+
+def test_trimmed_history_raises_floor(monkeypatch):
+    monkeypatch.setattr(changes_mod, "MAX_TRACKED", 3)
+    log = ChangeLog()
+    start = log.rev
+    for i in range(5):
+        log.touch("link", i)
+    assert log.floor == start + 2
+    assert log.changes_since(start + 1) is None
+    assert [key for _, key, _ in log.changes_since(start + 2)] == [2, 3, 4]
+
+
+def test_kind_rev():
+    log = ChangeLog()
+    assert log.kind_rev("config") == log.start
+    rev = log.touch("config")
+    log.touch("link", 1)
+    assert log.kind_rev("config") == rev
+    assert log.kind_rev("link") == rev + 1
+
+
+def test_wait_wakes_on_touch():
+    async def scenario():
+        log = ChangeLog()
+        since = log.rev
+        assert not await log.wait(since, 0.01)
+        waiter = asyncio.create_task(log.wait(since, 5))
+        await asyncio.sleep(0)
+        log.touch("link", 1)
+        assert await waiter
+        assert await log.wait(since, 0)  # already past
+
+    asyncio.run(scenario())
@@ -0,0 +1,108 @@
+import pytest
+
+from backend.dedupe import SimilarityIndex, band_keys, durations_match, jaccard, shingles
+
+from .conftest import make_link
+
+
+@pytest.mark.parametrize(
+    "a, b",
+    [
+        (("Daft Punk - Around the World (Official Video)", "Daft Punk"), ("Around the World | Daft Punk", "DaftPunkVEVO")),
+        (("Adele - Hello (Lyrics)", "Lyrics Channel"), ("Adele - Hello [Official Music Video] HD", "AdeleVEVO")),
+        (("Hello", "Adele - Topic"), ("Adele - Hello (Visualizer)", "Adele")),
+        (("Song Title ft. Someone Else", "Artist"), ("Artist - Song Title (feat. Someone)", "Artist")),
+    ],
+)
+def test_upload_variants_shingle_alike(a, b):
+    assert shingles(*a) == shingles(*b)
+
+
+def test_same_artist_different_song_differs():
+    a = shingles("Adele - Hello", "Adele")
+    b = shingles("Adele - Skyfall", "Adele")
+    assert jaccard(a, b) < 0.6
+    assert shingles(None, "Adele") == frozenset()
+
+
+def test_durations_match():
+    assert durations_match(200, 212)  # within the 15 s slack
+    assert durations_match(600, 655)  # within 10%
+    assert not durations_match(200, 260)
+    assert durations_match(None, 200)
+
+
+def test_band_keys_are_stable_per_token_set():
+    tokens = frozenset({"around", "world", "~daftpunk"})
+    assert band_keys(tokens) == band_keys(frozenset(sorted(tokens)))
+    assert len(band_keys(tokens)) == 8
+
+
+def _index(*links):
+    index = SimilarityIndex()
+    by_id = {link.id: link for link in links}
+    for link in links:
+        index.add(link)
+    return index, by_id.get
+
+
+def test_similar_finds_reuploads_best_first():
+    original = make_link(1, "Daft Punk - Around the World (Official Video)", author="Daft Punk", duration_seconds=240)
+    lyric = make_link(2, "Daft Punk - Around The World (Lyrics)", author="Lyric Vids", duration_seconds=236)
+    live = make_link(3, "Daft Punk - Around the World Live at the Grammys", author="Daft Punk", duration_seconds=250)
+    other = make_link(4, "Daft Punk - One More Time", author="Daft Punk", duration_seconds=320)
+    index, lookup = _index(original, lyric, live, other)
+    found = index.similar(original, lookup)
+    assert [(link.id, round(score, 2)) for link, score in found] == [(2, 1.0)]
+    assert [link.id for link, _ in index.similar(original, lookup, threshold=0.3)] == [2, 3]
+
+
+def test_duration_rules_out_a_match():
+    a = make_link(1, "Artist - Long Song Name", author="Artist", duration_seconds=200)
+    b = make_link(2, "Artist - Long Song Name (Extended Mix)", author="Artist", duration_seconds=420)
+    index, lookup = _index(a, b)
+    assert index.similar(a, lookup, threshold=0.5) == []
+
+
+def test_untitled_links_wait_for_metadata():
+    a = make_link(1, "Artist - Some Song", author="Artist")
+    b = make_link(2)
+    index, lookup = _index(a, b)
+    assert len(index) == 1
+    b.title, b.author = "Artist - Some Song (Audio)", "Artist - Topic"
+    index.update(b)
+    assert [link.id for link, _ in index.similar(a, lookup)] == [2]
+
+
+def test_remove_and_deferred_drain():
+    links = [make_link(i, "Band - Same Song", author="Band") for i in range(1, 4)]
+    by_id = {link.id: link for link in links}
+    index = SimilarityIndex()
+    index.defer(by_id)
+    assert index.similar(links[0], by_id.get) == []
+    assert index.drain(by_id.get, 2) == 1
+    assert index.drain(by_id.get, 10) == 0
+    assert [link.id for link, _ in index.similar(links[0], by_id.get)] == [2, 3]
+    index.remove(2)
+    assert [link.id for link, _ in index.similar(links[0], by_id.get)] == [3]
+    index.remove(3)
+    index.remove(1)
+    assert index.buckets == {} and len(index) == 0
+
+
+def test_clusters_group_transitively_and_cache():
+    links = [
+        make_link(1, "Singer - Tune (Official Video)", author="Singer"),
+        make_link(2, "Singer - Tune (Lyrics)", author="Lyrics Hub"),
+        make_link(3, "Tune | Singer", author="SingerVEVO"),
+        make_link(4, "Someone - Else", author="Someone"),
+        make_link(5, "Someone - Else (Audio)", author="Someone - Topic"),
+        make_link(6, "Unrelated - Thing", author="Nobody"),
+    ]
+    index, lookup = _index(*links)
+    clusters = index.clusters(lookup)
+    assert [ids for ids, _ in clusters] == [[1, 2, 3], [4, 5]]
+    assert index.clusters(lookup) is clusters  # unchanged index: cached
+    assert [ids for ids, _ in index.clusters(lookup, only=[5])] == [[4, 5]]
+    index.remove(2)
+    assert [ids for ids, _ in index.clusters(lookup)] == [[1, 3], [4, 5]]
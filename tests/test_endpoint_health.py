@@ -0,0 +1,166 @@
+import time
+import types
+from email.utils import formatdate
+
+import pytest
+import requests
+
+from backend import metadata
+from backend.metadata import (
+    BREAKER_COOLDOWN,
+    BREAKER_THRESHOLD,
+    EndpointHealth,
+    EndpointUnavailable,
+    _get,
+    _retry_after,
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A settable clock in place of time.time() inside backend.metadata, with no jitter."""
+    clock = types.SimpleNamespace(now=1_000_000.0)
+    monkeypatch.setattr(metadata, "time", types.SimpleNamespace(time=lambda: clock.now, perf_counter=time.perf_counter))
+    monkeypatch.setattr(metadata, "random", types.SimpleNamespace(uniform=lambda low, high: 1.0))
+    return clock
+
+
+def _open(health, clock):
+    for _ in range(BREAKER_THRESHOLD):
+        clock.now = max(clock.now, health.blocked_until)
+        assert health.allow()
+        health.failure("HTTP 503")
+    assert health.state == "open"
+
+
+def test_failures_back_off_exponentially(clock):
+    health = EndpointHealth("x")
+    delays = []
+    for _ in range(BREAKER_THRESHOLD - 1):
+        assert health.allow()
+        health.failure("HTTP 503")
+        delays.append(health.retry_in())
+        assert not health.allow()
+        clock.now = health.blocked_until
+    assert delays == [1.0, 2.0, 4.0, 8.0]
+    assert health.state == "closed" and health.counters["skipped"] == BREAKER_THRESHOLD - 1
+    health.success()
+    assert health.failures == 0
+    health.failure("HTTP 500")
+    assert health.retry_in() == 1.0  # a success starts the backoff over
+
+
+def test_retry_after_extends_the_backoff_but_never_shortens_it(clock):
+    health = EndpointHealth("x")
+    health.failure("HTTP 429", retry_after=30, throttled=True)
+    assert health.retry_in() == 30 and health.counters["throttled"] == 1
+    health.failure("HTTP 429", retry_after=0.5, throttled=True)
+    assert health.retry_in() == 30
+
+
+def test_circuit_opens_probes_once_and_closes(clock):
+    health = EndpointHealth("x")
+    _open(health, clock)
+    assert health.counters["opened"] == 1 and health.retry_in() == BREAKER_COOLDOWN
+    clock.now += BREAKER_COOLDOWN - 1
+    assert not health.allow()
+
+    clock.now += 1
+    assert health.allow()  # the probe
+    assert health.state == "half_open" and health.probing
+    assert not health.allow()  # only one at a time
+    health.success()
+    assert health.state == "closed" and not health.probing and health.cooldown == BREAKER_COOLDOWN
+    assert health.allow() and health.allow()
+
+
+def test_failed_probe_reopens_with_a_longer_cooldown(clock):
+    health = EndpointHealth("x")
+    _open(health, clock)
+    clock.now = health.blocked_until
+    assert health.allow()
+    health.failure("ConnectionError")
+    assert health.state == "open" and health.counters["opened"] == 2
+    assert health.retry_in() == 2 * BREAKER_COOLDOWN
+
+    clock.now = health.blocked_until
+    assert health.allow()
+    health.success()
+    assert health.cooldown == BREAKER_COOLDOWN  # back to the base cool-down once closed
+
+
+def test_throttling_calls_the_hooks(clock, monkeypatch):
+    calls = []
+    monkeypatch.setattr(metadata, "throttle_hooks", [lambda: calls.append(1)])
+    health = EndpointHealth("x")
+    health.failure("HTTP 503")
+    assert calls == []
+    health.failure("HTTP 429", throttled=True)
+    assert calls == [1]
+
+
+class _Session:
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+
+    def get(self, endpoint, params=None, timeout=None):
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def _response(status, **headers):
+    return types.SimpleNamespace(status_code=status, headers=headers)
+
+
+def test_get_reports_every_outcome(clock, monkeypatch):
+    monkeypatch.setattr(
+        metadata,
+        "session",
+        _Session(_response(200), _response(404), requests.ConnectionError(), _response(503, **{"Retry-After": "60"})),
+    )
+    health = EndpointHealth("x")
+    assert _get(health, "e", {}).status_code == 200
+    assert _get(health, "e", {}) is None  # says nothing about the endpoint
+    assert health.counters["ok"] == 2
+
+    with pytest.raises(EndpointUnavailable) as raised:
+        _get(health, "e", {})
+    assert health.last_error == "ConnectionError" and raised.value.retry_in == 1.0
+    clock.now = health.blocked_until
+    with pytest.raises(EndpointUnavailable) as raised:
+        _get(health, "e", {})
+    assert raised.value.retry_in == 60 and health.counters["errors"] == 2
+
+    with pytest.raises(EndpointUnavailable):
+        _get(health, "e", {})  # backing off: not sent
+    assert health.counters["skipped"] == 1
+
+
+def test_unexpected_error_during_the_probe_releases_it(clock, monkeypatch):
+    health = EndpointHealth("x")
+    _open(health, clock)
+    clock.now = health.blocked_until
+    monkeypatch.setattr(metadata, "session", _Session(RuntimeError("bug"), _response(200)))
+    with pytest.raises(RuntimeError):
+        _get(health, "e", {})
+    assert health.state == "half_open" and not health.probing
+    assert _get(health, "e", {}).status_code == 200
+    assert health.state == "closed"
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [(None, None), ("", None), ("120", 120.0), ("1.5", 1.5), ("-3", 0.0), ("soon", None)],
+)
+def test_retry_after_seconds(clock, value, expected):
+    headers = {} if value is None else {"Retry-After": value}
+    assert _retry_after(types.SimpleNamespace(headers=headers)) == expected
+
+
+def test_retry_after_http_date(clock):
+    date = formatdate(clock.now + 90, usegmt=True)
+    assert _retry_after(types.SimpleNamespace(headers={"Retry-After": date})) == 90
+    past = formatdate(clock.now - 90, usegmt=True)
+    assert _retry_after(types.SimpleNamespace(headers={"Retry-After": past})) == 0
@@ -0,0 +1,120 @@
+import asyncio
+import gzip
+import json
+
+import pytest
+from starlette.requests import Request
+
+from backend import exports
+from backend.exports import select_links
+from backend.index import LinkIndex
+
+from .conftest import make_link
+
+
+@pytest.fixture
+def library(main, monkeypatch):
+    """main with links 1-9: odd ones in Music, even in Talks, every 3rd tagged "live"."""
+    index = LinkIndex()
+    index.rebuild(
+        make_link(
+            i,
+            f"song {i}",
+            categories=("Music",) if i % 2 else ("Talks",),
+            tags=["live"] if i % 3 == 0 else [],
+            author=f"artist {i}",
+            duration_seconds=i * 60,
+        )
+        for i in range(9, 0, -1)
+    )
+    monkeypatch.setitem(main.state.__pydantic_private__, "_index", index)
+    monkeypatch.setattr(exports, "CHUNK_LINKS", 2)  # several chunks even for a small library
+    return main
+
+
+def _request(**headers):
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+def _body(response):
+    async def read():
+        out = []
+        async for chunk in response.body_iterator:
+            out.append(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+        return b"".join(out)
+
+    body = asyncio.run(read())
+    return gzip.decompress(body) if response.headers.get("content-encoding") == "gzip" else body
+
+
+def _export_json(main, **params):
+    return asyncio.run(main.export_json(_request(), **params))
+
+
+@pytest.mark.parametrize(
+    "category, tag, expected",
+    [
+        ("", "", [9, 8, 7, 6, 5, 4, 3, 2, 1]),
+        ("Music", "", [9, 7, 5, 3, 1]),
+        ("", "live", [9, 6, 3]),
+        ("Talks", "live", [6]),
+        ("Nowhere", "", []),
+        ("", "nothing", []),
+    ],
+)
+def test_select_links_filters_newest_first(library, category, tag, expected):
+    assert [l.id for l in select_links(library.state, category, tag)] == expected
+
+
+def test_json_export_is_the_whole_document(library):
+    response = _export_json(library, category="Music", tag="live")
+    data = json.loads(_body(response))
+    assert [l["id"] for l in data["links"]] == [9, 3]
+    assert data["links"][0] == library.state.index.get(9).to_dict()
+    assert data["categories"] == library.state.categories and data["next_id"] == library.state.next_id
+    assert response.headers["etag"].startswith("W/") and "vary" not in response.headers
+
+
+def test_ndjson_and_gzip(library):
+    response = _export_json(library, format="ndjson", gzip=True)
+    assert response.headers["content-encoding"] == "gzip" and response.headers["vary"] == "Accept-Encoding"
+    rows = [json.loads(line) for line in _body(response).decode().splitlines()]
+    assert [row["id"] for row in rows] == list(range(9, 0, -1))
+
+
+def test_unchanged_library_gets_a_304(library):
+    etag = _export_json(library).headers["etag"]
+    assert asyncio.run(library.export_json(_request(if_none_match=etag))).status_code == 304
+    # the gzip and filtered exports are different documents
+    assert _export_json(library, gzip=True).headers["etag"] != etag
+    assert _export_json(library, tag="live").headers["etag"] != etag
+
+
+def test_txt_export(library):
+    response = asyncio.run(library.export_txt(category="Talks", tag="", gzip=True))
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert _body(response).decode().splitlines() == [library.state.index.get(i).normalized_url for i in (8, 6, 4, 2)]
+
+
+def test_ytdlp_export(library):
+    response = asyncio.run(library.export_for_ytdlp(format="json", category="", tag="live", gzip=False))
+    entries = json.loads(_body(response))["entries"]
+    assert entries[0] == {
+        "url": library.state.index.get(9).normalized_url,
+        "title": "song 9",
+        "channel": "artist 9",
+        "duration": 540,
+        "categories": ["Music"],
+        "tags": ["live"],
+    }
+    assert [e["title"] for e in entries] == ["song 9", "song 6", "song 3"]
+    response = asyncio.run(library.export_for_ytdlp(format="ndjson", category="Music", tag="", gzip=False))
+    assert len(_body(response).splitlines()) == 5
+
+
+def test_links_deleted_mid_export_are_skipped(library):
+    links = select_links(library.state)
+    assert next(links).id == 9
+    library.state.index.remove(8)
+    assert [l.id for l in links] == [7, 6, 5, 4, 3, 2, 1]
@@ -0,0 +1,170 @@
+import asyncio
+import types
+
+import pytest
+
+from backend import jobs as jobs_mod
+from backend.jobs import MAX_ATTEMPTS, PRIORITY_BACKLOG, PRIORITY_NEW, PRIORITY_REFRESH, PRIORITY_RETRY, JobTable
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A settable clock in place of time.time() inside backend.jobs."""
+    clock = types.SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(jobs_mod, "time", types.SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+
+def take(table, n=None):
+    """Link ids handed out by next() until nothing is eligible (or `n` were taken)."""
+
+    async def drain():
+        table._wakeup = None  # bound to the previous asyncio.run() loop
+        out = []
+        while n is None or len(out) < n:
+            try:
+                job = await asyncio.wait_for(table.next(), 0.01)
+            except asyncio.TimeoutError:
+                break
+            out.append(job.link_id)
+        return out
+
+    return asyncio.run(drain())
+
+
+def test_priority_order_fifo_within_priority(clock):
+    table = JobTable()
+    table.enqueue(1, priority=PRIORITY_REFRESH)
+    table.enqueue(2, priority=PRIORITY_BACKLOG)
+    table.enqueue(3, priority=PRIORITY_NEW)
+    table.enqueue(4, priority=PRIORITY_BACKLOG)
+    table.enqueue(5, priority=PRIORITY_NEW)
+    assert take(table) == [3, 5, 2, 4, 1]
+    assert table.counts()["fetching"] == 5
+
+
+def test_enqueue_active_is_noop_but_raises_priority(clock):
+    table = JobTable()
+    table.enqueue(1, priority=PRIORITY_REFRESH)
+    table.enqueue(2, priority=PRIORITY_BACKLOG)
+    assert not table.enqueue(1, priority=PRIORITY_REFRESH)
+    assert not table.enqueue(1, priority=PRIORITY_NEW)  # stale heap entry left behind
+    assert table.get(1).priority == PRIORITY_NEW
+    assert take(table) == [1, 2]
+    assert not table.enqueue(1)  # fetching
+    assert table.counts() == {"waiting": 0, "fetching": 2, "done": 0, "failed": 0}
+
+
+def test_delayed_jobs_wait_for_their_time(clock):
+    table = JobTable()
+    table.enqueue(1, delay=30)
+    table.enqueue(2, priority=PRIORITY_REFRESH)
+    assert take(table) == [2]
+    clock.now += 31
+    assert take(table) == [1]
+
+
+def test_retry_backs_off_then_gives_up(clock):
+    table = JobTable()
+    table.enqueue(1)
+    take(table)
+    backoff = []
+    for attempt in range(1, MAX_ATTEMPTS):
+        assert table.retry(1, "boom")
+        job = table.get(1)
+        assert job.status == "waiting" and job.priority == PRIORITY_RETRY and job.attempts == attempt
+        backoff.append(job.next_eligible - clock.now)
+        assert take(table) == []
+        clock.now = job.next_eligible
+        assert take(table) == [1]
+    assert backoff == [jobs_mod.RETRY_BASE * 2**i for i in range(MAX_ATTEMPTS - 1)]
+    assert not table.retry(1, "boom")
+    assert table.get(1).attempts == MAX_ATTEMPTS
+
+
+def test_retries_queue_behind_new_links(clock):
+    table = JobTable()
+    table.enqueue(1)
+    take(table)
+    table.retry(1)
+    clock.now += 60
+    table.enqueue(2)
+    assert take(table) == [2, 1]
+
+
+def test_defer_keeps_attempts(clock):
+    table = JobTable()
+    table.enqueue(1)
+    take(table)
+    assert table.defer(1, 10)
+    assert table.get(1).attempts == 0
+    assert take(table) == []
+    clock.now += 10
+    assert take(table) == [1]
+    assert not table.defer(99, 10)
+
+
+def test_requeue_after_finish_resets_the_job(clock):
+    table = JobTable()
+    table.enqueue(1, url="u")
+    take(table)
+    table.retry(1, "boom")
+    clock.now += 60
+    take(table)
+    table.finish(1, "failed", "boom")
+    assert table.enqueue(1, priority=PRIORITY_REFRESH)
+    job = table.get(1)
+    assert (job.status, job.attempts, job.error, job.url) == ("waiting", 0, None, "u")
+    assert table.counts() == {"waiting": 1, "fetching": 0, "done": 0, "failed": 0}
+
+
+def test_discarded_jobs_are_skipped(clock):
+    table = JobTable()
+    for i in (1, 2, 3):
+        table.enqueue(i)
+    assert table.discard(2)
+    assert not table.discard(2)
+    assert take(table) == [1, 3]
+
+
+def test_finish_keeps_only_the_latest(clock):
+    table = JobTable(keep_done=2, keep_failed=1)
+    for i in range(1, 6):
+        table.enqueue(i)
+    take(table)
+    assert table.finish(1, "done") == []
+    assert table.finish(2, "done") == []
+    assert table.finish(3, "done") == [1]
+    assert table.finish(4, "failed", "x") == []
+    assert table.finish(5, "failed", "y") == [4]
+    assert table.counts() == {"waiting": 0, "fetching": 0, "done": 2, "failed": 1}
+    assert [j["link_id"] for j in table.listing()] == [5, 3, 2]
+    assert table.get(1) is None and table.finish(1, "done") == []
+
+
+def test_listing_runs_in_queue_order(clock):
+    table = JobTable()
+    table.enqueue(1, priority=PRIORITY_REFRESH)
+    table.enqueue(2, delay=5)
+    table.enqueue(3)
+    table.enqueue(4)
+    take(table, 1)
+    assert [(j["link_id"], j["status"]) for j in table.listing()] == [
+        (3, "fetching"),
+        (4, "waiting"),
+        (1, "waiting"),
+        (2, "waiting"),
+    ]
+    assert [j["link_id"] for j in table.listing(limit=2)] == [3, 4]
+    assert [j["link_id"] for j in table.listing(status="waiting")] == [4, 1, 2]
+
+
+def test_next_wakes_on_enqueue(clock):
+    async def scenario():
+        table = JobTable()
+        waiter = asyncio.create_task(table.next())
+        await asyncio.sleep(0)
+        table.enqueue(7)
+        return (await asyncio.wait_for(waiter, 1)).link_id
+
+    assert asyncio.run(scenario()) == 7
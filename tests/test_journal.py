@@ -0,0 +1,153 @@
+import json
+
+import pytest
+
+from backend.journal import Journal
+
+from .conftest import crash, make_link
+
+
+def test_append_assigns_increasing_seqs(tmp_path):
+    journal = Journal(tmp_path / "j")
+    journal.open(0)
+    journal.append("a", {"x": 1})
+    journal.append_many([("b", {}), ("c", {})])
+    assert [(e["seq"], e["op"]) for e in journal.read()] == [(1, "a"), (2, "b"), (3, "c")]
+    assert journal.seq == 3 and journal.pending == 3
+
+
+def test_torn_tail_is_dropped_and_cut(tmp_path):
+    path = tmp_path / "j"
+    journal = Journal(path)
+    journal.open(0)
+    journal.append_many([("a", {}), ("b", {})])
+    journal.close()
+    with open(path, "ab") as f:
+        f.write(b'{"seq":3,"op":"c","li')
+    journal = Journal(path)
+    assert [e["op"] for e in journal.read()] == ["a", "b"]
+    # the partial record is gone, so the next append starts on a fresh line
+    journal.open(2)
+    journal.append("d", {})
+    assert [e["op"] for e in journal.read()] == ["a", "b", "d"]
+
+
+def test_garbage_line_ends_the_log(tmp_path):
+    path = tmp_path / "j"
+    path.write_bytes(b'{"seq":1,"op":"a"}\nnot json\n{"seq":3,"op":"c"}\n')
+    assert [e["seq"] for e in Journal(path).read()] == [1]
+    assert path.read_bytes() == b'{"seq":1,"op":"a"}\n'
+
+
+def test_truncate_through_keeps_newer_entries(tmp_path):
+    journal = Journal(tmp_path / "j")
+    journal.open(0)
+    journal.append_many([(op, {}) for op in "abcd"])
+    journal.truncate_through(2)
+    assert [e["seq"] for e in journal.read()] == [3, 4]
+    assert journal.pending == 2
+    journal.append("e", {})
+    assert journal.read()[-1] == {"seq": 5, "op": "e"}
+
+
+def test_encode_then_write_in_order(tmp_path):
+    journal = Journal(tmp_path / "j")
+    journal.open(10)
+    first = journal.encode([("a", {})])
+    second = journal.encode([("b", {})])
+    journal.write(first + second)
+    assert [json.loads(l)["seq"] for l in first + second] == [11, 12]
+    assert [e["seq"] for e in journal.read()] == [11, 12]
+
+
+def _library(store):
+    state = store.AppState()
+    for i in range(1, 6):
+        link = make_link(i, f"song {i}")
+        state.index.add(link)
+    state.next_id = 6
+    return state
+
+
+def test_replay_after_crash_restores_every_kind_of_edit(store, monkeypatch):
+    monkeypatch.setattr(store, "SNAPSHOT_FORMAT", "json")
+    state = _library(store)
+    store.save_state(state)
+
+    link = state.index.get(2)
+    state.index.set_tags(link, ["keep"])
+    store.record(state, "tags_updated", id=2, fields={"tags": ["keep"]})
+    link = state.index.get(3)
+    state.index.set_categories(link, ["Music"], primary="Music")
+    store.record(state, "category_changed", id=3, fields=link.to_dict({"categories", "primary_category"}))
+    state.index.remove(4)
+    store.record(state, "link_deleted", id=4)
+    new = make_link(6, "song 6", categories=("Music",))
+    state.index.add(new)
+    state.next_id = 7
+    store.record(state, "link_added", link=new.to_dict())
+    # added and deleted again after the snapshot: must not come back
+    gone = make_link(7)
+    store.record(state, "link_added", link=gone.to_dict())
+    store.record(state, "link_deleted", id=7)
+    state.categories.append("Music")
+    store.record(state, "categories_updated", categories=list(state.categories))
+    crash(store)
+
+    loaded = store.load_state()
+    assert [l.id for l in loaded.index.ordered()] == [6, 5, 3, 2, 1]
+    assert list(loaded.index.get(2).tags) == ["keep"]
+    assert loaded.index.get(3).primary_category == "Music"
+    assert loaded.index.ids_in_category("Music") == {3, 6}
+    assert loaded.next_id == 8
+    assert loaded.categories == ["Unsorted", "Music"]
+
+
+@pytest.mark.parametrize("fmt", ["binary", "json"])
+def test_snapshot_encoded_after_later_edits(store, monkeypatch, fmt):
+    """Compaction captures on the loop and encodes on a thread; edits in between must not corrupt it."""
+    monkeypatch.setattr(store, "SNAPSHOT_FORMAT", fmt)
+    state = _library(store)
+    store.save_state(state)
+    snap = store.snapshot(state)
+
+    link = state.index.get(1)
+    link.title, link.metadata_status = "meta 1", "done"
+    store.record(state, "metadata_merged", id=1, fields={"title": "meta 1", "metadata_status": "done"})
+    state.index.set_tags(state.index.get(2), ["late"])
+    store.record(state, "tags_updated", id=2, fields={"tags": ["late"]})
+    state.index.remove(3)
+    store.record(state, "link_deleted", id=3)
+    new = make_link(6)
+    state.index.add(new)
+    state.next_id = 7
+    store.record(state, "link_added", link=new.to_dict())
+    store.save_snapshot(snap)
+    assert [e["op"] for e in store.journal.read()] == ["metadata_merged", "tags_updated", "link_deleted", "link_added"]
+    crash(store)
+
+    loaded = store.load_state()
+    assert [l.id for l in loaded.index.ordered()] == [6, 5, 4, 2, 1]
+    assert (loaded.index.get(1).title, loaded.index.get(1).metadata_status) == ("meta 1", "done")
+    assert list(loaded.index.get(2).tags) == ["late"]
+    assert loaded.next_id == 7
+
+
+def test_snapshot_folds_the_journal(store, monkeypatch):
+    monkeypatch.setattr(store, "SNAPSHOT_FORMAT", "json")
+    state = _library(store)
+    store.record(state, "tags_updated", id=1, fields={"tags": ["x"]})
+    state.index.set_tags(state.index.get(1), ["x"])
+    store.save_state(state)
+    assert store.journal.read() == []
+    crash(store)
+    assert list(store.load_state().index.get(1).tags) == ["x"]
+
+
+def test_fetching_status_is_reset_on_load(store, monkeypatch):
+    monkeypatch.setattr(store, "SNAPSHOT_FORMAT", "json")
+    state = _library(store)
+    state.index.get(1).metadata_status = "fetching"
+    store.save_state(state)
+    crash(store)
+    assert store.load_state().index.get(1).metadata_status == "pending"
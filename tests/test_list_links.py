@@ -0,0 +1,69 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from backend.index import LinkIndex
+from backend.ordering import encode_cursor
+
+from .conftest import make_link
+
+
+@pytest.fixture
+def library(main, monkeypatch):
+    """main with a 60-link library: every 3rd tagged "live", every 4th a short, every 5th done."""
+    index = LinkIndex()
+    index.rebuild(
+        make_link(
+            i,
+            f"song {i:02d}",
+            categories=("Music",) if i % 2 else ("Talks",),
+            tags=["live"] if i % 3 == 0 else [],
+            video_type="short" if i % 4 == 0 else "video",
+            metadata_status="done" if i % 5 == 0 else "pending",
+            duration_seconds=i * 10,
+            created_at=datetime(2026, 1, 1) + timedelta(minutes=i),
+        )
+        for i in range(60, 0, -1)
+    )
+    monkeypatch.setitem(main.state.__pydantic_private__, "_index", index)
+    return main
+
+
+def _all(main, **params):
+    """Every page of a listing, following next_cursor."""
+    ids, cursor, totals = [], None, set()
+    while True:
+        page = asyncio.run(main.list_links(limit=4, cursor=cursor, **params))
+        ids += [item.id for item in page["items"]]
+        totals.add(page["total"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids, totals
+
+
+@pytest.mark.parametrize("ratio", [0, 1000])  # walk the sorted list / sort only the matches
+def test_filters_use_the_indexes_and_count_exactly(library, monkeypatch, ratio):
+    monkeypatch.setattr(library, "FILTER_WALK_RATIO", ratio)
+    ids, totals = _all(library, tag="live", category="Music")
+    expected = [i for i in range(60, 0, -1) if i % 3 == 0 and i % 2]
+    assert ids == expected and totals == {len(expected)}
+
+    ids, totals = _all(library, video_type="short", metadata_status="done", sort="duration_seconds", order="asc")
+    assert ids == [20, 40, 60] and totals == {3}
+
+    ids, totals = _all(library, tag="nothing")
+    assert ids == [] and totals == {0}
+
+
+def test_unfiltered_total_is_the_scope_size(library):
+    page = asyncio.run(library.list_links(category="Talks", limit=5))
+    assert page["total"] == 30 and [item.id for item in page["items"]] == [60, 58, 56, 54, 52]
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", encode_cursor((0, "60", 60)), encode_cursor((0, [1], 2))])
+def test_bad_cursor_is_a_400(library, cursor):
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(library.list_links(sort="created_at", cursor=cursor))
+    assert raised.value.status_code == 400
@@ -0,0 +1,61 @@
+import time
+
+from backend import metadata_cache as mc
+from backend.metadata_cache import MetadataCache
+
+META = {"title": "Song", "author": "Band", "thumbnail_url": "https://i.ytimg.com/vi/x/hq.jpg"}
+
+
+def _last_access(cache, video_id):
+    return cache.conn.execute("SELECT last_access FROM metadata_cache WHERE video_id = ?", (video_id,)).fetchone()[0]
+
+
+def test_lookup_many_matches_lookup(tmp_path):
+    cache = MetadataCache(tmp_path / "c.db")
+    cache.put("aaaaaaaaaaa", META)
+    cache.put("bbbbbbbbbbb", {})  # negative
+    ids = ["aaaaaaaaaaa", "bbbbbbbbbbb", "ccccccccccc", None, "aaaaaaaaaaa"]
+    batch = cache.lookup_many(ids)
+    assert batch == {
+        "aaaaaaaaaaa": ("hit", META),
+        "bbbbbbbbbbb": ("negative", None),
+        "ccccccccccc": ("miss", None),
+    }
+    assert all(cache.lookup(v) == r for v, r in batch.items())
+    cache.close()
+
+
+def test_lookup_many_spans_several_queries(tmp_path, monkeypatch):
+    monkeypatch.setattr(mc, "LOOKUP_BATCH", 3)
+    cache = MetadataCache(tmp_path / "c.db")
+    ids = [f"{i:011d}" for i in range(8)]
+    for vid in ids[::2]:
+        cache.put(vid, META)
+    batch = cache.lookup_many(ids)
+    assert [batch[v][0] for v in ids] == ["hit", "miss"] * 4
+    cache.close()
+
+
+def test_access_times_are_written_on_flush(tmp_path):
+    cache = MetadataCache(tmp_path / "c.db")
+    cache.put("aaaaaaaaaaa", META)
+    before = _last_access(cache, "aaaaaaaaaaa")
+    time.sleep(0.01)
+    cache.lookup_many(["aaaaaaaaaaa"])
+    assert _last_access(cache, "aaaaaaaaaaa") == before
+    cache.flush_touches()
+    assert _last_access(cache, "aaaaaaaaaaa") > before
+    cache.close()
+
+
+def test_eviction_sees_pending_access_times(tmp_path):
+    cache = MetadataCache(tmp_path / "c.db", max_entries=20)
+    ids = [f"{i:011d}" for i in range(20)]
+    for vid in ids:
+        cache.put(vid, META)
+        time.sleep(0.001)
+    cache.lookup(ids[0])  # now the most recently used, not yet written
+    cache.put("x" * 11, META)  # evicts the two least recently used
+    assert cache.lookup(ids[0])[0] == "hit"
+    assert [cache.lookup(v)[0] for v in ids[1:4]] == ["miss", "miss", "hit"]
+    cache.close()
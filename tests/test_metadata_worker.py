@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from backend.jobs import JobTable
+from backend.ratelimit import RateLimiter
+
+from .conftest import make_link
+
+
+@pytest.fixture
+def pipeline(main, monkeypatch):
+    """The metadata worker with a fresh queue and no cache, network or thumbnails."""
+    monkeypatch.setattr(main.state, "_jobs", JobTable())
+    monkeypatch.setattr(main, "rate_limiter", RateLimiter(100, 1000))
+    monkeypatch.setattr(main.metadata_cache, "lookup", lambda vid: ("miss", None))
+    monkeypatch.setattr(main.metadata_cache, "put", lambda vid, meta: None)
+    monkeypatch.setattr(main, "_prefetch_images", lambda link: None)
+    return main
+
+
+def test_link_deleted_mid_fetch_stays_deleted(pipeline, monkeypatch):
+    main = pipeline
+
+    async def run():
+        started, release = asyncio.Event(), asyncio.Event()
+
+        async def fetch(original_url, normalized_url):
+            started.set()
+            await release.wait()
+            return {"title": "Resurrected song", "author": "Nobody", "duration_seconds": 200}
+
+        monkeypatch.setattr(main, "get_metadata_for_video_async", fetch)
+        url = "https://www.youtube.com/watch?v=Zz9Yy8Xx7Ww"
+        _, link = main._ingest(main.normalize_youtube_url(url), url, "Racy", None, False, [])
+        worker = asyncio.create_task(main.metadata_worker(0))
+        await asyncio.wait_for(started.wait(), 5)
+        await main.delete_link(link.id)
+        release.set()
+        for _ in range(20):
+            await asyncio.sleep(0)
+        worker.cancel()
+        return link
+
+    link = asyncio.run(run())
+    index = main.state.index
+    assert index.get(link.id) is None
+    assert main.state.jobs.get(link.id) is None
+    assert asyncio.run(main.advanced_search(q="resurrected")) == {"results": [], "count": 0}
+    assert index.stats.get("Racy") is None or index.stats.get("Racy").as_dict()["count"] == 0
+    assert link.id not in index.order.entries
+    assert link.title is None
+
+
+def test_search_skips_ids_that_no_longer_resolve(main, monkeypatch):
+    monkeypatch.setattr(main.state.index.text, "search", lambda q, allowed=None, limit=50, offset=0: ([999_999], 1))
+    assert asyncio.run(main.advanced_search(q="anything"))["results"] == []
+
+
+def test_near_duplicate_is_published_when_metadata_lands(pipeline, monkeypatch):
+    main = pipeline
+    known = make_link(900_001, "Daft Punk - Around the World (Official Video)", author="Daft Punk", duration_seconds=240)
+    main.state.index.add(known)
+
+    async def fetch(original_url, normalized_url):
+        return {"title": "Daft Punk - Around The World (Lyrics)", "author": "DaftPunkVEVO", "duration_seconds": 236}
+
+    monkeypatch.setattr(main, "get_metadata_for_video_async", fetch)
+    url = "https://www.youtube.com/watch?v=Qq1Ww2Ee3Rr"
+    _, link = main._ingest(main.normalize_youtube_url(url), url, "Music", None, False, [])
+    since = main.state.changes.rev
+
+    async def run():
+        worker = asyncio.create_task(main.metadata_worker(0))
+        for _ in range(500):  # the cache lookup runs in a thread
+            if link.metadata_status == "done":
+                break
+            await asyncio.sleep(0.01)
+        worker.cancel()
+
+    asyncio.run(run())
+    try:
+        delta = main._delta(since)
+        assert [m["id"] for m in delta["similar"][link.id]] == [known.id]
+        assert delta["similar"][link.id][0]["title"] == known.title
+    finally:
+        main.state.index.remove(link.id)
+        main.state.index.remove(known.id)
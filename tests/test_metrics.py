@@ -0,0 +1,144 @@
+import asyncio
+import threading
+
+import pytest
+
+from backend import metrics
+from backend.metrics import Counter, Gauge, Histogram, Metric, Registry, RequestMetrics, sample_profile
+
+
+def test_metric_subclasses_must_render_and_summarize():
+    with pytest.raises(TypeError):
+        Metric("m", "help")
+
+    class Partial(Metric):
+        def samples(self):
+            return []
+
+    with pytest.raises(TypeError):
+        Partial("m", "help")
+
+
+def test_counter_renders_labelled_series():
+    counter = Counter("requests_total", "Requests.", ("route", "status"))
+    counter.inc(route="/a", status="200")
+    counter.inc(2, route="/a", status="200")
+    counter.inc(route='/b"\n', status="500")
+    assert counter.render() == [
+        "# HELP requests_total Requests.",
+        "# TYPE requests_total counter",
+        'requests_total{route="/a",status="200"} 3',
+        'requests_total{route="/b\\"\\n",status="500"} 1',
+    ]
+    assert counter.summary() == {"/a|200": 3, '/b"\n|500': 1}
+    bare = Counter("total", "Unlabelled.")
+    bare.inc(0.5)
+    assert bare.samples() == ["total 0.5"] and bare.summary() == {"total": 0.5}
+
+
+def test_gauge_reads_at_scrape_time():
+    values = {("a",): 1, ("b",): 2}
+    gauge = Gauge("depth", "Depth.", lambda: values, ("queue",))
+    assert gauge.samples() == ['depth{queue="a"} 1', 'depth{queue="b"} 2']
+    values[("a",)] = 5
+    assert gauge.summary() == {"a": 5, "b": 2}
+    assert Gauge("n", "N.", lambda: 7).samples() == ["n 7"]
+    assert Gauge("broken", "Raises.", lambda: 1 / 0).samples() == []  # a scrape never fails on one gauge
+
+
+def test_histogram_buckets_are_cumulative():
+    hist = Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.1, 0.5, 3.0):
+        hist.observe(seconds, route="/a")
+    assert hist.samples() == [
+        'latency_seconds_bucket{route="/a",le="0.1"} 2',
+        'latency_seconds_bucket{route="/a",le="1.0"} 3',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4',
+        'latency_seconds_count{route="/a"} 4',
+        'latency_seconds_sum{route="/a"} 3.65',
+    ]
+    assert hist.summary() == {"/a": {"count": 4, "avg_ms": 912.5, "p50_ms": 100.0, "p95_ms": None, "p99_ms": None}}
+
+
+def test_histogram_timer():
+    hist = Histogram("t", "Timed.")
+    with hist.time():
+        pass
+    assert hist.series[()][0] == 1 and hist.summary()["all"]["count"] == 1
+
+
+def test_registry_renders_everything_and_keeps_the_first_instance():
+    registry = Registry()
+    first = registry.counter("c_total", "C.")
+    assert registry.counter("c_total", "C again.") is first
+    gauge = registry.gauge("g", "G.", lambda: 1)
+    assert registry.gauge("g", "G.", lambda: 2) is gauge and gauge.samples() == ["g 2"]
+    registry.histogram("h_seconds", "H.", buckets=(1.0,)).observe(0.5)
+    first.inc()
+    assert registry.render() == "\n".join(
+        [
+            "# HELP c_total C.",
+            "# TYPE c_total counter",
+            "c_total 1",
+            "# HELP g G.",
+            "# TYPE g gauge",
+            "g 2",
+            "# HELP h_seconds H.",
+            "# TYPE h_seconds histogram",
+            'h_seconds_bucket{le="1.0"} 1',
+            'h_seconds_bucket{le="+Inf"} 1',
+            "h_seconds_count 1",
+            "h_seconds_sum 0.5",
+        ]
+    ) + "\n"
+    assert registry.summary()["c_total"] == {"total": 1}
+
+
+def test_request_metrics_label_by_route_and_count_failures(monkeypatch):
+    requests = Counter("requests_total", "Requests.", ("route", "method", "status"))
+    monkeypatch.setattr(metrics, "http_requests", requests)
+    monkeypatch.setattr(metrics, "http_latency", Histogram("latency", "Latency.", ("route", "method")))
+
+    async def ok(scope, receive, send):
+        scope["route"] = type("Route", (), {"path": "/api/links/{id}"})()
+        await send({"type": "http.response.start", "status": 204})
+
+    async def broken(scope, receive, send):
+        raise RuntimeError("boom")
+
+    async def send(message):
+        pass
+
+    asyncio.run(RequestMetrics(ok)({"type": "http", "method": "GET"}, None, send))
+    with pytest.raises(RuntimeError):
+        asyncio.run(RequestMetrics(broken)({"type": "http", "method": "POST"}, None, send))
+    assert requests.summary() == {"/api/links/{id}|GET|204": 1, "unmatched|POST|500": 1}
+
+
+def _parked(ready, release):
+    ready.set()
+    release.wait(5)
+
+
+def test_sampling_profiler_collapses_thread_stacks():
+    ready, release = threading.Event(), threading.Event()
+    worker = threading.Thread(target=_parked, args=(ready, release), name="parked-worker")
+    worker.start()
+    ready.wait(5)
+    try:
+        text, samples = sample_profile(0.2, interval=0.005)
+    finally:
+        release.set()
+        worker.join(5)
+    assert samples >= 1
+    parked = [line for line in text.splitlines() if line.startswith("parked-worker;")]
+    assert len(parked) >= 1
+    stack, count = parked[0].rsplit(" ", 1)
+    assert "_parked (test_metrics.py:" in stack and int(count) >= 1
+    assert "sample_profile" not in text  # the sampling thread leaves itself out
+
+
+def test_one_profile_at_a_time():
+    with metrics._profile_lock:
+        with pytest.raises(RuntimeError):
+            sample_profile(0.01)
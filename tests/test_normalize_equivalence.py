@@ -0,0 +1,110 @@
+"""
+Fast-path URL normalizer vs the urllib parser it replaces: identical output
+on every URL in Playlists/links.json and backend/data/*.json, plus variants
+of each the way links show up in the wild. The timings need pytest-benchmark
+(`pytest tests/test_normalize_equivalence.py --benchmark-only`).
+"""
+import json
+import random
+from pathlib import Path
+from typing import List
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from backend.youtube_utils import (
+    _normalize_slow,
+    extract_video_id_from_normalized_url,
+    normalize_many,
+    normalize_youtube_url,
+)
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def load_corpus() -> List[str]:
+    urls: List[str] = []
+    playlists = ROOT / "Playlists" / "links.json"
+    if playlists.exists():
+        for group in json.loads(playlists.read_text(encoding="utf-8")).values():
+            urls.extend(group)
+    for path in sorted((ROOT / "backend" / "data").glob("*.json")):
+        data = json.loads(path.read_text(encoding="utf-8"))
+        for link in data.get("links", []):
+            urls.extend(u for u in (link.get("original_url"), link.get("normalized_url")) if u)
+    return urls
+
+
+def variants(url: str, rng: random.Random) -> List[str]:
+    vid = extract_video_id_from_normalized_url(normalize_youtube_url(url) or "") or "dQw4w9WgXcQ"
+    return [
+        url,
+        f"  {url}  ",
+        url.replace("https://", "http://"),
+        url.replace("www.youtube.com", "M.YouTube.com"),
+        url + "#comments",
+        url + ("&" if "?" in url else "?") + f"t={rng.randint(1, 900)}s",
+        url + ("&" if "?" in url else "?") + "t=&si=abc%3D",
+        f"https://youtu.be/{vid}?si=xyz&t={rng.randint(1, 90)}",
+        f"https://www.youtube.com/watch?t=42&feature=share&v={vid}",
+        f"https://www.youtube.com/watch?v={vid}&v=other",
+        f"https://youtube.com/shorts/{vid}?feature=share",
+        f"https://youtube.com/shorts/{vid}/?v=override",
+        f"https://www.youtube.com/embed/{vid}?start=10",
+        f"https://www.youtube-nocookie.com/embed/{vid}",
+        "https://www.youtube.com/embed/videoseries?list=PL123",
+        f"https://www.youtube.com/live/{vid}?feature=shared",
+        f"https://www.youtube.com/v/{vid}&hl=en_US",
+        f"https://music.youtube.com/watch?v={vid}&list=RD{vid}",
+        f"https://www.youtube.com/watch?v=%20{vid}",
+        f"https://www.youtube.com/watch?v={vid}&t=1%3A30",
+        f"https://www.youtube.com:443/watch?v={vid}",
+        f"https://user@www.youtube.com/watch?v={vid}",
+        f"https://www.youtube.com/watch?%76={vid}",
+        f"https://www.youtube.com/watch;x?v={vid}",
+        "https://www.youtube.com/@channel",
+        f"https://example.com/watch?v={vid}",
+        f"ftp://www.youtube.com/watch?v={vid}",
+        f"www.youtube.com/watch?v={vid}",
+    ]
+
+
+@pytest.fixture(scope="module")
+def base() -> List[str]:
+    return load_corpus()
+
+
+@pytest.fixture(scope="module")
+def corpus(base) -> List[str]:
+    rng = random.Random(7)
+    return [v for url in base for v in variants(url, rng)]
+
+
+def test_fast_path_matches_urllib(corpus):
+    mismatches = [(u, normalize_youtube_url(u), _normalize_slow(u)) for u in corpus
+                  if normalize_youtube_url(u) != _normalize_slow(u)]
+    assert not mismatches, mismatches[:20]
+
+
+def test_video_id_matches_query_parse(corpus):
+    for n in filter(None, map(_normalize_slow, corpus)):
+        vals = parse_qs(urlparse(n).query).get("v")
+        assert extract_video_id_from_normalized_url(n) == (vals[0] if vals else None), n
+
+
+def test_normalize_many_finds_every_pasted_link(base):
+    pasted = "Some links:\n" + "\n".join(f"- {u}, see" for u in base)
+    found = normalize_many(pasted)
+    assert [raw for raw, _ in found] == base
+    assert [norm for _, norm in found] == [normalize_youtube_url(u) for u in base]
+
+
+# The variants deliberately include many inputs that fall back to the slow parser.
+@pytest.mark.parametrize("fn", [_normalize_slow, normalize_youtube_url], ids=["urllib", "fast"])
+def test_bench_normalize(benchmark, corpus, fn):
+    benchmark(lambda: [fn(u) for u in corpus])
+
+
+def test_bench_normalize_many(benchmark, base):
+    pasted = "Some links:\n" + "\n".join(f"- {u}, see" for u in base)
+    benchmark(normalize_many, pasted)
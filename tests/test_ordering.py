@@ -0,0 +1,132 @@
+import pytest
+
+from backend import records
+from backend.index import LinkIndex
+from backend.ordering import SortedLinks, decode_cursor, encode_cursor
+
+from .conftest import make_link
+
+
+def _pages(order, key, size, scope="", descending=False):
+    """Walk a list page by page through encoded cursors, as GET /api/links does."""
+    pages, after = [], None
+    while True:
+        page = []
+        for entry in order.walk(key, scope=scope, descending=descending, after=after):
+            page.append(entry)
+            if len(page) == size:
+                break
+        if not page:
+            return pages
+        pages.append([entry[2] for entry in page])
+        after = decode_cursor(encode_cursor(page[-1]))
+
+
+def _library():
+    order = SortedLinks()
+    durations = [30, None, 10, 20, None, 10, 40]
+    for i, seconds in enumerate(durations, start=1):
+        order.add(make_link(i, categories=("Music",) if i % 2 else ("Talks",), duration_seconds=seconds))
+    return order
+
+
+def test_cursor_pages_ascending_put_missing_last():
+    order = _library()
+    # ties on the value are broken by id
+    assert _pages(order, "duration_seconds", 3) == [[3, 6, 4], [1, 7, 2], [5]]
+
+
+def test_cursor_pages_descending_put_missing_last():
+    order = _library()
+    assert _pages(order, "duration_seconds", 2, descending=True) == [[7, 1], [4, 6], [3, 5], [2]]
+    # resuming inside the missing run
+    assert _pages(order, "duration_seconds", 1, descending=True)[-2:] == [[5], [2]]
+
+
+def test_category_scopes():
+    order = _library()
+    assert _pages(order, "duration_seconds", 10, scope="Music") == [[3, 1, 7, 5]]
+    assert _pages(order, "duration_seconds", 10, scope="Talks", descending=True) == [[4, 6, 2]]
+    assert order.size() == 7 and order.size("Talks") == 3
+    assert order.last("duration_seconds", "Talks")[2] == 4
+
+
+def test_add_many_matches_add():
+    links = [make_link(i, title=f"t{i % 3}", duration_seconds=i % 4 or None) for i in range(1, 30)]
+    one, many = SortedLinks(), SortedLinks()
+    for link in links:
+        one.add(link)
+    many.add_many(links)
+    assert one.lists == many.lists
+
+
+def test_update_and_remove():
+    order = _library()
+    link = make_link(2, categories=("Talks",), duration_seconds=5)
+    order.update(link)
+    assert _pages(order, "duration_seconds", 10) == [[2, 3, 6, 4, 1, 7, 5]]
+    order.update(make_link(2, categories=("Music",), duration_seconds=5), old_categories=["Talks"])
+    assert _pages(order, "duration_seconds", 10, scope="Talks") == [[6, 4]]
+    assert _pages(order, "duration_seconds", 10, scope="Music")[0][0] == 2
+    order.remove(make_link(5, categories=("Music",)))
+    assert 5 not in _pages(order, "duration_seconds", 10)[0]
+    # a cursor at a removed entry still resumes at the right place
+    after = (0, 20, 4)
+    order.remove(make_link(4, categories=("Talks",), duration_seconds=20))
+    assert [e[2] for e in order.walk("duration_seconds", after=after)] == [1, 7]
+
+
+def test_walk_ids_matches_a_filtered_walk():
+    order = _library()
+    ids = {1, 2, 4, 5, 7}
+    for descending in (False, True):
+        full = [e for e in order.walk("duration_seconds", descending=descending) if e[2] in ids]
+        assert list(order.walk_ids("duration_seconds", ids, descending=descending)) == full
+        for after in full:
+            rest = [e for e in order.walk("duration_seconds", descending=descending, after=after) if e[2] in ids]
+            assert list(order.walk_ids("duration_seconds", ids, descending=descending, after=after)) == rest
+
+
+@pytest.mark.parametrize(
+    "key, entry",
+    [
+        ("created_at", (0, "1700000000", 3)),
+        ("title", (0, 12, 3)),
+        ("duration_seconds", (0, True, 3)),  # a bool would compare as an int
+        ("title", (1, 5, 3)),
+        ("title", (2, 0, 3)),
+    ],
+)
+def test_cursor_of_another_sort_is_rejected(key, entry):
+    cursor = encode_cursor(entry)
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, key)
+    assert decode_cursor(encode_cursor((0, "abc", 3)), "title") == (0, "abc", 3)
+    assert decode_cursor(encode_cursor((1, 0, 3)), "title") == (1, 0, 3)
+
+
+def test_status_and_video_type_tables_follow_changes():
+    index = LinkIndex()
+    index.rebuild([make_link(2, video_type="short"), make_link(1)])
+    assert index.ids_with_status("pending") == {1, 2}
+    assert index.ids_with_video_type("short") == {2}
+    link = index.get(1)
+    index.set_status(link, "fetching")
+    assert index.ids_with_status("fetching") == {1} and index.ids_with_status("pending") == {2}
+    link.metadata_status, link.video_type = "done", "video"
+    index.refresh(link)
+    assert index.by_status == {"pending": {2}, "done": {1}}
+    assert index.by_video_type == {"short": {2}, "video": {1}}
+    index.remove(2)
+    assert index.by_status == {"done": {1}} and index.by_video_type == {"video": {1}}
+
+
+def test_shared_tuples_are_bounded(monkeypatch):
+    monkeypatch.setattr(records, "MAX_SHARED_TUPLES", 10)
+    monkeypatch.setattr(records, "_tuples", {})
+    first = records.shared_tuple(["a", "b"])
+    assert records.shared_tuple(["a", "b"]) is first
+    for i in range(25):
+        records.shared_tuple([f"tag{i}"])
+    assert len(records._tuples) <= 10
+    assert records.shared_tuple(["a", "b"]) == first
@@ -0,0 +1,126 @@
+import asyncio
+import types
+
+import pytest
+
+from backend import ratelimit
+from backend.ratelimit import MIN_SCALE, PENALTY_WINDOW, RECOVERY_STEP, RateLimiter, TokenBucket
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    A settable clock in place of time.monotonic() inside backend.ratelimit.
+    A wait that times out moves the clock instead of sleeping; `waits`
+    records how long each one was.
+    """
+    clock = types.SimpleNamespace(now=1000.0, waits=[])
+
+    async def wait_for(awaitable, timeout):
+        awaitable.close()
+        clock.waits.append(round(timeout, 6))
+        clock.now += timeout + 1e-9  # real time always ends a little past the deadline
+        raise asyncio.TimeoutError
+
+    monkeypatch.setattr(ratelimit, "time", types.SimpleNamespace(monotonic=lambda: clock.now))
+    monkeypatch.setattr(
+        ratelimit,
+        "asyncio",
+        types.SimpleNamespace(Lock=asyncio.Lock, Event=asyncio.Event, TimeoutError=asyncio.TimeoutError, wait_for=wait_for),
+    )
+    return clock
+
+
+def _acquire(limiter, n):
+    async def run():
+        for _ in range(n):
+            await limiter.acquire()
+
+    asyncio.run(run())
+
+
+def test_bucket_refills_continuously_up_to_capacity(clock):
+    bucket = TokenBucket(rate=2, capacity=4)
+    bucket.tokens = 0
+    assert bucket.wait_time() == 0.5
+    clock.now += 0.25
+    bucket.refill(clock.now)
+    assert bucket.tokens == 0.5 and bucket.wait_time() == 0.25
+    clock.now += 60
+    bucket.refill(clock.now)
+    assert bucket.tokens == 4 and bucket.wait_time() == 0
+
+
+def test_burst_then_paced_by_the_tighter_bucket(clock):
+    limiter = RateLimiter(per_second=5, per_minute=600)
+    _acquire(limiter, 5)
+    assert clock.waits == []  # a full second's worth goes out at once
+    _acquire(limiter, 3)
+    assert clock.waits == [0.2, 0.2, 0.2]
+
+    clock.waits.clear()
+    limiter = RateLimiter(per_second=100, per_minute=3)
+    _acquire(limiter, 4)
+    assert clock.waits == [20.0]  # the minute bucket refills one token per 20 s
+    assert limiter.acquired == 4 and round(limiter.waited, 6) == 20.0
+
+
+def test_penalize_halves_once_per_window_and_reward_recovers(clock):
+    limiter = RateLimiter(per_second=10, per_minute=600)
+    limiter.penalize()
+    assert limiter.scale == 0.5 and limiter.second.rate == 5 and limiter.minute.capacity == 300
+    limiter.penalize()  # the same burst of 429s
+    assert limiter.scale == 0.5
+    for _ in range(10):
+        clock.now += PENALTY_WINDOW
+        limiter.penalize()
+    assert limiter.scale == MIN_SCALE and limiter.second.rate == 1.0
+
+    steps = 0
+    while limiter.scale < 1.0:
+        limiter.reward()
+        steps += 1
+    assert steps == round((1.0 - MIN_SCALE) / RECOVERY_STEP)
+    assert limiter.second.rate == 10 and limiter.minute.rate == 10
+    limiter.reward()
+    assert limiter.scale == 1.0
+
+
+def test_shrinking_clamps_tokens_and_paces_at_the_new_rate(clock):
+    limiter = RateLimiter(per_second=10, per_minute=600)
+    assert limiter.spare() == 10
+    limiter.penalize()
+    assert limiter.second.tokens == 5  # no burst above the reduced capacity
+    _acquire(limiter, 6)
+    assert clock.waits == [0.2]
+
+
+def test_configure_applies_new_limits_at_once(clock):
+    limiter = RateLimiter(per_second=2, per_minute=600)
+    limiter.configure(1, 30)
+    assert limiter.second.capacity == 1 and limiter.second.tokens == 1
+    assert limiter.minute.rate == 0.5 and limiter.minute.tokens == 30
+    limiter.configure(0, 0)  # floored at one per period
+    assert limiter.limits == (1, 1)
+    limiter.configure(4, 600)
+    assert limiter.second.tokens == 1  # raising a limit does not hand out a burst
+    clock.now += 1
+    assert limiter.spare() == 4  # both refill at the new rates
+
+
+def test_reload_wakes_a_waiting_caller(clock, monkeypatch):
+    # a real wait here, so the wake-up has to come from configure()
+    monkeypatch.setattr(ratelimit.asyncio, "wait_for", asyncio.wait_for)
+    limiter = RateLimiter(per_second=1, per_minute=600)
+
+    async def run():
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.waiting == 1 and limiter.spare() == 0
+        clock.now += 1  # time passes, but the waiter sleeps for up to 1 s of real time
+        limiter.configure(1, 600)
+        await asyncio.wait_for(waiter, 0.5)
+
+    asyncio.run(run())
+    assert limiter.acquired == 2 and limiter.waiting == 0
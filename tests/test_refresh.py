@@ -0,0 +1,107 @@
+import types
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend import refresh
+from backend.index import LinkIndex
+from backend.records import to_ms
+from backend.refresh import MAX_CREDIT, RefreshScheduler
+
+from .conftest import make_link
+
+NOW = datetime(2026, 6, 1)
+DAY = 86400.0
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A settable clock in place of time.time() inside backend.refresh."""
+    clock = types.SimpleNamespace(now=to_ms(NOW) / 1000)
+    monkeypatch.setattr(refresh, "time", types.SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+
+def _library(*links):
+    index = LinkIndex()
+    index.rebuild(sorted(links, key=lambda l: -l.id))
+    scheduler = RefreshScheduler()
+    scheduler.load(index.links())
+    return index, scheduler
+
+
+def _ids(links):
+    return [l.id for l in links]
+
+
+def _aged(link_id, days, status="done", **fields):
+    """A link last refreshed `days` before NOW."""
+    return make_link(link_id, metadata_status=status, last_refreshed=NOW - timedelta(days=days), **fields)
+
+
+def test_backlog_goes_first_and_skips_links_already_handled(clock):
+    index, scheduler = _library(
+        make_link(1, metadata_status="pending"),
+        make_link(2, metadata_status="failed"),
+        make_link(3, metadata_status="pending"),
+        _aged(4, 90),
+    )
+    index.set_status(index.get(3), "done")  # fetched meanwhile
+    backlog, stale = scheduler.take(index, budget=2, max_age=30 * DAY, elapsed=30 * DAY)
+    assert _ids(backlog) == [1, 2] and stale == []  # the budget went to the backlog
+    backlog, stale = scheduler.take(index, budget=5, max_age=30 * DAY, elapsed=0)
+    assert backlog == [] and _ids(stale) == [4]
+    assert scheduler.counters == {"backlog_queued": 2, "refresh_queued": 1}
+
+
+def test_oldest_first_and_only_past_the_max_age(clock):
+    index, scheduler = _library(_aged(1, 10), _aged(2, 45), _aged(3, 31), _aged(4, 60, status="fetching"))
+    _, stale = scheduler.take(index, budget=10, max_age=30 * DAY, elapsed=30 * DAY)
+    # 4 is already being fetched; 1 is fresh enough
+    assert _ids(stale) == [2, 3]
+    assert scheduler.take(index, budget=10, max_age=30 * DAY, elapsed=30 * DAY)[1] == []
+
+
+def test_never_refreshed_links_age_from_creation(clock):
+    index, scheduler = _library(
+        make_link(1, metadata_status="done", created_at=NOW - timedelta(days=40)),
+        make_link(2, metadata_status="done", created_at=NOW - timedelta(days=5)),
+    )
+    assert _ids(scheduler.take(index, budget=10, max_age=30 * DAY, elapsed=30 * DAY)[1]) == [1]
+
+
+def test_credit_paces_the_library_over_the_max_age(clock):
+    index, scheduler = _library(*(_aged(i, 100 + i) for i in range(1, 31)))
+    # 30 links over 30 days: one link's worth of credit per day
+    taken = []
+    for _ in range(3):
+        taken += scheduler.take(index, budget=10, max_age=30 * DAY, elapsed=DAY / 2)[1]
+    assert _ids(taken) == [30]
+    assert scheduler.credit == pytest.approx(0.5)
+
+    # a long idle stretch only builds up MAX_CREDIT
+    _, stale = scheduler.take(index, budget=100, max_age=30 * DAY, elapsed=100 * DAY)
+    assert len(stale) == MAX_CREDIT and _ids(stale) == list(range(29, 29 - int(MAX_CREDIT), -1))
+    # the budget (spare rate-limit capacity) caps it too
+    scheduler.credit = MAX_CREDIT
+    assert len(scheduler.take(index, budget=3, max_age=30 * DAY, elapsed=0)[1]) == 3
+
+
+def test_refresh_off(clock):
+    index, scheduler = _library(_aged(1, 400))
+    assert scheduler.take(index, budget=10, max_age=0, elapsed=DAY) == ([], [])
+    assert scheduler.credit == 0 and scheduler.stats(0)["next_due"] is None
+
+
+def test_refreshed_links_are_rescheduled_and_outdated_entries_skipped(clock):
+    index, scheduler = _library(_aged(1, 40), _aged(2, 35))
+    link = index.get(1)
+    link.last_refreshed = NOW
+    scheduler.note(link)  # its old heap entry is now outdated
+    index.remove(2)
+    assert scheduler.take(index, budget=10, max_age=30 * DAY, elapsed=30 * DAY)[1] == []
+    assert scheduler.stats(30 * DAY)["next_due"] == (NOW + timedelta(days=30)).isoformat()
+    assert scheduler.stats(30 * DAY)["tracked"] == 1
+
+    clock.now += 31 * DAY
+    assert _ids(scheduler.take(index, budget=10, max_age=30 * DAY, elapsed=30 * DAY)[1]) == [1]
@@ -0,0 +1,122 @@
+import asyncio
+import gzip
+import json
+import types
+
+import pytest
+from starlette.requests import Request
+
+from backend import respcache
+from backend.respcache import ResponseCache, etag_matches, make_etag
+from backend.storage import Config
+
+
+def _request(**headers):
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+def _builder(payload):
+    calls = []
+
+    def build():
+        calls.append(1)
+        return payload
+
+    return build, calls
+
+
+BIG = {"links": [{"id": i, "title": f"song {i}"} for i in range(200)]}
+
+
+def test_same_revision_is_built_once_and_a_new_one_rebuilds():
+    cache = ResponseCache()
+    build, calls = _builder(BIG)
+    first = cache.respond(_request(), ("draft",), 1, build)
+    again = cache.respond(_request(), ("draft",), 1, build)
+    assert len(calls) == 1 and again.body == first.body
+    assert json.loads(first.body) == BIG
+    assert first.headers["etag"] == make_etag(("draft",), 1) and first.headers["vary"] == "Accept-Encoding"
+
+    changed = cache.respond(_request(), ("draft",), 2, build)
+    assert len(calls) == 2 and changed.headers["etag"] != first.headers["etag"]
+    assert cache.stats() == {"hits": 1, "builds": 2, "not_modified": 0, "entries": 1}
+
+
+def test_if_none_match_gets_a_304_without_building():
+    cache = ResponseCache()
+    build, calls = _builder(BIG)
+    etag = cache.respond(_request(), ("config",), 5, build).headers["etag"]
+    not_modified = cache.respond(_request(if_none_match=etag), ("config",), 5, build)
+    assert not_modified.status_code == 304 and not_modified.body == b""
+    assert len(calls) == 1 and cache.counters["not_modified"] == 1
+    # the revision moved on: the client's copy is stale
+    assert cache.respond(_request(if_none_match=etag), ("config",), 6, build).status_code == 200
+
+
+def test_etag_matching():
+    etag = make_etag(("queue", False), 3)
+    gzip_tag = etag[:-1] + '-gzip"'
+    assert etag_matches(etag, etag)
+    assert etag_matches(gzip_tag, etag)  # the encoding suffix is ours, same content
+    assert etag_matches(f'"x", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag) and not etag_matches(make_etag(("queue", False), 4), etag)
+    assert make_etag(("queue", True), 3) != etag
+
+
+def test_gzip_when_accepted_and_worth_it():
+    cache = ResponseCache()
+    build, calls = _builder(BIG)
+    zipped = cache.respond(_request(accept_encoding="gzip, deflate"), ("k",), 1, build)
+    assert zipped.headers["content-encoding"] == "gzip" and zipped.headers["etag"].endswith('-gzip"')
+    assert json.loads(gzip.decompress(zipped.body)) == BIG
+    plain = cache.respond(_request(accept_encoding="identity"), ("k",), 1, build)
+    assert "content-encoding" not in plain.headers and json.loads(plain.body) == BIG
+    assert len(calls) == 1
+
+    small = cache.respond(_request(accept_encoding="gzip"), ("small",), 1, lambda: {"ok": True})
+    assert "content-encoding" not in small.headers  # under MIN_COMPRESS
+
+
+def test_brotli_preferred_only_when_installed(monkeypatch):
+    monkeypatch.setattr(respcache, "brotli", None)
+    cache = ResponseCache()
+    body = cache.get(("k",), 1, lambda: BIG)
+    assert body.encoded("br, gzip")[1] == "gzip"
+    assert body.encoded("br")[1] is None
+
+    compressed = []
+    fake = types.SimpleNamespace(compress=lambda raw, quality: compressed.append(raw) or b"br" + raw)
+    monkeypatch.setattr(respcache, "brotli", fake)
+    content, encoding, etag = body.encoded("gzip;q=0.5, br")
+    assert encoding == "br" and etag.endswith('-br"') and content == b"br" + body.raw
+    body.encoded("br")
+    assert len(compressed) == 1  # each variant is compressed once
+
+
+def test_least_recently_used_entries_are_dropped():
+    cache = ResponseCache(max_entries=2)
+    for key in ("a", "b"):
+        cache.get((key,), 1, lambda: {})
+    cache.get(("a",), 1, lambda: pytest.fail("cached"))
+    cache.get(("c",), 1, lambda: {})
+    assert list(cache.entries) == [("a",), ("c",)]
+
+
+def test_pydantic_models_and_dicts_serialize_alike():
+    config = Config()
+    assert json.loads(respcache.dumps(config)) == json.loads(respcache.dumps(config.model_dump(mode="json")))
+
+
+def test_an_edit_invalidates_the_endpoint(main, monkeypatch):
+    monkeypatch.setattr(main.state, "config", main.state.config.model_copy(deep=True))
+    monkeypatch.setattr(main, "responses", ResponseCache())
+    first = asyncio.run(main.get_config(_request()))
+    etag = first.headers["etag"]
+    assert asyncio.run(main.get_config(_request(if_none_match=etag))).status_code == 304
+
+    asyncio.run(main.update_config(main.ConfigUpdate(default_category="Music")))
+    changed = asyncio.run(main.get_config(_request(if_none_match=etag)))
+    assert changed.status_code == 200 and json.loads(changed.body)["default_category"] == "Music"
+    assert changed.headers["etag"] != etag
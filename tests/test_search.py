@@ -0,0 +1,134 @@
+import random
+
+import pytest
+
+from backend import search
+from backend.search import SearchIndex, tokenize
+
+from .conftest import make_link
+
+
+def _index(*links):
+    index = SearchIndex()
+    index.update_many(list(links))
+    return index
+
+
+def _ids(index, query, **kwargs):
+    return index.search(query, **kwargs)[0]
+
+
+def test_tokenize_folds_case_and_width():
+    assert tokenize("Café  ÉTÉ ＡＢＣ") == ["café", "été", "abc"]
+
+
+def test_cjk_runs_become_bigrams():
+    assert tokenize("東京タワー Live") == ["東京", "京タ", "タワ", "ワー", "東", "京", "タ", "ワ", "ー", "live"]
+    # queries use the bigrams only; a lone character stays a unigram
+    assert tokenize("東京タワー", query=True) == ["東京", "京タ", "タワ", "ワー"]
+    assert tokenize("京", query=True) == ["京"]
+
+
+def test_cjk_title_matches_any_part():
+    index = _index(make_link(1, "東京タワー夜景"), make_link(2, "京都の夜"))
+    assert _ids(index, "タワー") == [1]
+    assert _ids(index, "夜景") == [1]
+    assert sorted(_ids(index, "京")) == [1, 2]
+    assert _ids(index, "大阪") == []
+
+
+def test_bm25_prefers_title_then_rarer_and_shorter():
+    index = _index(
+        make_link(1, "Song", author="Hello"),
+        make_link(2, "Hello"),
+        make_link(3, "Hello again after a very long title of many words"),
+        make_link(4, "Song", tags=["hello"]),
+    )
+    # title beats author beats tags; a long title is diluted by its length
+    ranked = _ids(index, "hello")
+    assert [i for i in ranked if i != 3] == [2, 1, 4]
+    assert ranked.index(2) < ranked.index(3)
+    # every token must match, and the rarer one decides the order
+    index.update(make_link(5, "hello world"))
+    index.update(make_link(6, "world world hello"))
+    assert index.search("hello world") == ([6, 5], 2)
+
+
+def test_prefix_expansion_scores_below_exact():
+    index = _index(make_link(1, "Live"), make_link(2, "Lively"), make_link(3, "Deliver"))
+    assert _ids(index, "live") == [1, 2]
+    # equal scores: newer (higher id) first
+    assert _ids(index, "liv") == [2, 1]
+    assert index._expand("liv") == [("live", search.PREFIX_PENALTY), ("lively", search.PREFIX_PENALTY)]
+    # a single letter is matched exactly, never as a prefix
+    assert _ids(index, "l") == []
+
+
+def test_prefix_expansions_are_capped(monkeypatch):
+    monkeypatch.setattr(search, "MAX_PREFIX_EXPANSIONS", 3)
+    index = _index(*(make_link(i, f"rock{i}") for i in range(1, 10)))
+    assert len(index._expand("rock")) == 3
+
+
+def test_allowed_and_paging():
+    index = _index(*(make_link(i, "mix") for i in range(1, 8)))
+    assert index.search("mix", limit=3) == ([7, 6, 5], 7)
+    assert index.search("mix", limit=3, offset=3) == ([4, 3, 2], 7)
+    assert index.search("mix", limit=3, offset=6) == ([1], 7)
+    assert index.search("mix", allowed={2, 5, 99}) == ([5, 2], 2)
+
+
+def test_updates_after_add_and_delete():
+    index = _index(make_link(1, "Daft Punk"), make_link(2, "Punk Rock"))
+    assert sorted(_ids(index, "punk")) == [1, 2]
+    index.update(make_link(1, "Daft Funk"))
+    assert _ids(index, "punk") == [2]
+    assert _ids(index, "funk") == [1]
+    index.remove(2)
+    assert index.search("punk") == ([], 0)
+    assert "punk" not in index.postings and "punk" not in index.vocab
+    index.update(make_link(3, "Punk"))
+    assert _ids(index, "pun") == [3]
+    assert len(index) == 2 and index.total_len == sum(index.doc_len.values())
+
+
+def _library(n, seed):
+    rng = random.Random(seed)
+    words = ["music", "musical", "video", "live", "official", "lyrics", "mix", "remix", "dance", "night"]
+    return [
+        make_link(
+            i,
+            " ".join(rng.choice(words) for _ in range(rng.randint(1, 6))),
+            categories=(rng.choice(["Music", "Talks"]),),
+            tags=rng.sample(words, rng.randint(0, 2)),
+        )
+        for i in range(1, n + 1)
+    ]
+
+
+@pytest.mark.parametrize("query", ["music", "mus", "video live", "mi official", "night dance remix"])
+def test_pruned_top_k_matches_scoring_everything(monkeypatch, query):
+    monkeypatch.setattr(search, "SCORE_ALL", 0)
+    monkeypatch.setattr(search, "IMPACT_MIN", 50)
+    index = _index(*_library(1500, 3))
+    allowed = set(range(1, 1501, 3))
+
+    def both(**kwargs):
+        pruned = index.search(query, **kwargs)
+        monkeypatch.setattr(search, "SCORE_ALL", 10**9)
+        full = index.search(query, **kwargs)
+        monkeypatch.setattr(search, "SCORE_ALL", 0)
+        return pruned, full
+
+    for kwargs in ({}, {"offset": 50}, {"limit": 5, "offset": 300}, {"allowed": allowed}):
+        pruned, full = both(**kwargs)
+        assert pruned == full, kwargs
+
+    # the cached best-first order follows later edits
+    rng = random.Random(5)
+    for link in _library(300, 4):
+        index.update(make_link(rng.randint(1, 1500), link.title, tags=link.tags))
+    for i in rng.sample(range(1, 1501), 200):
+        index.remove(i)
+    pruned, full = both()
+    assert pruned == full
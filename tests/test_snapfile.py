@@ -0,0 +1,121 @@
+import io
+import json
+
+import pytest
+
+from backend import snapfile
+from backend.records import LinkRecord
+
+from .conftest import crash, make_link
+
+
+def _rows(n):
+    return [make_link(i, f"song {i}").to_row() for i in range(n, 0, -1)]
+
+
+def test_write_read_chunks(monkeypatch):
+    monkeypatch.setattr(snapfile, "FIRST_CHUNK", 2)
+    monkeypatch.setattr(snapfile, "CHUNK", 3)
+    rows = _rows(9)
+    buf = io.BytesIO()
+    snapfile.write(buf, {"next_id": 10, "categories": ["Unsorted"]}, rows)
+    buf.seek(0)
+    reader = snapfile.SnapshotReader(buf)
+    assert reader.header["next_id"] == 10 and reader.header["count"] == 9
+    assert [c[2] for c in reader.header["chunks"]] == [2, 3, 3, 1]
+    # any order, any number of times
+    assert [r[0] for r in reader.chunk(2)] == [4, 3, 2]
+    assert [r[0] for r in reader.chunk(0)] == [9, 8]
+    got = [row for i in range(len(reader)) for row in reader.chunk(i)]
+    assert [LinkRecord.from_row(r).to_dict() for r in got] == [LinkRecord.from_row(r).to_dict() for r in rows]
+
+
+def test_empty_library():
+    buf = io.BytesIO()
+    snapfile.write(buf, {"next_id": 1}, [])
+    buf.seek(0)
+    reader = snapfile.SnapshotReader(buf)
+    assert len(reader) == 0 and reader.header["count"] == 0
+
+
+@pytest.mark.parametrize(
+    "data, message",
+    [
+        (b"NOTSNP" + b"\0" * 6, "not a LinkCascade snapshot"),
+        (snapfile._PREFIX.pack(snapfile.MAGIC, snapfile.VERSION + 1, 2) + b"{}", "unsupported snapshot version"),
+    ],
+)
+def test_rejects_foreign_files(data, message):
+    with pytest.raises(ValueError, match=message):
+        snapfile.SnapshotReader(io.BytesIO(data))
+
+
+def test_rejects_other_row_layout():
+    header = json.dumps({"fields": ["id", "title"], "count": 0, "chunks": []}).encode()
+    data = snapfile._PREFIX.pack(snapfile.MAGIC, snapfile.VERSION, len(header)) + header
+    with pytest.raises(ValueError, match="row layout"):
+        snapfile.SnapshotReader(io.BytesIO(data))
+
+
+def _saved_library(store, n):
+    state = store.AppState()
+    state.index.rebuild([make_link(i, f"song {i}") for i in range(n, 0, -1)])
+    state.next_id = n + 1
+    store.save_state(state)
+    return state
+
+
+def test_lazy_load_then_backfill_applies_the_journal(store, monkeypatch):
+    monkeypatch.setattr(snapfile, "FIRST_CHUNK", 3)
+    monkeypatch.setattr(snapfile, "CHUNK", 4)
+    state = _saved_library(store, 12)
+    # edits after the snapshot to links that are only in later chunks
+    state.index.set_tags(state.index.get(2), ["old"])
+    store.record(state, "tags_updated", id=2, fields={"tags": ["old"]})
+    state.index.remove(5)
+    store.record(state, "link_deleted", id=5)
+    new = make_link(13, "song 13")
+    state.index.add(new)
+    store.record(state, "link_added", link=new.to_dict())
+    crash(store)
+
+    loaded = store.load_state(lazy=True)
+    assert not store.hydrated.is_set()
+    assert [l.id for l in loaded.index.ordered()] == [13, 12, 11, 10]
+    assert store.hydration.total == 12
+    while True:
+        chunk = store.hydration.next_chunk()
+        if chunk is None:
+            break
+        loaded.index.backfill(chunk)
+    loaded.index.end_backfill()
+    store.hydration.finish()
+
+    assert store.hydrated.is_set() and store.hydration is None
+    assert [l.id for l in loaded.index.ordered()] == [13, 12, 11, 10, 9, 8, 7, 6, 4, 3, 2, 1]
+    assert list(loaded.index.get(2).tags) == ["old"]
+    assert loaded.index.order.size() == 12
+    assert loaded.next_id == 14
+
+
+def test_seed_json_is_imported_and_left_alone(store):
+    seed = {"next_id": 3, "categories": ["Unsorted"], "links": [make_link(i).to_dict() for i in (2, 1)]}
+    store.STATE_FILE.write_text(json.dumps(seed))
+    before = store.STATE_FILE.read_bytes()
+    state = store.load_state()
+    state.index.set_tags(state.index.get(1), ["mine"])
+    store.record(state, "tags_updated", id=1, fields={"tags": ["mine"]})
+    store.save_state(state)
+    assert store.SNAP_FILE.exists()
+    assert store.STATE_FILE.read_bytes() == before
+    crash(store)
+    assert list(store.load_state().index.get(1).tags) == ["mine"]
+
+
+def test_json_save_replaces_the_binary_file(store, monkeypatch):
+    state = _saved_library(store, 3)
+    monkeypatch.setattr(store, "SNAPSHOT_FORMAT", "json")
+    store.save_state(state)
+    assert not store.SNAP_FILE.exists()
+    crash(store)
+    assert [l.id for l in store.load_state().index.ordered()] == [3, 2, 1]
@@ -0,0 +1,147 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from backend.sqlite_store import SqliteStore, migrate
+
+from .conftest import crash, make_link
+
+
+@pytest.fixture
+def sqlite(store, monkeypatch):
+    monkeypatch.setattr(store, "STORAGE_BACKEND", "sqlite")
+    return store
+
+
+def _ids(state):
+    return [l.id for l in state.index.ordered()]
+
+
+def test_mutations_survive_a_restart(sqlite):
+    state = sqlite.load_state()
+    for i in (1, 2, 3):
+        link = make_link(i, f"song {i}", categories=("Music", "Chill"), tags=["a", "b"])
+        state.index.add(link)
+        sqlite.record(state, "link_added", link=link.to_dict())
+    state.index.set_tags(state.index.get(2), ["z"])
+    sqlite.record(state, "tags_updated", id=2, fields={"tags": ["z"]})
+    refreshed = datetime(2026, 1, 2, 3, 4, 5)
+    sqlite.record(
+        state,
+        "metadata_merged",
+        id=3,
+        fields={"title": "Renamed", "metadata_status": "fetching", "last_refreshed": refreshed.isoformat()},
+    )
+    sqlite.record(state, "category_changed", id=1, fields={"categories": ["Talks"], "primary_category": "Talks"})
+    sqlite.record(state, "link_deleted", id=2)
+    sqlite.record(state, "categories_updated", categories=["Unsorted", "Music", "Talks"])
+    state.config.metadata_workers = 2
+    sqlite.record(state, "config_updated", config=state.config.model_dump(mode="json"))
+    crash(sqlite)
+
+    loaded = sqlite.load_state()
+    assert _ids(loaded) == [3, 1]
+    assert loaded.next_id == 4
+    assert loaded.categories == ["Unsorted", "Music", "Talks"]
+    assert loaded.config.metadata_workers == 2
+    three = loaded.index.get(3)
+    assert three.title == "Renamed" and three.last_refreshed == refreshed
+    assert three.metadata_status == "pending"  # an interrupted fetch is queued again
+    assert three.categories == ("Music", "Chill") and three.tags == ("a", "b")
+    assert loaded.index.get(1).categories == ("Talks",)
+    assert not sqlite.JOURNAL_FILE.exists() or sqlite.JOURNAL_FILE.read_bytes() == b""
+
+
+def test_rows_round_trip_every_field(tmp_path):
+    link = make_link(
+        7,
+        "t",
+        categories=("A", "B"),
+        tags=["x"],
+        author="au",
+        duration="3:00",
+        duration_seconds=180,
+        last_refreshed=datetime(2025, 5, 6, 7, 8, 9, 123000),
+        metadata_status="done",
+        manual_order=3,
+    )
+    db = SqliteStore(tmp_path / "db")
+    db.replace({"next_id": 8}, [link])
+    meta, links = db.load()
+    db.close()
+    assert meta == {"next_id": 8}
+    assert [l.to_dict() for l in links] == [link.to_dict()]
+
+
+def test_failed_batch_is_rolled_back(tmp_path):
+    db = SqliteStore(tmp_path / "db")
+    db.record_many([("link_added", {"link": make_link(1).to_dict()})])
+    with pytest.raises(KeyError):
+        db.record_many([("link_deleted", {"id": 1}), ("tags_updated", {"id": 1})])
+    assert [l.id for l in db.load()[1]] == [1]
+    db.close()
+
+
+def test_save_state_replaces_the_rows(sqlite):
+    state = sqlite.AppState()
+    state.index.rebuild([make_link(i) for i in (3, 2, 1)])
+    state.next_id = 4
+    sqlite.save_state(state)
+    assert sqlite.snapshot(state) is None
+    sqlite.save_snapshot(None)  # /api/save: a flush
+    crash(sqlite)
+    assert _ids(sqlite.load_state()) == [3, 2, 1]
+    assert not sqlite.SNAP_FILE.exists()
+
+
+def test_first_start_imports_the_snapshot_library(store, monkeypatch):
+    state = store.AppState()
+    state.index.rebuild([make_link(2, "two"), make_link(1, "one")])
+    state.next_id = 3
+    store.save_state(state)
+    link = make_link(3, "three")
+    store.record(state, "link_added", link=link.to_dict())  # only in the journal
+    crash(store)
+
+    monkeypatch.setattr(store, "STORAGE_BACKEND", "sqlite")
+    loaded = store.load_state()
+    assert _ids(loaded) == [3, 2, 1] and loaded.next_id == 4
+    assert store.DB_FILE.exists()
+
+
+def test_migrate_merges_legacy_files_by_url(tmp_path):
+    current = tmp_path / "draft_state.json"
+    current.write_text(
+        json.dumps(
+            {
+                "next_id": 3,
+                "categories": ["Unsorted", "Music"],
+                "config": {"metadata_workers": 3},
+                "links": [make_link(2, "b", categories=("Music",)).to_dict(), make_link(1, "a").to_dict()],
+            }
+        )
+    )
+    legacy = tmp_path / "links.json"
+    same_url = make_link(2).to_dict()
+    other = make_link(5, "new").to_dict()
+    other["normalized_url"] = "https://www.youtube.com/watch?v=zzzzzzzzzzz"
+    for raw, category in ((same_url, "Old"), (other, "Old")):
+        del raw["categories"], raw["primary_category"]
+        raw["category"] = category
+    colliding = make_link(1, "collides").to_dict()
+    colliding["normalized_url"] = "https://www.youtube.com/watch?v=yyyyyyyyyyy"
+    legacy.write_text(json.dumps({"links": [same_url, other, colliding]}))
+
+    meta, links = migrate(tmp_path / "db", [current, legacy])
+    db = SqliteStore(tmp_path / "db")
+    stored_meta, stored = db.load()
+    db.close()
+    assert stored_meta == meta
+    assert meta["categories"] == ["Unsorted", "Music", "Old"]
+    assert meta["config"] == {"metadata_workers": 3}
+    by_id = {l.id: l for l in stored}
+    assert sorted(by_id) == [1, 2, 3, 5]
+    assert by_id[2].categories == ("Music", "Old")
+    assert by_id[1].title == "a" and by_id[3].title == "collides"
+    assert meta["next_id"] == 6
@@ -0,0 +1,150 @@
+import asyncio
+import hashlib
+import time
+import types
+
+import pytest
+
+from backend import thumbs as thumbs_mod
+from backend.index import LinkIndex
+from backend.thumbs import DEFAULT_THUMB, NEGATIVE_TTL, ThumbCache
+
+from .conftest import make_link
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"x" * 100
+
+
+class _Session:
+    """Serves `images` (url -> bytes); anything else is a 404. Counts requests per url."""
+
+    def __init__(self, images, delay=0.0):
+        self.images = images
+        self.delay = delay
+        self.requests = []
+
+    def get(self, url, timeout=None):
+        self.requests.append(url)
+        if self.delay:
+            time.sleep(self.delay)
+        if isinstance(self.images.get(url), Exception):
+            raise self.images[url]
+        if url not in self.images:
+            return types.SimpleNamespace(status_code=404, headers={"Content-Type": "text/html"}, content=b"")
+        return types.SimpleNamespace(status_code=200, headers={"Content-Type": "image/png"}, content=self.images[url])
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A settable clock in place of time.time()/time.monotonic() inside backend.thumbs."""
+    clock = types.SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(thumbs_mod, "time", types.SimpleNamespace(time=lambda: clock.now, monotonic=lambda: clock.now))
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ThumbCache(tmp_path / "thumbs", max_bytes=1000)
+    yield cache
+    cache.close()
+
+
+def _serve(monkeypatch, images, **kwargs):
+    session = _Session(images, **kwargs)
+    monkeypatch.setattr(thumbs_mod, "session", session)
+    return session
+
+
+def _get(cache, url, width=None):
+    return asyncio.run(cache.get(url, width))
+
+
+def test_identical_images_share_one_blob(cache, monkeypatch):
+    session = _serve(monkeypatch, {"https://a/avatar.png": PNG, "https://b/avatar.png": PNG})
+    path, ctype, sha = _get(cache, "https://a/avatar.png")
+    assert sha == hashlib.sha256(PNG).hexdigest() and ctype == "image/png"
+    assert path == cache.root / "objects" / sha[:2] / sha and path.read_bytes() == PNG
+    assert _get(cache, "https://b/avatar.png") == (path, ctype, sha)
+    stats = cache.stats()
+    assert stats["images"] == 2 and stats["blobs"] == 1 and stats["bytes"] == len(PNG)
+
+    assert _get(cache, "https://a/avatar.png") == (path, ctype, sha)
+    assert len(session.requests) == 2 and cache.counters["hits"] == 1
+
+
+def test_the_index_survives_a_restart(cache, monkeypatch, tmp_path):
+    _serve(monkeypatch, {"https://a/t.png": PNG})
+    found = _get(cache, "https://a/t.png")
+    cache.close()
+    session = _serve(monkeypatch, {})
+    reopened = ThumbCache(cache.root, max_bytes=1000)
+    assert _get(reopened, "https://a/t.png") == found and session.requests == []
+    assert reopened.total == len(PNG)
+    reopened.close()
+
+
+def test_concurrent_requests_fetch_once(cache, monkeypatch):
+    session = _serve(monkeypatch, {"https://a/t.png": PNG}, delay=0.2)
+
+    async def both():
+        return await asyncio.gather(cache.get("https://a/t.png"), cache.get("https://a/t.png"))
+
+    first, second = asyncio.run(both())
+    assert first == second and session.requests == ["https://a/t.png"]
+
+
+def test_least_recently_served_are_evicted_but_shared_blobs_kept(cache, monkeypatch, clock):
+    images = {f"https://a/{i}.png": bytes([i]) * 300 for i in range(4)}
+    images["https://b/0.png"] = images["https://a/0.png"]
+    _serve(monkeypatch, images)
+    for url in ("https://a/0.png", "https://a/1.png", "https://b/0.png", "https://a/2.png"):
+        clock.now += 1
+        _get(cache, url)
+    assert cache.total == 900
+    clock.now += 1
+    _get(cache, "https://a/3.png")  # over budget: the oldest key goes first
+    assert cache.counters["evictions"] == 2  # a/0 (its blob still used by b/0), then a/1
+    keys = {row[0] for row in cache.conn.execute("SELECT key FROM images")}
+    assert keys == {"https://b/0.png|0", "https://a/2.png|0", "https://a/3.png|0"}
+    assert cache.total == 900 and cache.stats()["blobs"] == 3
+    assert not cache._blob_path(hashlib.sha256(images["https://a/1.png"]).hexdigest()).exists()
+
+
+def test_failed_fetches_are_not_retried_until_the_ttl_ends(cache, monkeypatch, clock):
+    session = _serve(monkeypatch, {"https://a/down.png": ConnectionError()})
+    assert _get(cache, "https://a/missing.png") is None
+    assert _get(cache, "https://a/missing.png") is None
+    assert _get(cache, "https://a/down.png") is None and _get(cache, "https://a/down.png") is None
+    assert session.requests == ["https://a/missing.png", "https://a/down.png"]
+    assert cache.counters["negative_hits"] == 2 and cache.stats()["failed"] == 2
+
+    session.images["https://a/missing.png"] = PNG
+    clock.now += NEGATIVE_TTL
+    assert _get(cache, "https://a/missing.png")[2] == hashlib.sha256(PNG).hexdigest()
+    assert cache.stats()["failed"] == 1
+
+
+def test_negative_cache_is_bounded(cache, monkeypatch, clock):
+    monkeypatch.setattr(thumbs_mod, "NEGATIVE_MAX", 2)
+    _serve(monkeypatch, {})
+    for i in range(3):
+        _get(cache, f"https://a/{i}.png")
+    assert list(cache._failed) == ["https://a/1.png|0", "https://a/2.png|0"]
+
+
+def test_sources(cache):
+    cache.remember("vid", None, "https://a/avatar.png")
+    assert cache.source_url("vid", "thumb") == DEFAULT_THUMB.format(video_id="vid")
+    assert cache.source_url("vid", "avatar") == "https://a/avatar.png"
+    cache.forget("vid")
+    assert cache.sources == {} and cache.source_url("vid", "avatar") is None
+
+
+def test_deleting_a_link_forgets_its_images(main, monkeypatch):
+    index = LinkIndex()
+    index.rebuild([make_link(2), make_link(1)])
+    monkeypatch.setitem(main.state.__pydantic_private__, "_index", index)
+    monkeypatch.setattr(main.thumbs, "sources", {})
+    for link in index.links():
+        main.thumbs.remember(link.normalized_url[-11:], "https://a/t.png", "https://a/avatar.png")
+    asyncio.run(main.delete_link(1))
+    assert list(main.thumbs.sources) == [f"{2:011d}"]
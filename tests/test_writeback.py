@@ -0,0 +1,82 @@
+import threading
+
+from backend.writeback import WriteBehind
+
+
+class _Sink:
+    """A write callback that records each batch and can be made to fail."""
+
+    def __init__(self, fail_on=()):
+        self.batches = []
+        self.fail_on = set(fail_on)
+        self.threads = set()
+        self.wrote = threading.Event()
+
+    def __call__(self, batch):
+        self.threads.add(threading.current_thread().name)
+        if self.fail_on & set(batch):
+            raise OSError("disk full")
+        self.batches.append(list(batch))
+        self.wrote.set()
+
+
+def test_items_staged_within_the_delay_share_one_write():
+    sink = _Sink()
+    writer = WriteBehind(sink, delay=60, max_batch=1000, name="test-writer")
+    for i in range(5):
+        writer.stage([i])
+    assert sink.batches == []  # still waiting for more
+    assert writer.stats()["pending"] == 5
+    assert writer.barrier(5)
+    assert sink.batches == [[0, 1, 2, 3, 4]] and sink.threads == {"test-writer"}
+    assert writer.counters == {"flushes": 1, "items": 5, "errors": 0, "largest_batch": 5}
+    writer.close(5)
+
+
+def test_a_full_batch_goes_out_without_waiting_for_the_delay():
+    sink = _Sink()
+    writer = WriteBehind(sink, delay=60, max_batch=3)
+    writer.stage([1, 2])
+    writer.stage([3])
+    assert sink.wrote.wait(5)
+    assert sink.batches == [[1, 2, 3]]
+    writer.close(5)
+
+
+def test_the_delay_ends_a_batch():
+    sink = _Sink()
+    writer = WriteBehind(sink, delay=0.01, max_batch=1000)
+    writer.stage(["a"])
+    assert sink.wrote.wait(5)
+    assert sink.batches == [["a"]]
+    writer.close(5)
+
+
+def test_close_flushes_and_later_items_are_written_inline():
+    sink = _Sink()
+    writer = WriteBehind(sink, delay=60, max_batch=1000, name="test-writer")
+    writer.stage([1, 2])
+    writer.close(5)
+    assert sink.batches == [[1, 2]]
+    assert writer._thread is None
+    writer.stage([3])
+    assert sink.batches == [[1, 2], [3]]
+    assert threading.current_thread().name in sink.threads
+    assert writer.barrier(0)  # nothing left to wait for
+
+
+def test_a_failed_write_is_reported_and_the_writer_keeps_going(capsys):
+    sink = _Sink(fail_on={"bad"})
+    writer = WriteBehind(sink, delay=60, max_batch=1000)
+    writer.stage(["bad"])
+    assert writer.barrier(5)  # a failed batch still counts as handled; nothing waits forever
+    stats = writer.stats()
+    assert stats["errors"] == 1 and stats["flushes"] == 0 and "disk full" in stats["last_error"]
+    assert "OSError" in capsys.readouterr().err
+
+    writer.stage(["good"])
+    assert writer.barrier(5)
+    assert sink.batches == [["good"]] and writer.counters["flushes"] == 1
+    writer.close(5)
+    writer.stage(["bad"])  # inline after close: same handling
+    assert writer.counters["errors"] == 2